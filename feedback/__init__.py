@@ -1,5 +1,5 @@
 from django.apps import apps as django_apps
-from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
 from django.conf import settings
 from typing import TYPE_CHECKING, Type
 from .options import FEEDBACK_MODEL_NAME
@@ -23,5 +23,18 @@ def get_feedback_model() -> Type["AbstractFeedback"]:
             % FEEDBACK_MODEL_NAME
         )
 
+def has_field(model, name: str) -> bool:
+    """
+    Whether `model` has the field `name`.
+
+    Clustering, message analysis and moderation store their state on fields of the
+    default `Feedback` model; a custom feedback model without those fields skips them.
+    """
+    try:
+        model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return True
+
 __version__ = "1.1.7"
 VERSION = __version__
\ No newline at end of file
@@ -0,0 +1,344 @@
+"""
+    Keyword extraction, language detection and a lexicon based sentiment score
+    of the feedback messages, so negative feedback can be triaged.
+
+    The analysis runs outside of the request, in the `analyze_feedback_messages`
+    command: unanalysed messages are streamed in chunks, analysed in parallel by a
+    process pool and written back with `bulk_update`, one transaction per chunk.
+    An interrupted run resumes with the messages which are still unanalysed. A reanalysis
+    resumes with the messages analysed before it started, kept in a checkpoint file until
+    it completes.
+
+    `FEEDBACK_MESSAGE_ANALYZER` is the dotted path of the function analysing a single
+    message. It runs in the worker processes and returns a dict with the `language`,
+    the `keywords` and the `sentiment` (from -1.0, negative, to 1.0, positive; `None`
+    when the language has no lexicon).
+"""
+import datetime
+import json
+import math
+import os
+import re
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Callable
+
+from django.db import connections, models, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import get_feedback_model, has_field, registry
+
+
+RESULT_FIELDS = {
+    "language": "message_language",
+    "keywords": "message_keywords",
+    "sentiment": "message_sentiment",
+}
+
+MAX_KEYWORDS = 5
+MIN_KEYWORD_LENGTH = 3
+
+# Scores within this margin of zero are neutral.
+NEUTRAL_MARGIN = 0.05
+
+# Normalizes the summed lexicon scores to -1.0 .. 1.0, as `x / sqrt(x * x + alpha)`.
+_ALPHA = 15
+
+# Words flipping the score of the sentiment words right after them.
+_NEGATION_WINDOW = 3
+
+
+STOPWORDS = {
+    "en": frozenset("""
+        a about all also an and any are as at be because been but by can could did do does for from had has have
+        i if in is it its just me my no not of on or our so than that the their them then there these they this
+        to too very was we were what when which who will with would you your
+    """.split()),
+    "nl": frozenset("""
+        aan al als bij dan dat de deze die dit door een en er geen had heb heeft het hier hij hoe ik in is je
+        kan maar me met mijn na naar niet nog nu of om onder ons ook op over te tot u uit van veel voor was wat
+        we wel werd wij zal ze zei zich zij zijn zo
+    """.split()),
+    "de": frozenset("""
+        aber alle als am an auch auf aus bei bin bis da das dass dem den der des die doch du ein eine einem einen
+        einer es für hat hatte ich ihr im in ist ja kann kein mit nach nicht noch nur oder sehr sich sie sind so
+        und uns von war was wie wir zu zum zur
+    """.split()),
+    "fr": frozenset("""
+        au aux avec ce ces cette dans de des du elle en est et eu il ils je la le les leur lui ma mais me mes moi
+        mon ne nous on ont ou par pas pour qu que qui sa se ses son sont sur ta te tes toi ton tu un une vos
+        votre vous était très
+    """.split()),
+}
+
+NEGATIONS = {
+    "en": frozenset("not no never none nothing nobody cannot cant dont doesnt didnt isnt wasnt wont".split()),
+    "nl": frozenset("niet geen nooit niets niemand".split()),
+    "de": frozenset("nicht kein keine keinen keiner nie niemals nichts niemand".split()),
+    "fr": frozenset("ne pas jamais rien aucun aucune personne".split()),
+}
+
+LEXICONS = {
+    "en": {
+        **dict.fromkeys("good great nice helpful useful clear easy fast like thanks thank works fine happy "
+                        "glad informative quick simple".split(), 1),
+        **dict.fromkeys("excellent awesome amazing perfect love".split(), 2),
+        **dict.fromkeys("bad poor wrong slow confusing unclear hard difficult missing outdated error errors "
+                        "fail fails failed annoying problem problems bug bugs".split(), -1),
+        **dict.fromkeys("terrible awful horrible useless hate worst broken".split(), -2),
+    },
+    "nl": {
+        **dict.fromkeys("goed fijn prima handig duidelijk makkelijk snel bedankt dank top mooi leuk nuttig "
+                        "helder werkt tevreden blij".split(), 1),
+        **dict.fromkeys("geweldig uitstekend perfect super".split(), 2),
+        **dict.fromkeys("slecht fout traag onduidelijk moeilijk lastig verouderd ontbreekt foutmelding kapot "
+                        "probleem problemen irritant nutteloos".split(), -1),
+        **dict.fromkeys("vreselijk waardeloos verschrikkelijk slechtste".split(), -2),
+    },
+    "de": {
+        **dict.fromkeys("gut schön hilfreich nützlich klar einfach schnell danke toll prima funktioniert "
+                        "zufrieden super".split(), 1),
+        **dict.fromkeys("ausgezeichnet hervorragend perfekt großartig".split(), 2),
+        **dict.fromkeys("schlecht falsch langsam unklar schwierig veraltet fehlt fehler kaputt problem "
+                        "probleme nervig nutzlos".split(), -1),
+        **dict.fromkeys("schrecklich furchtbar katastrophal".split(), -2),
+    },
+    "fr": {
+        **dict.fromkeys("bon bien utile clair facile rapide merci super pratique fonctionne content "
+                        "satisfait agréable".split(), 1),
+        **dict.fromkeys("excellent parfait génial formidable".split(), 2),
+        **dict.fromkeys("mauvais faux lent confus difficile obsolète manque erreur cassé problème problèmes "
+                        "inutile agaçant".split(), -1),
+        **dict.fromkeys("horrible terrible nul catastrophique".split(), -2),
+    },
+}
+
+# Resolved analyzers per dotted path, per (worker) process.
+_analyzers: dict[str, Callable[[str], dict]] = {}
+
+
+def is_supported(model: type[models.Model]) -> bool:
+    return has_field(model, "analyzed_at")
+
+
+def tokenize(message: str) -> list[str]:
+    # Apostrophes are dropped so "don't" matches the negation "dont".
+    return re.findall(r"\w+", (message or "").casefold().replace("'", "").replace("’", ""))
+
+
+def detect_language(tokens: list[str]) -> str | None:
+    """
+        The language with the most stopwords among `tokens`, `None` without a clear winner.
+    """
+    counts = Counter({
+        language: sum(token in stopwords for token in tokens)
+        for language, stopwords in STOPWORDS.items()
+    }).most_common(2)
+
+    (best, best_count), (_, runner_up_count) = counts
+    if not best_count or best_count == runner_up_count:
+        return None
+    return best
+
+
+def extract_keywords(tokens: list[str], language: str | None, limit: int = MAX_KEYWORDS) -> list[str]:
+    """
+        The most frequent words which are not stopwords, in order of first use on ties.
+    """
+    if language is not None:
+        stopwords = STOPWORDS[language]
+    else:
+        stopwords = frozenset().union(*STOPWORDS.values())
+
+    counts = Counter(
+        token for token in tokens
+        if len(token) >= MIN_KEYWORD_LENGTH and token not in stopwords and not token.isdigit()
+    )
+    return [word for word, count in counts.most_common(limit)]
+
+
+def sentiment_score(tokens: list[str], language: str | None) -> float | None:
+    lexicon = LEXICONS.get(language or "en")
+    if lexicon is None:
+        return None
+
+    negations = NEGATIONS.get(language or "en", frozenset())
+    score = 0
+    for index, token in enumerate(tokens):
+        value = lexicon.get(token, 0)
+        if value and negations.intersection(tokens[max(index - _NEGATION_WINDOW, 0):index]):
+            value = -value
+        score += value
+
+    return score / math.sqrt(score * score + _ALPHA)
+
+
+def analyze_message(message: str) -> dict:
+    """
+        The default `FEEDBACK_MESSAGE_ANALYZER`.
+    """
+    tokens = tokenize(message)
+    language = detect_language(tokens)
+    return {
+        "language": language,
+        "keywords": extract_keywords(tokens, language),
+        "sentiment": sentiment_score(tokens, language),
+    }
+
+
+def analyze_chunk(analyzer: str, rows: list[tuple[int, str]]) -> list[tuple[int, dict]]:
+    """
+        Analyse `(pk, message)` rows, runs in the worker processes.
+    """
+    if analyzer not in _analyzers:
+        _analyzers[analyzer] = import_string(analyzer)
+
+    fn = _analyzers[analyzer]
+    return [(pk, fn(message)) for pk, message in rows]
+
+
+def read_checkpoint(path: str) -> datetime.datetime | None:
+    """
+        The start of the unfinished reanalysis recorded in `path`.
+    """
+    try:
+        with open(path) as f:
+            value = json.load(f).get("reanalyze_before", None)
+    except FileNotFoundError:
+        return None
+    return datetime.datetime.fromisoformat(value) if value else None
+
+
+def write_checkpoint(path: str, reanalyze_before: datetime.datetime):
+    # Replaced atomically, an interrupted write never loses the previous checkpoint.
+    with open(f"{path}.tmp", "w") as f:
+        json.dump({"reanalyze_before": reanalyze_before.isoformat()}, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def clear_checkpoint(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def pending_messages(analyzed_before: datetime.datetime = None):
+    """
+        `(pk, message)` of the unanalysed messages, and of the messages analysed
+        before `analyzed_before` (when reanalysing), in order of primary key.
+    """
+    Feedback = get_feedback_model()
+    pending = models.Q(analyzed_at__isnull=True)
+    if analyzed_before is not None:
+        pending |= models.Q(analyzed_at__lt=analyzed_before)
+
+    queryset = Feedback.objects.filter(message__isnull=False).exclude(message="").filter(pending)
+    return queryset.order_by("pk").values_list("pk", "message")
+
+
+def save_results(results: list[tuple[int, dict]], batch_size: int = 500):
+    Feedback = get_feedback_model()
+    analyzed_at = timezone.now()
+
+    # Waves of (near-)identical messages share their results, those are written with
+    # one `UPDATE ... WHERE id IN` per result; `bulk_update` builds a `CASE` per row.
+    shared: dict[str, list[int]] = defaultdict(list)
+    for pk, result in results:
+        shared[json.dumps(result, sort_keys=True)].append(pk)
+
+    instances = []
+    with transaction.atomic():
+        for key, pks in shared.items():
+            values = {
+                field: json.loads(key).get(name, None)
+                for name, field in RESULT_FIELDS.items()
+            }
+            if len(pks) > 1:
+                Feedback.objects.filter(pk__in=pks).update(analyzed_at=analyzed_at, **values)
+            else:
+                instances.append(Feedback(pk=pks[0], analyzed_at=analyzed_at, **values))
+
+        Feedback.objects.bulk_update(
+            instances, [*RESULT_FIELDS.values(), "analyzed_at"], batch_size=batch_size,
+        )
+
+
+def _run_inline(fn, *args) -> Future:
+    future = Future()
+    future.set_result(fn(*args))
+    return future
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def analyze_messages(chunk_size: int = 500, workers: int = None, reanalyze: bool = False, checkpoint: str = None, progress: Callable[[dict], None] = None) -> dict:
+    """
+        Analyse the pending messages (all messages with `reanalyze`) with `workers`
+        processes (in this process with `workers=1`), calling `progress` with the
+        statistics after every written chunk. Returns the statistics of the run.
+
+        `checkpoint` keeps the start of a reanalysis until it completes, running
+        again with the same `checkpoint` resumes an interrupted reanalysis.
+    """
+    Feedback = get_feedback_model()
+    stats = {"analyzed": 0, "seconds": 0.0, "rows_per_second": 0.0, "last_pk": None}
+    if not is_supported(Feedback):
+        return stats
+
+    workers = workers or os.cpu_count() or 1
+    analyzer = registry.get_setting("FEEDBACK_MESSAGE_ANALYZER")
+
+    # Resume an interrupted reanalysis, messages it analysed are not analysed again.
+    analyzed_before = read_checkpoint(checkpoint) if checkpoint else None
+    if analyzed_before is None and reanalyze:
+        analyzed_before = timezone.now()
+        if checkpoint:
+            write_checkpoint(checkpoint, analyzed_before)
+
+    start = time.perf_counter()
+
+    def write(last_pk: int, future: Future):
+        results = future.result()
+        save_results(results)
+
+        stats["analyzed"] += len(results)
+        stats["last_pk"] = last_pk
+        stats["seconds"] = time.perf_counter() - start
+        stats["rows_per_second"] = stats["analyzed"] / stats["seconds"] if stats["seconds"] else 0.0
+        if progress is not None:
+            progress(stats)
+
+    executor = None
+    if workers > 1:
+        # The workers are started before any rows are read, forked workers
+        # must not share the database connections of this process.
+        connections.close_all()
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        executor.submit(int).result()
+    submit = executor.submit if executor is not None else _run_inline
+
+    try:
+        rows = pending_messages(analyzed_before=analyzed_before).iterator(chunk_size=chunk_size)
+
+        running: deque[tuple[int, Future]] = deque()
+        while chunk := list(islice(rows, chunk_size)):
+            running.append((chunk[-1][0], submit(analyze_chunk, analyzer, chunk)))
+            if len(running) >= workers * 2:
+                write(*running.popleft())
+
+        while running:
+            write(*running.popleft())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if checkpoint:
+        clear_checkpoint(checkpoint)
+    return stats
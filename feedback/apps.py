@@ -4,3 +4,45 @@ from django.apps import AppConfig
 class FeedbackConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'feedback'
+
+    def ready(self):
+        from django.core.signals import setting_changed
+        from django.db.models.signals import post_delete, post_migrate
+        from wagtail.models import get_page_models
+        from wagtail.signals import page_published, page_unpublished
+        from . import fragments, pageinfo, partitioning, registry, search
+
+        setting_changed.connect(
+            registry.setting_changed_handler,
+            dispatch_uid="feedback_registry_setting_changed",
+        )
+
+        post_migrate.connect(
+            partitioning.post_migrate_handler,
+            dispatch_uid="feedback_partitioning_post_migrate",
+        )
+        post_migrate.connect(
+            search.post_migrate_handler,
+            dispatch_uid="feedback_search_post_migrate",
+        )
+
+        page_published.connect(
+            pageinfo.page_changed_handler,
+            dispatch_uid="feedback_pageinfo_page_published",
+        )
+        page_unpublished.connect(
+            pageinfo.page_changed_handler,
+            dispatch_uid="feedback_pageinfo_page_unpublished",
+        )
+        # Per page model, a receiver for every model would disable fast deletes everywhere.
+        for model in get_page_models():
+            post_delete.connect(
+                pageinfo.page_changed_handler,
+                sender=model,
+                dispatch_uid=f"feedback_pageinfo_page_deleted_{model._meta.label_lower}",
+            )
+
+        page_published.connect(
+            fragments.page_published_handler,
+            dispatch_uid="feedback_fragment_page_published",
+        )
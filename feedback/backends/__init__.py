@@ -7,4 +7,14 @@ from .ip import (
 )
 from .session import (
     SessionBasedFeedbackend,
-)
\ No newline at end of file
+)
+from .cache import (
+    CachedFeedbackend,
+    LRUCache,
+)
+from .bloom import (
+    BloomFeedbackend,
+)
+from .cookie import (
+    CookieFeedbackend,
+)
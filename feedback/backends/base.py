@@ -1,10 +1,10 @@
 from typing import TYPE_CHECKING
-from django.http import HttpRequest
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, HttpResponse
 from django.utils.module_loading import import_string
 from wagtail.models import Page
-from ..options import (
-    FEEDBACK_BACKEND,
-)
+from .. import registry
+from .ratelimit import RateLimiter
 
 
 if TYPE_CHECKING:
@@ -15,11 +15,16 @@ if TYPE_CHECKING:
 
 def get_feedback_backend(klass: type = None, options: dict = None) -> "Feedbackend":
 
+    if not klass and not options:
+        # The configured backend is constructed once per process.
+        return registry.get_backend()
+
+    config = registry.get_setting("FEEDBACK_BACKEND")
     if not klass:
-        klass = FEEDBACK_BACKEND.get("CLASS", Feedbackend)
+        klass = config.get("CLASS", Feedbackend)
 
     if not options:
-        options = FEEDBACK_BACKEND.get("OPTIONS", {})
+        options = config.get("OPTIONS", {})
 
     if not klass:
         raise RuntimeError("No feedback backend class specified.")
@@ -36,8 +41,50 @@ class Feedbackend:
             options = options(self)
         self.options = options or {}
 
+        rate_limit = self.options.get("RATE_LIMIT", None)
+        self.rate_limiter = RateLimiter(rate_limit) if rate_limit else None
+
+    def check_rate_limit(self, request: HttpRequest, page_pk: int) -> int | None:
+        """
+            Called before anything else is done with a submission.
+            Returns the seconds the client should wait when it is rate limited.
+        """
+        if self.rate_limiter is None:
+            return None
+        return self.rate_limiter.check(request, page_pk)
+
+    async def acheck_rate_limit(self, request: HttpRequest, page_pk: int) -> int | None:
+        if self.rate_limiter is None:
+            return None
+        return await self.rate_limiter.acheck(request, page_pk)
+
     def is_duplicate(self, request: HttpRequest, page: Page, form: "AbstractFeedbackForm", exists: bool = False) -> bool:
         return False
 
+    def dedup_key(self, request: HttpRequest, page: Page, exists: bool = False) -> str | None:
+        """
+            A key identifying this visitor's submission for `page`, as this backend tells visitors apart;
+            used by `CachedFeedbackend`. `None` when the backend has no such key.
+        """
+        return None
+
     def end_check(self, request: HttpRequest, page: Page, form: "AbstractFeedbackForm", instance: "AbstractFeedback", exists: bool = False) -> None:
         pass
+
+    async def ais_duplicate(self, request: HttpRequest, page: Page, form: "AbstractFeedbackForm", exists: bool = False) -> bool:
+        """
+            Async version of `is_duplicate`, runs the sync method in a thread unless overridden.
+        """
+        return await sync_to_async(self.is_duplicate)(request, page, form, exists=exists)
+
+    async def aend_check(self, request: HttpRequest, page: Page, form: "AbstractFeedbackForm", instance: "AbstractFeedback", exists: bool = False) -> None:
+        """
+            Async version of `end_check`, runs the sync method in a thread unless overridden.
+        """
+        await sync_to_async(self.end_check)(request, page, form, instance, exists=exists)
+
+    def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        """
+            Called with the response of a submission, e.g. to set cookies.
+        """
+        return response
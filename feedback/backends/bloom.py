@@ -0,0 +1,374 @@
+import hashlib
+import math
+import os
+import struct
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, Optional
+from django.core.cache import caches
+from django.http import HttpRequest
+from wagtail.models import Page
+
+from .base import Feedbackend
+from .ip import IPBasedFeedbackend
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+if TYPE_CHECKING:
+    from feedback.models import AbstractFeedback
+    from feedback.forms import FeedbackForm
+
+
+class BloomFilter:
+    """
+        A bloom filter stored in a compact byte array.
+        Positions are derived from a single blake2b digest (double hashing).
+    """
+
+    def __init__(self, size: int, hashes: int, data: bytes = None):
+        self.size = size
+        self.hashes = hashes
+        self.data = bytearray(data) if data else bytearray((size + 7) // 8)
+
+    @staticmethod
+    def optimal_size(capacity: int, error_rate: float) -> int:
+        """
+            The bits needed for `capacity` keys at the given false positive rate:
+            `-capacity * ln(error_rate) / ln(2)²`, about 9.6 bits per key at 1%.
+        """
+        return math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float = 0.01, max_bytes: int = None) -> "BloomFilter":
+        """
+            Size a filter for `capacity` keys at the given false positive rate,
+            never using more than `max_bytes` of memory.
+        """
+        size = cls.optimal_size(capacity, error_rate)
+        if max_bytes:
+            size = min(size, max_bytes * 8)
+        hashes = max(1, round(size / capacity * math.log(2)))
+        return cls(size, hashes)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data)
+
+    def positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for position in self.positions(key):
+            self.data[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self.data[position >> 3] & (1 << (position & 7))
+            for position in self.positions(key)
+        )
+
+    def update(self, other: "BloomFilter") -> None:
+        """
+            Merge the keys of an equally sized filter into this one.
+        """
+        if (other.size, other.hashes) != (self.size, self.hashes):
+            return
+        merged = int.from_bytes(self.data, "little") | int.from_bytes(other.data, "little")
+        self.data = bytearray(merged.to_bytes(len(self.data), "little"))
+
+
+class RotatingBloomFilter:
+    """
+        Two bloom filter generations which rotate every `window` seconds.
+        Keys are remembered for at least `window` and at most twice `window` seconds.
+    """
+    HEADER = struct.Struct("<qI")
+
+    def __init__(self, capacity: int, error_rate: float = 0.01, max_bytes: int = None, window: float = 60 * 60 * 24):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # Both generations share the memory budget.
+        self.max_bytes = max_bytes // 2 if max_bytes else None
+        self.window = window
+        self.generation = self.current_generation()
+        self.current = self.new_filter()
+        self.previous = self.new_filter()
+        self.lock = threading.Lock()
+
+    def new_filter(self) -> BloomFilter:
+        return BloomFilter.for_capacity(self.capacity, self.error_rate, self.max_bytes)
+
+    def current_generation(self) -> int:
+        return int(time.time() // self.window)
+
+    @property
+    def nbytes(self) -> int:
+        return self.current.nbytes + self.previous.nbytes
+
+    def rotate(self) -> None:
+        generation = self.current_generation()
+        if generation == self.generation:
+            return
+
+        if generation == self.generation + 1:
+            self.previous = self.current
+        else:
+            self.previous = self.new_filter()
+
+        self.current = self.new_filter()
+        self.generation = generation
+
+    def add(self, key: str) -> None:
+        with self.lock:
+            self.rotate()
+            self.current.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        with self.lock:
+            self.rotate()
+            return key in self.current or key in self.previous
+
+    def dumps(self) -> bytes:
+        with self.lock:
+            header = self.HEADER.pack(self.generation, self.current.nbytes)
+            return header + bytes(self.current.data) + bytes(self.previous.data)
+
+    @classmethod
+    def loads(cls, data: bytes) -> tuple[int, bytes, bytes]:
+        generation, length = cls.HEADER.unpack_from(data)
+        body = data[cls.HEADER.size:]
+        if len(body) != length * 2:
+            raise ValueError("Corrupt bloom filter state.")
+        return generation, body[:length], body[length:]
+
+    def merge(self, data: bytes) -> None:
+        """
+            Merge a state produced by `dumps` (e.g. by another process) into this filter.
+        """
+        generation, current, previous = self.loads(data)
+        if len(current) != self.current.nbytes:
+            # Stored by a differently sized filter.
+            return
+
+        with self.lock:
+            self.rotate()
+            for offset, filter in ((0, self.current), (1, self.previous)):
+                if generation == self.generation - offset:
+                    filter.update(BloomFilter(filter.size, filter.hashes, current))
+                elif generation - 1 == self.generation - offset:
+                    filter.update(BloomFilter(filter.size, filter.hashes, previous))
+
+
+class CacheStorage:
+    LOCK_TIMEOUT = 10
+    # Memcached refuses values over 1 MiB by default, leave room for the key and pickling.
+    MAX_BYTES = 1000 * 1000
+
+    def __init__(self, key: str, alias: str = "default", timeout: float = None):
+        self.cache = caches[alias]
+        self.key = key
+        self.timeout = timeout
+
+    @contextmanager
+    def lock(self) -> Iterator[bool]:
+        """
+            Yields whether the lock was acquired; `cache.add` is atomic, only one process adds the key.
+        """
+        lock_key = f"{self.key}:lock"
+        token = uuid.uuid4().hex
+        acquired = self.cache.add(lock_key, token, self.LOCK_TIMEOUT)
+        try:
+            yield acquired
+        finally:
+            # Not deleted when it expired and was acquired by another process meanwhile.
+            if acquired and self.cache.get(lock_key, None) == token:
+                self.cache.delete(lock_key)
+
+    def load(self) -> Optional[bytes]:
+        return self.cache.get(self.key, None)
+
+    def save(self, data: bytes) -> None:
+        self.cache.set(self.key, data, self.timeout)
+
+
+class FileStorage:
+    def __init__(self, path: str):
+        self.path = path
+
+    @contextmanager
+    def lock(self) -> Iterator[bool]:
+        if fcntl is None:
+            yield True
+            return
+
+        with open(f"{self.path}.lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def load(self) -> Optional[bytes]:
+        try:
+            with open(self.path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def save(self, data: bytes) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+
+class _SharedFilter:
+    """
+        The process wide filter and its persistence.
+        Merging with the stored state (a bitwise OR) shares keys between processes:
+        the stored state is merged in every `persist_interval`, on checks as well as on
+        additions, and new keys are saved under the storage's lock, after merging the
+        stored state again, so concurrent processes never overwrite each other's keys.
+    """
+
+    def __init__(self, filter: RotatingBloomFilter, storage, persist_interval: float):
+        self.filter = filter
+        self.storage = storage
+        self.persist_interval = persist_interval
+        self.persisted_at = 0.0
+        self.dirty = False
+        self.lock = threading.Lock()
+        self.sync()
+
+    def load(self) -> None:
+        data = self.storage.load()
+        if data:
+            try:
+                self.filter.merge(data)
+            except (struct.error, ValueError):
+                pass
+
+    def sync(self) -> None:
+        if self.storage is None:
+            return
+
+        with self.lock:
+            if not self.dirty:
+                self.load()
+            else:
+                with self.storage.lock() as locked:
+                    self.load()
+                    # Saved on the next sync when another process holds the lock.
+                    if locked:
+                        self.storage.save(self.filter.dumps())
+                        self.dirty = False
+            self.persisted_at = time.monotonic()
+
+    def maybe_sync(self) -> None:
+        if time.monotonic() - self.persisted_at > self.persist_interval:
+            self.sync()
+
+    def add(self, key: str) -> None:
+        self.filter.add(key)
+        self.dirty = True
+        self.maybe_sync()
+
+    def __contains__(self, key: str) -> bool:
+        self.maybe_sync()
+        return key in self.filter
+
+
+_filters: dict[str, _SharedFilter] = {}
+_lock = threading.Lock()
+
+
+class BloomFeedbackend(Feedbackend):
+    """
+        Probabilistic duplicate detection with constant memory and constant time checks.
+
+        Visitors are remembered in a rotating, time windowed bloom filter; a visitor
+        which has not voted can be rejected as a duplicate with a chance of `ERROR_RATE`.
+
+        Options:
+
+        * `CAPACITY`: the expected amount of submissions per `WINDOW`.
+        * `ERROR_RATE`: the false positive rate at `CAPACITY`.
+        * `MAX_BYTES`: upper bound on the memory used by both generations,
+          defaults to `CacheStorage.MAX_BYTES` with the `"cache"` storage.
+
+        Each generation takes `-CAPACITY * ln(ERROR_RATE) / ln(2)² / 8` bytes, the
+        stored state both generations: 240kB with the defaults.
+        * `WINDOW`: seconds after which a generation rotates.
+        * `IDENTIFY_BY`: `"ip"` or `"session"`.
+        * `STORAGE`: `None`, `"cache"` (the Django cache `CACHE`) or `"file"` (at `PATH`).
+        * `PERSIST_INTERVAL`: seconds between merging the process' filter with the storage.
+    """
+
+    def __init__(self, options: dict = None):
+        super().__init__(options)
+        self.name: str = self.options.get("NAME", "feedback-bloom")
+        self.identify_by: str = self.options.get("IDENTIFY_BY", "ip")
+
+        with _lock:
+            if self.name not in _filters:
+                _filters[self.name] = self.build_shared_filter()
+        self.shared = _filters[self.name]
+
+    def build_shared_filter(self) -> _SharedFilter:
+        window = self.options.get("WINDOW", 60 * 60 * 24 * 30)
+        storage = self.options.get("STORAGE", None)
+        filter = RotatingBloomFilter(
+            capacity=self.options.get("CAPACITY", 100_000),
+            error_rate=self.options.get("ERROR_RATE", 0.01),
+            max_bytes=self.options.get("MAX_BYTES", CacheStorage.MAX_BYTES if storage == "cache" else None),
+            window=window,
+        )
+
+        if storage == "cache":
+            storage = CacheStorage(
+                key=self.name,
+                alias=self.options.get("CACHE", "default"),
+                timeout=window * 2,
+            )
+        elif storage == "file":
+            storage = FileStorage(self.options["PATH"])
+
+        return _SharedFilter(
+            filter,
+            storage,
+            persist_interval=self.options.get("PERSIST_INTERVAL", 10),
+        )
+
+    @property
+    def filter(self) -> RotatingBloomFilter:
+        return self.shared.filter
+
+    def visitor(self, request: HttpRequest) -> str:
+        if self.identify_by == "session":
+            if not request.session.session_key:
+                request.session.save()
+            return request.session.session_key
+        return IPBasedFeedbackend.ip_address(request)
+
+    def key(self, request: HttpRequest, page: Page, exists: bool = False) -> str:
+        return f"{self.visitor(request)}:{page.pk}:{int(exists)}"
+
+    def is_duplicate(self, request: HttpRequest, page: Page, form: "FeedbackForm", exists: bool = False) -> bool:
+        if not request:
+            raise RuntimeError("A request must be passed to the form when the instance does not have an IP address.")
+
+        return self.key(request, page, exists=exists) in self.shared
+
+    def end_check(self, request: HttpRequest, page: Page, form: "FeedbackForm", instance: "AbstractFeedback", exists: bool = False) -> None:
+        self.shared.add(self.key(request, page, exists=exists))
@@ -0,0 +1,203 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import TYPE_CHECKING
+from django.core.cache import caches
+from django.http import HttpRequest, HttpResponse
+from wagtail.models import Page
+
+from .base import Feedbackend, get_feedback_backend
+from .ip import IPBasedFeedbackend
+
+if TYPE_CHECKING:
+    from feedback.models import AbstractFeedback
+    from feedback.forms import FeedbackForm
+
+
+
+class LRUCache:
+    """
+        A bounded, thread-safe in-process cache with a per-entry time to live.
+    """
+
+    def __init__(self, max_size: int = 10_000, timeout: float = 60 * 60 * 24):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.entries: OrderedDict[str, float] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key: str) -> bool:
+        with self.lock:
+            expires = self.entries.get(key, None)
+            if expires is None:
+                return False
+
+            if expires < time.monotonic():
+                del self.entries[key]
+                return False
+
+            self.entries.move_to_end(key)
+            return True
+
+    def set(self, key: str) -> None:
+        with self.lock:
+            self.entries[key] = time.monotonic() + self.timeout
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    async def aget(self, key: str) -> bool:
+        return self.get(key)
+
+    async def aset(self, key: str) -> None:
+        self.set(key)
+
+
+class DjangoCache:
+    """
+        Stores the fingerprints in one of the configured Django caches.
+    """
+
+    def __init__(self, alias: str = "default", timeout: float = 60 * 60 * 24):
+        self.cache = caches[alias]
+        self.timeout = timeout
+
+    def get(self, key: str) -> bool:
+        return bool(self.cache.get(key, False))
+
+    def set(self, key: str) -> None:
+        self.cache.set(key, True, self.timeout)
+
+    async def aget(self, key: str) -> bool:
+        return bool(await self.cache.aget(key, False))
+
+    async def aset(self, key: str) -> None:
+        await self.cache.aset(key, True, self.timeout)
+
+
+# Shared by all backends with the same key prefix, e.g. the one rebuilt after a settings change.
+_lru_caches: dict[str, LRUCache] = {}
+_counters: dict[str, Counter] = {}
+_lock = threading.Lock()
+
+
+class CachedFeedbackend(Feedbackend):
+    """
+        Remembers recent fingerprints of submitted feedback in front of another backend,
+        so repeated submissions are rejected without asking the wrapped backend.
+
+        The fingerprint is the `dedup_key` of the wrapped backend (the IP address for
+        `IPBasedFeedbackend`, the session for `SessionBasedFeedbackend`). Backends without
+        a `dedup_key` are always asked, nothing is cached for them.
+
+        Options:
+
+        * `BACKEND` / `BACKEND_OPTIONS`: the wrapped backend, defaults to `IPBasedFeedbackend`.
+        * `STORE`: `"cache"` to use the Django cache `CACHE` or `"lru"` for an in-process LRU of `MAX_SIZE` entries.
+        * `TIMEOUT`: seconds a fingerprint is remembered.
+        * `AUTHORITATIVE`: never fall back to the wrapped backend on a cache miss.
+    """
+
+    def __init__(self, options: dict = None):
+        super().__init__(options)
+        self.backend = get_feedback_backend(
+            klass=self.options.get("BACKEND", IPBasedFeedbackend),
+            options=self.options.get("BACKEND_OPTIONS", {}),
+        )
+        self.key_prefix: str = self.options.get("KEY_PREFIX", "feedback-dedup")
+        self.authoritative: bool = self.options.get("AUTHORITATIVE", False)
+
+        timeout = self.options.get("TIMEOUT", 60 * 60 * 24)
+        if self.options.get("STORE", "cache") == "lru":
+            with _lock:
+                if self.key_prefix not in _lru_caches:
+                    _lru_caches[self.key_prefix] = LRUCache(
+                        max_size=self.options.get("MAX_SIZE", 10_000),
+                        timeout=timeout,
+                    )
+            self.store = _lru_caches[self.key_prefix]
+        else:
+            self.store = DjangoCache(
+                alias=self.options.get("CACHE", "default"),
+                timeout=timeout,
+            )
+
+        with _lock:
+            self.counters = _counters.setdefault(self.key_prefix, Counter())
+
+    def fingerprint(self, request: HttpRequest, page: Page, exists: bool = False) -> str | None:
+        key = self.backend.dedup_key(request, page, exists=exists)
+        if key is None:
+            return None
+        return f"{self.key_prefix}:{key}"
+
+    def count(self, name: str) -> None:
+        with _lock:
+            self.counters[name] += 1
+
+    def stats(self) -> dict[str, int]:
+        with _lock:
+            return {
+                "hits": self.counters["hits"],
+                "misses": self.counters["misses"],
+            }
+
+    def is_duplicate(self, request: HttpRequest, page: Page, form: "FeedbackForm", exists: bool = False) -> bool:
+        if not request:
+            raise RuntimeError("A request must be passed to the form when the instance does not have an IP address.")
+
+        key = self.fingerprint(request, page, exists=exists)
+        if key is None:
+            return self.backend.is_duplicate(request, page, form, exists=exists)
+
+        if self.store.get(key):
+            self.count("hits")
+            return True
+
+        self.count("misses")
+        if self.authoritative:
+            return False
+
+        duplicate = self.backend.is_duplicate(request, page, form, exists=exists)
+        if duplicate:
+            self.store.set(key)
+        return duplicate
+
+    def end_check(self, request: HttpRequest, page: Page, form: "FeedbackForm", instance: "AbstractFeedback", exists: bool = False) -> None:
+        self.backend.end_check(request, page, form, instance, exists=exists)
+        key = self.fingerprint(request, page, exists=exists)
+        if key is not None:
+            self.store.set(key)
+
+    async def ais_duplicate(self, request: HttpRequest, page: Page, form: "FeedbackForm", exists: bool = False) -> bool:
+        if not request:
+            raise RuntimeError("A request must be passed to the form when the instance does not have an IP address.")
+
+        key = self.fingerprint(request, page, exists=exists)
+        if key is None:
+            return await self.backend.ais_duplicate(request, page, form, exists=exists)
+
+        if await self.store.aget(key):
+            self.count("hits")
+            return True
+
+        self.count("misses")
+        if self.authoritative:
+            return False
+
+        duplicate = await self.backend.ais_duplicate(request, page, form, exists=exists)
+        if duplicate:
+            await self.store.aset(key)
+        return duplicate
+
+    async def aend_check(self, request: HttpRequest, page: Page, form: "FeedbackForm", instance: "AbstractFeedback", exists: bool = False) -> None:
+        await self.backend.aend_check(request, page, form, instance, exists=exists)
+        key = self.fingerprint(request, page, exists=exists)
+        if key is not None:
+            await self.store.aset(key)
+
+    def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        return self.backend.process_response(request, response)
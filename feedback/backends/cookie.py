@@ -0,0 +1,110 @@
+from typing import TYPE_CHECKING
+from django.core import signing
+from django.http import HttpRequest, HttpResponse
+from wagtail.models import Page
+
+from .base import Feedbackend
+from . import packing
+
+if TYPE_CHECKING:
+    from feedback.models import AbstractFeedback
+    from feedback.forms import FeedbackForm
+
+
+
+class CookieFeedbackend(Feedbackend):
+    """
+        Records the pages a visitor gave feedback on in a signed, compressed cookie.
+        Duplicate checks need no session or database access.
+
+        Options:
+
+        * `COOKIE_NAME`, `COOKIE_DOMAIN`, `COOKIE_PATH`, `COOKIE_SECURE`, `COOKIE_SAMESITE`
+        * `MAX_AGE`: seconds the cookie (and every page in it) is valid.
+        * `MAX_PAGES`: the most recently changed pages kept in the cookie.
+        * `MAX_BYTES`: upper bound on the size of the cookie value.
+        * `SALT`: salt for the signature.
+    """
+
+    def __init__(self, options: dict = None):
+        super().__init__(options)
+        self.cookie_name: str = self.options.get("COOKIE_NAME", "feedback")
+        self.cookie_domain: str = self.options.get("COOKIE_DOMAIN", None)
+        self.cookie_path: str = self.options.get("COOKIE_PATH", "/")
+        self.cookie_secure: bool = self.options.get("COOKIE_SECURE", False)
+        self.cookie_samesite: str = self.options.get("COOKIE_SAMESITE", "Lax")
+        self.max_age: int = self.options.get("MAX_AGE", 60 * 60 * 24 * 365)
+        self.max_pages: int = self.options.get("MAX_PAGES", 200)
+        self.max_bytes: int = self.options.get("MAX_BYTES", 3500)
+        self.signer = signing.TimestampSigner(
+            salt=self.options.get("SALT", "feedback.backends.CookieFeedbackend"),
+        )
+
+    @property
+    def request_attribute(self) -> str:
+        return f"_feedback_cookie_{self.cookie_name}"
+
+    def get_votes(self, request: HttpRequest) -> dict[int, tuple[int, int]]:
+        if hasattr(request, self.request_attribute):
+            return getattr(request, self.request_attribute)
+
+        value = request.COOKIES.get(self.cookie_name, None)
+        if not value:
+            return {}
+
+        try:
+            data = self.signer.unsign_object(value, max_age=self.max_age)
+        except (signing.BadSignature, ValueError):
+            return {}
+
+        return packing.prune(
+            packing.unpack(data),
+            max_age=self.max_age,
+        )
+
+    def encode(self, votes: dict[int, tuple[int, int]]) -> str:
+        max_pages = self.max_pages
+        while True:
+            votes = packing.prune(votes, max_entries=max_pages, max_age=self.max_age)
+            value = self.signer.sign_object(packing.pack(votes), compress=True)
+            if len(value) <= self.max_bytes or len(votes) <= 1:
+                return value
+            # Evict the least recently changed pages until the cookie fits.
+            max_pages = len(votes) * 9 // 10
+
+    def is_duplicate(self, request: HttpRequest, page: Page, form: "FeedbackForm", exists: bool = False) -> bool:
+        if not request:
+            raise RuntimeError("A request must be passed to the form when the instance does not have an IP address.")
+
+        flags, _ = self.get_votes(request).get(page.pk, (0, 0))
+        return bool(flags & (packing.HAS_MESSAGE if exists else packing.VOTED))
+
+    def end_check(self, request: HttpRequest, page: Page, form: "FeedbackForm", instance: "AbstractFeedback", exists: bool = False) -> None:
+        votes = dict(self.get_votes(request))
+        flags, _ = votes.pop(page.pk, (0, 0))
+        votes[page.pk] = (flags | (packing.HAS_MESSAGE if exists else packing.VOTED), packing.now())
+        setattr(request, self.request_attribute, votes)
+
+    # Only the request is used, there is no I/O to move off the event loop.
+    async def ais_duplicate(self, request: HttpRequest, page: Page, form: "FeedbackForm", exists: bool = False) -> bool:
+        return self.is_duplicate(request, page, form, exists=exists)
+
+    async def aend_check(self, request: HttpRequest, page: Page, form: "FeedbackForm", instance: "AbstractFeedback", exists: bool = False) -> None:
+        self.end_check(request, page, form, instance, exists=exists)
+
+    def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        votes = getattr(request, self.request_attribute, None)
+        if votes is None:
+            return response
+
+        response.set_cookie(
+            self.cookie_name,
+            self.encode(votes),
+            max_age=self.max_age,
+            domain=self.cookie_domain,
+            path=self.cookie_path,
+            secure=self.cookie_secure,
+            httponly=True,
+            samesite=self.cookie_samesite,
+        )
+        return response
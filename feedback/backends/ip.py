@@ -1,9 +1,7 @@
 from typing import TYPE_CHECKING
+from django.conf import settings
 from django.http import HttpRequest
 from wagtail.models import Page
-from ..options import (
-    IS_PROXIED,
-)
 from .base import Feedbackend
 from .. import get_feedback_model
 
@@ -17,14 +15,14 @@ Feedback = get_feedback_model()
 
 
 class IPBasedFeedbackend(Feedbackend):
-    def is_duplicate(self, request: HttpRequest, page: Page, form: "FeedbackForm", exists: bool = False) -> bool:
+    def get_duplicates(self, request: HttpRequest, page: Page, exists: bool = False):
         if not request:
             raise RuntimeError("A request must be passed to the form when the instance does not have an IP address.")
 
         ip_address = self.ip_address(request)
         feedback_qs = Feedback.objects.filter(
             ip_address=ip_address,
-            page=page,
+            page_id=page.pk,
         )
 
         if exists:
@@ -36,15 +34,29 @@ class IPBasedFeedbackend(Feedbackend):
                 message__isnull=True,
             )
 
-        return feedback_qs.exists()
+        return feedback_qs
+
+    def dedup_key(self, request: HttpRequest, page: Page, exists: bool = False) -> str | None:
+        ip_address = self.ip_address(request)
+        if not ip_address:
+            return None
+        return f"ip:{ip_address}:{page.pk}:{int(exists)}"
 
+    def is_duplicate(self, request: HttpRequest, page: Page, form: "FeedbackForm", exists: bool = False) -> bool:
+        return self.get_duplicates(request, page, exists=exists).exists()
+
+    async def ais_duplicate(self, request: HttpRequest, page: Page, form: "FeedbackForm", exists: bool = False) -> bool:
+        return await self.get_duplicates(request, page, exists=exists).aexists()
     
     def end_check(self, request: HttpRequest, page: Page, form: "FeedbackForm", instance: "AbstractFeedback", exists: bool = False) -> None:
         pass
 
+    async def aend_check(self, request: HttpRequest, page: Page, form: "FeedbackForm", instance: "AbstractFeedback", exists: bool = False) -> None:
+        pass
+
     @staticmethod
     def ip_address(request: HttpRequest):
-        if IS_PROXIED:
+        if settings.USE_X_FORWARDED_HOST:
             addr: str = request.META.get('HTTP_X_FORWARDED_FOR', None)
             if addr:
                 return addr.split(',')[-1].strip()
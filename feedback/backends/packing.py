@@ -0,0 +1,111 @@
+"""
+    Compact encoding of the pages a visitor gave feedback on.
+
+    Entries map a page ID to `(flags, minute)` where flags is a combination of
+    `VOTED` and `HAS_MESSAGE` and minute is the time of the last change in
+    minutes since the epoch. Entries are sorted by page ID and stored as
+    delta encoded varints, so a few hundred pages fit in a few hundred bytes.
+"""
+import base64
+import time
+
+
+VOTED = 1
+HAS_MESSAGE = 2
+
+FORMAT_VERSION = 1
+
+
+def now() -> int:
+    return int(time.time() // 60)
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+def pack_bytes(entries: dict[int, tuple[int, int]]) -> bytes:
+    out = bytearray([FORMAT_VERSION])
+    base = min((minute for _, minute in entries.values()), default=0)
+    _write_varint(out, base)
+    _write_varint(out, len(entries))
+
+    previous = 0
+    for page_id in sorted(entries):
+        flags, minute = entries[page_id]
+        _write_varint(out, page_id - previous)
+        _write_varint(out, flags)
+        _write_varint(out, minute - base)
+        previous = page_id
+    return bytes(out)
+
+
+def unpack_bytes(data: bytes) -> dict[int, tuple[int, int]]:
+    if not data or data[0] != FORMAT_VERSION:
+        return {}
+
+    try:
+        base, offset = _read_varint(data, 1)
+        count, offset = _read_varint(data, offset)
+
+        entries = {}
+        page_id = 0
+        for _ in range(count):
+            delta, offset = _read_varint(data, offset)
+            flags, offset = _read_varint(data, offset)
+            minute, offset = _read_varint(data, offset)
+            page_id += delta
+            entries[page_id] = (flags, base + minute)
+        return entries
+    except IndexError:
+        return {}
+
+
+def pack(entries: dict[int, tuple[int, int]]) -> str:
+    return base64.urlsafe_b64encode(pack_bytes(entries)).decode("ascii")
+
+
+def unpack(data: str) -> dict[int, tuple[int, int]]:
+    try:
+        return unpack_bytes(base64.urlsafe_b64decode(data.encode("ascii")))
+    except (ValueError, UnicodeEncodeError):
+        return {}
+
+
+def prune(entries: dict[int, tuple[int, int]], max_entries: int = None, max_age: int = None) -> dict[int, tuple[int, int]]:
+    """
+        Drop entries older than `max_age` seconds and evict the least recently
+        changed entries beyond `max_entries`.
+    """
+    if max_age:
+        oldest = now() - max_age // 60
+        entries = {
+            page_id: entry
+            for page_id, entry in entries.items()
+            if entry[1] >= oldest
+        }
+
+    if max_entries and len(entries) > max_entries:
+        # Ties within the same minute keep the most recently inserted entries.
+        keep = sorted(reversed(entries.items()), key=lambda item: item[1][1], reverse=True)[:max_entries]
+        entries = dict(keep)
+
+    return entries
@@ -1,5 +1,6 @@
 from typing import TYPE_CHECKING, Union
-from django.http import HttpRequest
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, HttpResponse
 from django.utils.module_loading import import_string
 from wagtail.models import Page
 
@@ -27,7 +28,7 @@ class PageBasedFeedbackend(Feedbackend):
             self.backup = None
 
 
-    def is_duplicate(self, request: HttpRequest, page: Union[Page, FeedbackendPageMixin], form: "FeedbackForm", exists: bool = False) -> bool:
+    def is_duplicate(self, request: HttpRequest, page: Union[Page, "FeedbackendPageMixin"], form: "FeedbackForm", exists: bool = False) -> bool:
         if hasattr(page, "check_for_feedback_duplicate"):
             return page.check_for_feedback_duplicate(request, form, exists=exists)
         
@@ -36,8 +37,14 @@ class PageBasedFeedbackend(Feedbackend):
         
         return False
 
+    def dedup_key(self, request: HttpRequest, page: Union[Page, "FeedbackendPageMixin"], exists: bool = False) -> str | None:
+        # Pages with their own checks cannot be cached.
+        if hasattr(page, "check_for_feedback_duplicate") or not self.backup:
+            return None
+        return self.backup.dedup_key(request, page, exists=exists)
 
-    def end_check(self, request: HttpRequest, page: Union[Page, FeedbackendPageMixin], form: "FeedbackForm", instance: "AbstractFeedback", exists: bool = False) -> None:
+
+    def end_check(self, request: HttpRequest, page: Union[Page, "FeedbackendPageMixin"], form: "FeedbackForm", instance: "AbstractFeedback", exists: bool = False) -> None:
         if hasattr(page, "end_feedback_check"):
             page.end_feedback_check(request, form, instance, exists=exists)
             return
@@ -46,3 +53,26 @@ class PageBasedFeedbackend(Feedbackend):
             self.backup.end_check(request, page, form, instance, exists=exists)
             return
 
+    async def ais_duplicate(self, request: HttpRequest, page: Union[Page, "FeedbackendPageMixin"], form: "FeedbackForm", exists: bool = False) -> bool:
+        if hasattr(page, "check_for_feedback_duplicate"):
+            return await sync_to_async(page.check_for_feedback_duplicate)(request, form, exists=exists)
+
+        if self.backup:
+            return await self.backup.ais_duplicate(request, page, form, exists=exists)
+
+        return False
+
+    async def aend_check(self, request: HttpRequest, page: Union[Page, "FeedbackendPageMixin"], form: "FeedbackForm", instance: "AbstractFeedback", exists: bool = False) -> None:
+        if hasattr(page, "end_feedback_check"):
+            await sync_to_async(page.end_feedback_check)(request, form, instance, exists=exists)
+            return
+
+        if self.backup:
+            await self.backup.aend_check(request, page, form, instance, exists=exists)
+            return
+
+    def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        if self.backup:
+            return self.backup.process_response(request, response)
+        return response
+
@@ -0,0 +1,159 @@
+import math
+import re
+import threading
+import time
+from collections import Counter
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpRequest
+
+
+UNITS = {
+    "s": 1,
+    "m": 60,
+    "h": 60 * 60,
+    "d": 60 * 60 * 24,
+}
+
+RATE_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*([smhd])\s*$")
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """
+        Parse `"10/m"` or `"100/15m"` into `(limit, period in seconds)`.
+    """
+    match = RATE_RE.match(rate or "")
+    if not match:
+        raise ImproperlyConfigured(f"Invalid feedback rate limit: {rate!r}, expected e.g. \"10/m\" or \"100/15m\".")
+
+    limit, multiplier, unit = match.groups()
+    return int(limit), int(multiplier or 1) * UNITS[unit]
+
+
+# Shared by all backends with the same key prefix, e.g. the one rebuilt after a settings change.
+_counters: dict[str, Counter] = {}
+_lock = threading.Lock()
+
+
+class RateLimiter:
+    """
+        A sliding window rate limiter stored in the Django cache.
+
+        Counts are kept in fixed windows with atomic `incr` calls; the previous
+        window is weighted by how much of it still overlaps the sliding window.
+
+        Options (`FEEDBACK_BACKEND["OPTIONS"]["RATE_LIMIT"]`):
+
+        * `RATE`: submissions per address and page, e.g. `"5/m"`.
+        * `ADDRESS_RATE`: submissions per address over all pages, e.g. `"100/h"`.
+        * `CACHE`: the Django cache alias to keep the counts in.
+        * `KEY_PREFIX`: prefix of the cache keys.
+    """
+
+    def __init__(self, options: dict = None):
+        self.options = options or {}
+        self.cache = caches[self.options.get("CACHE", "default")]
+        self.key_prefix: str = self.options.get("KEY_PREFIX", "feedback-ratelimit")
+
+        self.rates: list[tuple[str, int, int]] = []
+        if self.options.get("RATE"):
+            self.rates.append(("page", *parse_rate(self.options["RATE"])))
+        if self.options.get("ADDRESS_RATE"):
+            self.rates.append(("address", *parse_rate(self.options["ADDRESS_RATE"])))
+
+        with _lock:
+            self.counters = _counters.setdefault(self.key_prefix, Counter())
+
+    def count(self, name: str) -> None:
+        with _lock:
+            self.counters[name] += 1
+
+    def stats(self) -> dict[str, int]:
+        """
+            Counts of this process; `limited_total` is shared through the cache.
+        """
+        with _lock:
+            stats = {
+                "allowed": self.counters["allowed"],
+                "limited": self.counters["limited"],
+            }
+        stats["limited_total"] = self.cache.get(f"{self.key_prefix}:limited", 0)
+        return stats
+
+    def identities(self, request: HttpRequest, page_pk: int) -> list[tuple[str, int, int]]:
+        from .ip import IPBasedFeedbackend
+
+        address = IPBasedFeedbackend.ip_address(request)
+        identities = []
+        for scope, limit, period in self.rates:
+            if scope == "page":
+                identities.append((f"{address}:{page_pk}", limit, period))
+            else:
+                identities.append((address, limit, period))
+        return identities
+
+    def windows(self, identity: str, period: int, now: float) -> tuple[str, str, float]:
+        window = int(now // period)
+        elapsed = (now % period) / period
+        return (
+            f"{self.key_prefix}:{period}:{identity}:{window}",
+            f"{self.key_prefix}:{period}:{identity}:{window - 1}",
+            1 - elapsed,
+        )
+
+    def retry_after(self, period: int, now: float) -> int:
+        return max(1, math.ceil(period - now % period))
+
+    def incr(self, key: str, timeout: int) -> int:
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            if self.cache.add(key, 1, timeout):
+                return 1
+            # Another request created the key in between.
+            return self.cache.incr(key)
+
+    async def aincr(self, key: str, timeout: int) -> int:
+        try:
+            return await self.cache.aincr(key)
+        except ValueError:
+            if await self.cache.aadd(key, 1, timeout):
+                return 1
+            return await self.cache.aincr(key)
+
+    def limited(self) -> None:
+        self.count("limited")
+        self.incr(f"{self.key_prefix}:limited", None)
+
+    async def alimited(self) -> None:
+        self.count("limited")
+        await self.aincr(f"{self.key_prefix}:limited", None)
+
+    def check(self, request: HttpRequest, page_pk: int) -> int | None:
+        """
+            Count the request, returns the seconds to wait when it is over the limit.
+        """
+        now = time.time()
+        for identity, limit, period in self.identities(request, page_pk):
+            current, previous, weight = self.windows(identity, period, now)
+            hits = self.incr(current, period * 2)
+            estimate = self.cache.get(previous, 0) * weight + hits
+            if estimate > limit:
+                self.limited()
+                return self.retry_after(period, now)
+
+        self.count("allowed")
+        return None
+
+    async def acheck(self, request: HttpRequest, page_pk: int) -> int | None:
+        now = time.time()
+        for identity, limit, period in self.identities(request, page_pk):
+            current, previous, weight = self.windows(identity, period, now)
+            hits = await self.aincr(current, period * 2)
+            estimate = (await self.cache.aget(previous, 0)) * weight + hits
+            if estimate > limit:
+                await self.alimited()
+                return self.retry_after(period, now)
+
+        self.count("allowed")
+        return None
@@ -1,8 +1,10 @@
+import re
 from typing import TYPE_CHECKING
 from django.http import HttpRequest
 from wagtail.models import Page
 
 from .base import Feedbackend
+from . import packing
 
 if TYPE_CHECKING:
     from feedback.models import AbstractFeedback
@@ -15,12 +17,22 @@ class SessionBasedFeedbackend(Feedbackend):
         super().__init__(options)
         self.format_key: str = self.options.get("FORMAT_KEY", "user-feedback-{page.pk}")
         self.format_exists_key: str = self.options.get("FORMAT_EXISTS_KEY", "user-feedback-has-message-{page.pk}")
-        
+
+        # Compact mode stores all pages in a single packed session value.
+        self.compact: bool = self.options.get("COMPACT", False)
+        self.compact_key: str = self.options.get("COMPACT_KEY", "user-feedback")
+        self.max_pages: int = self.options.get("MAX_PAGES", 500)
+        self.max_age: int = self.options.get("MAX_AGE", None)
+
 
     def is_duplicate(self, request: HttpRequest, page: Page, form: "FeedbackForm", exists: bool = False) -> bool:
         if not request:
             raise RuntimeError("A request must be passed to the form when the instance does not have an IP address.")
 
+        if self.compact:
+            flags, _ = self.get_votes(request).get(page.pk, (0, 0))
+            return bool(flags & (packing.HAS_MESSAGE if exists else packing.VOTED))
+
         if exists:
             key = self.format_exists_key.format(page=page)
         else:
@@ -28,7 +40,21 @@ class SessionBasedFeedbackend(Feedbackend):
 
         return key in request.session
 
+    def dedup_key(self, request: HttpRequest, page: Page, exists: bool = False) -> str | None:
+        # Sessions get their key when they are first saved, at the end of the first request.
+        session_key = request.session.session_key
+        if not session_key:
+            return None
+        return f"session:{session_key}:{page.pk}:{int(exists)}"
+
     def end_check(self, request: HttpRequest, page: Page, form: "FeedbackForm", instance: "AbstractFeedback", exists: bool = False) -> None:
+        if self.compact:
+            votes = self.get_votes(request)
+            flags, _ = votes.pop(page.pk, (0, 0))
+            votes[page.pk] = (flags | (packing.HAS_MESSAGE if exists else packing.VOTED), packing.now())
+            self.set_votes(request, votes)
+            return
+
         if exists:
             key = self.format_exists_key.format(page=page)
         else:
@@ -36,4 +62,52 @@ class SessionBasedFeedbackend(Feedbackend):
         request.session[key] = True
         request.session.modified = True
 
+    def get_votes(self, request: HttpRequest) -> dict[int, tuple[int, int]]:
+        data = request.session.get(self.compact_key, None)
+        if data is None:
+            return self.migrate_legacy_keys(request)
+
+        return packing.prune(
+            packing.unpack(data),
+            max_age=self.max_age,
+        )
+
+    def set_votes(self, request: HttpRequest, votes: dict[int, tuple[int, int]]) -> None:
+        votes = packing.prune(
+            votes,
+            max_entries=self.max_pages,
+            max_age=self.max_age,
+        )
+        request.session[self.compact_key] = packing.pack(votes)
+        request.session.modified = True
+
+    def legacy_key_pattern(self, format_key: str) -> re.Pattern:
+        return re.compile("^{}$".format(
+            re.escape(format_key).replace(re.escape("{page.pk}"), r"(\d+)"),
+        ))
+
+    def migrate_legacy_keys(self, request: HttpRequest) -> dict[int, tuple[int, int]]:
+        """
+            Fold the per-page keys written without `COMPACT` into the packed value.
+        """
+        patterns = (
+            (self.legacy_key_pattern(self.format_key), packing.VOTED),
+            (self.legacy_key_pattern(self.format_exists_key), packing.HAS_MESSAGE),
+        )
+
+        votes = {}
+        minute = packing.now()
+        for key in list(request.session.keys()):
+            for pattern, flag in patterns:
+                match = pattern.match(key)
+                if match:
+                    page_pk = int(match.group(1))
+                    flags, _ = votes.get(page_pk, (0, 0))
+                    votes[page_pk] = (flags | flag, minute)
+                    del request.session[key]
+                    break
+
+        if votes:
+            self.set_votes(request, votes)
 
+        return votes
@@ -0,0 +1,472 @@
+import datetime
+import math
+import platform
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.messages.storage import default_storage
+from django.contrib.sessions.backends.base import SessionBase
+from django.contrib.sessions.serializers import JSONSerializer
+from django.db import connection, transaction
+from django.template import Context, Template
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from wagtail.models import Page
+
+from . import buckets, get_feedback_model, registry, rollups, summaries
+from .pagination import CURSOR_PARAM, encode_cursor
+from .backends import (
+    get_feedback_backend,
+    LRUCache,
+    BloomFeedbackend,
+    CachedFeedbackend,
+    IPBasedFeedbackend,
+    SessionBasedFeedbackend,
+)
+
+
+DEFAULT_BACKENDS = {
+    "session": (SessionBasedFeedbackend, {}),
+    "ip": (IPBasedFeedbackend, {}),
+    "cached-lru": (CachedFeedbackend, {"STORE": "lru", "KEY_PREFIX": "feedback-benchmark", "MAX_SIZE": 1_000_000}),
+    "bloom": (BloomFeedbackend, {"NAME": "feedback-benchmark", "CAPACITY": 1_000_000, "ERROR_RATE": 0.001}),
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+def timings(samples: list[float]) -> dict[str, float]:
+    """
+        Summarize durations in seconds as microseconds.
+    """
+    if not samples:
+        return {}
+
+    samples = sorted(samples)
+    return {
+        "mean_us": statistics.fmean(samples) * 1e6,
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p95_us": samples[min(math.ceil(len(samples) * 0.95), len(samples)) - 1] * 1e6,
+    }
+
+
+def timed(fn: Callable, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def database_size() -> int:
+    """
+        The size of the feedback table (the whole database on SQLite) in bytes, if the database can tell.
+    """
+    Feedback = get_feedback_model()
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT pg_total_relation_size(%s)", [Feedback._meta.db_table])
+            return cursor.fetchone()[0]
+        if connection.vendor == "sqlite":
+            cursor.execute("PRAGMA page_count")
+            page_count = cursor.fetchone()[0]
+            cursor.execute("PRAGMA freelist_count")
+            page_count -= cursor.fetchone()[0]
+            cursor.execute("PRAGMA page_size")
+            return page_count * cursor.fetchone()[0]
+    return None
+
+
+def _visitor_request(factory: RequestFactory, index: int):
+    request = factory.post("/", REMOTE_ADDR=f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}")
+    request.session = SessionBase()
+    return request
+
+
+def benchmark_backend(name: str, klass: type, options: dict, page: Page, visitors: int = 10_000) -> dict:
+    """
+        Record `visitors` submissions with a backend and check each of them again.
+        Database changes are rolled back afterwards.
+    """
+    Feedback = get_feedback_model()
+    factory = RequestFactory()
+    backend = get_feedback_backend(klass=klass, options=dict(options))
+    requests = [_visitor_request(factory, i) for i in range(visitors)]
+    result = {"backend": name, "visitors": visitors}
+
+    try:
+        with transaction.atomic():
+            size_before = database_size()
+
+            end_check = []
+            for request in requests:
+                # Saved like the view does; the IP backend reads it back.
+                instance = Feedback.objects.create(
+                    page=page,
+                    positive=True,
+                    ip_address=IPBasedFeedbackend.ip_address(request),
+                )
+                end_check.append(timed(backend.end_check, request, page, None, instance))
+
+            is_duplicate = [
+                timed(backend.is_duplicate, request, page, None)
+                for request in requests
+            ]
+
+            size_after = database_size()
+            raise _Rollback()
+    except _Rollback:
+        pass
+
+    if isinstance(backend, SessionBasedFeedbackend):
+        serializer = JSONSerializer()
+        state_bytes = sum(len(serializer.dumps(request.session._session)) for request in requests)
+    elif isinstance(backend, BloomFeedbackend):
+        state_bytes = backend.filter.nbytes
+    elif isinstance(backend, CachedFeedbackend) and isinstance(backend.store, LRUCache):
+        state_bytes = sys.getsizeof(backend.store.entries) + sum(
+            sys.getsizeof(key) + sys.getsizeof(expires)
+            for key, expires in backend.store.entries.items()
+        )
+    elif size_before is not None and size_after is not None:
+        state_bytes = size_after - size_before
+    else:
+        state_bytes = None
+
+    result.update({
+        "state_bytes": state_bytes,
+        "end_check": timings(end_check),
+        "is_duplicate": timings(is_duplicate),
+    })
+    return result
+
+
+def benchmark_backends(page: Page, visitors: int = 10_000, backends: dict = None) -> list[dict]:
+    """
+        Compare memory use and latency of the duplicate detection backends.
+    """
+    if backends is None:
+        backends = DEFAULT_BACKENDS
+
+    return [
+        benchmark_backend(name, klass, options, page, visitors=visitors)
+        for name, (klass, options) in backends.items()
+    ]
+
+
+def benchmark_resolution(iterations: int = 10_000) -> list[dict]:
+    """
+        Compare resolving the backend and form class on every call
+        with the memoized lookups of `feedback.registry`.
+    """
+    Feedback = get_feedback_model()
+    backend = registry.get_setting("FEEDBACK_BACKEND")
+    form_class = Feedback.FEEDBACK_FORM_CLASS or registry.get_setting("FEEDBACK_FORM_CLASS")
+
+    def construct_backend():
+        klass = backend.get("CLASS", "feedback.backends.Feedbackend")
+        if isinstance(klass, str):
+            klass = import_string(klass)
+        return klass(backend.get("OPTIONS", {}))
+
+    def import_form_class():
+        if isinstance(form_class, str):
+            return import_string(form_class)
+        return form_class
+
+    lookups = {
+        "backend": (construct_backend, registry.get_backend),
+        "form_class": (import_form_class, Feedback.get_form_class),
+    }
+
+    results = []
+    for name, (uncached, memoized) in lookups.items():
+        results.append({
+            "lookup": name,
+            "iterations": iterations,
+            "uncached": timings([timed(uncached) for _ in range(iterations)]),
+            "memoized": timings([timed(memoized) for _ in range(iterations)]),
+        })
+    return results
+
+
+SCENARIOS = ("submission", "aggregation", "listing", "template")
+
+# The timing compared between runs by `compare`, the mean is too sensitive to outliers.
+COMPARED_TIMING = "p50_us"
+
+
+@contextmanager
+def rolled_back():
+    """
+        Roll back all database changes made in the block.
+    """
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback()
+    except _Rollback:
+        pass
+
+
+def seed_feedback(page: Page, rows: int, days: int = 365, batch_size: int = 10_000):
+    """
+        Insert `rows` feedback for `page`, spread evenly over the last `days` days,
+        and rebuild the page's rollups and summary.
+    """
+    Feedback = get_feedback_model()
+    start = timezone.now()
+    per_day, remainder = divmod(rows, days)
+
+    for day in range(days):
+        count = per_day + (day < remainder)
+        for offset in range(0, count, batch_size):
+            Feedback.objects.bulk_create([
+                Feedback(page=page, positive=(day + i) % 3 != 0, message="Benchmark" if i % 5 == 0 else None)
+                for i in range(offset, min(offset + batch_size, count))
+            ], batch_size=batch_size)
+
+        # `created_at` is filled in when inserting, move the new rows back in time.
+        Feedback.objects.filter(page=page, created_at__gte=start).update(
+            created_at=start - datetime.timedelta(days=day, hours=day % 24, minutes=1),
+        )
+
+    if registry.get_setting("FEEDBACK_USE_ROLLUPS"):
+        rollups.rebuild_rollups(pages=[page])
+    summaries.rebuild_summaries(pages=[page])
+
+
+def _submission_request(factory: RequestFactory, page: Page, index: int):
+    request = factory.post(
+        f"/feedback/{page.pk}/",
+        {"positive": "on" if index % 3 else ""},
+        REMOTE_ADDR=f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}",
+    )
+    request.session = SessionBase()
+    request._messages = default_storage(request)
+    return request
+
+
+def benchmark_submissions(page: Page, submissions: int = 1000, backends: dict = None) -> list[dict]:
+    """
+        Submit feedback through `views.feedback` with every backend.
+        Database changes are rolled back afterwards.
+    """
+    from .views import feedback
+
+    if backends is None:
+        backends = DEFAULT_BACKENDS
+
+    factory = RequestFactory()
+    results = []
+    for name, (klass, options) in backends.items():
+        requests = [_submission_request(factory, page, i) for i in range(submissions)]
+        setting = {"CLASS": klass, "OPTIONS": dict(options)}
+
+        with override_settings(FEEDBACK_BACKEND=setting), rolled_back():
+            samples = [timed(feedback, request, page_pk=page.pk) for request in requests]
+
+        results.append({
+            "scenario": "submission",
+            "backend": name,
+            "submissions": submissions,
+            "per_second": submissions / sum(samples),
+            **timings(samples),
+        })
+    return results
+
+
+def benchmark_aggregation(page: Page, rows: int, iterations: int = 5) -> list[dict]:
+    """
+        Aggregate `rows` feedback of a page for every period, from the raw rows
+        and (with `FEEDBACK_USE_ROLLUPS`) from the rollups.
+    """
+    from .models import FeedbackRollup
+
+    Feedback = get_feedback_model()
+    sources = {"feedback": Feedback.objects}
+    if registry.get_setting("FEEDBACK_USE_ROLLUPS"):
+        sources["rollups"] = FeedbackRollup.objects
+
+    results = []
+    for source, manager in sources.items():
+        for period in buckets.PERIODS:
+            queryset = manager.filter(page=page)
+            samples = [
+                timed(lambda: list(queryset.aggregate_percentage(period)))
+                for _ in range(iterations)
+            ]
+            results.append({
+                "scenario": "aggregation",
+                "source": source,
+                "period": period,
+                "rows": rows,
+                **timings(samples),
+            })
+    return results
+
+
+def benchmark_user():
+    """
+        The first active superuser, or a new one (create it in a `rolled_back` block).
+    """
+    User = get_user_model()
+    user = User.objects.filter(is_superuser=True, is_active=True).first()
+    if user is None:
+        user = User(**{User.USERNAME_FIELD: "feedback-benchmark"}, is_superuser=True, is_active=True)
+        user.set_unusable_password()
+        user.save()
+    return user
+
+
+def benchmark_listing(page: Page, rows: int, iterations: int = 5) -> list[dict]:
+    """
+        Request the first and the last page of `FeedbackListViewAPI` as JSON,
+        with offset and with cursor pagination, as a superuser.
+    """
+    from .views import FeedbackListViewAPI
+
+    Feedback = get_feedback_model()
+    factory = RequestFactory()
+
+    page_size = FeedbackListViewAPI.page_size
+    last_page = max((rows + page_size - 1) // page_size, 1)
+    deep = Feedback.objects.filter(page=page).order_by("-created_at", "-pk")[max(rows - page_size - 1, 0)]
+
+    variants = {
+        ("offset", "first"): (False, {}),
+        ("offset", "last"): (False, {"page": last_page}),
+        ("cursor", "first"): (True, {}),
+        ("cursor", "last"): (True, {CURSOR_PARAM: encode_cursor(deep)}),
+    }
+
+    results = []
+    with rolled_back():
+        user = benchmark_user()
+
+        for (pagination, position), (cursor_pagination, params) in variants.items():
+            view = FeedbackListViewAPI.as_view(cursor_pagination=cursor_pagination)
+
+            def request_page():
+                request = factory.get(
+                    f"/admin/feedback/api/{page.pk}/list/", params,
+                    CONTENT_TYPE="application/json", HTTP_ACCEPT="application/json",
+                )
+                request.user = user
+                request.session = SessionBase()
+                request._messages = default_storage(request)
+                return view(request, page_pk=page.pk)
+
+            if request_page().status_code != 200:
+                raise RuntimeError(f"Listing feedback of {page} as {user} failed.")
+
+            results.append({
+                "scenario": "listing",
+                "pagination": pagination,
+                "position": position,
+                "rows": rows,
+                **timings([timed(request_page) for _ in range(iterations)]),
+            })
+    return results
+
+
+def benchmark_template(page: Page, iterations: int = 1000) -> list[dict]:
+    """
+        Render the `{% feedback %}` template tag for a page.
+    """
+    factory = RequestFactory()
+    template = Template("{% load feedback %}{% feedback page %}")
+
+    def render():
+        request = factory.get("/")
+        request.session = SessionBase()
+        template.render(Context({"request": request, "page": page}))
+
+    return [{
+        "scenario": "template",
+        "iterations": iterations,
+        **timings([timed(render) for _ in range(iterations)]),
+    }]
+
+
+def run_suite(page: Page, scenarios: tuple[str, ...] = SCENARIOS, sizes: tuple[int, ...] = (10_000,), submissions: int = 1000, iterations: int = 5, label: str = None) -> dict:
+    """
+        Run the benchmark scenarios and return the results with the environment they ran in,
+        as JSON serializable data to `compare` with a later run.
+
+        The aggregation and listing scenarios run once per size in `sizes`, against that amount
+        of feedback inserted for `page`. Database changes are rolled back.
+    """
+    results = []
+    if "submission" in scenarios:
+        results.extend(benchmark_submissions(page, submissions=submissions))
+
+    if "template" in scenarios:
+        results.extend(benchmark_template(page, iterations=iterations * 100))
+
+    for rows in sizes:
+        if "aggregation" not in scenarios and "listing" not in scenarios:
+            break
+
+        with rolled_back():
+            seed_feedback(page, rows)
+
+            if "aggregation" in scenarios:
+                results.extend(benchmark_aggregation(page, rows, iterations=iterations))
+
+            if "listing" in scenarios:
+                results.extend(benchmark_listing(page, rows, iterations=iterations))
+
+    return {
+        "meta": {
+            "label": label,
+            "created_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "rollups": bool(registry.get_setting("FEEDBACK_USE_ROLLUPS")),
+        },
+        "results": results,
+    }
+
+
+def result_key(result: dict) -> tuple:
+    """
+        The fields identifying a result, e.g. `(("period", "date"), ("rows", 10000), ("scenario", "aggregation"), ...)`.
+    """
+    return tuple(sorted(
+        (key, value)
+        for key, value in result.items()
+        if not key.endswith("_us") and key != "per_second"
+    ))
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2) -> list[dict]:
+    """
+        The results of `current` which are more than `threshold` (a fraction) slower than in `baseline`.
+    """
+    previous = {
+        result_key(result): result
+        for result in baseline.get("results", [])
+    }
+
+    regressions = []
+    for result in current.get("results", []):
+        before = previous.get(result_key(result), None)
+        if not before or not before.get(COMPARED_TIMING) or not result.get(COMPARED_TIMING):
+            continue
+
+        change = result[COMPARED_TIMING] / before[COMPARED_TIMING] - 1
+        if change > threshold:
+            regressions.append({
+                **dict(result_key(result)),
+                "baseline_us": before[COMPARED_TIMING],
+                "current_us": result[COMPARED_TIMING],
+                "change": change,
+            })
+    return regressions
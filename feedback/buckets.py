@@ -0,0 +1,240 @@
+"""
+    Time buckets for the aggregation views and the rollups.
+
+    Feedback is grouped on `Trunc("created_at", ...)` in the current time zone, so the
+    buckets follow the local calendar (including DST changes) and come out of the
+    database as aware datetimes.
+
+    `fill_gaps` adds the buckets without any feedback to an aggregated series,
+    with `generate_series` on PostgreSQL and in Python on other databases.
+"""
+import calendar
+import datetime
+
+from django.conf import settings
+from django.db import connections
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+
+PERIODS = ("hour", "date", "month", "year")
+
+TRUNC_KINDS = {
+    "hour": "hour",
+    "date": "day",
+    "month": "month",
+    "year": "year",
+}
+
+INTERVALS = {
+    "hour": "1 hour",
+    "date": "1 day",
+    "month": "1 month",
+    "year": "1 year",
+}
+
+FORMATS = {
+    "hour": "j F Y H:i",
+    "date": "j F Y",
+    "month": "F Y",
+    "year": "Y",
+}
+
+# Series longer than this are not filled (e.g. years of hourly buckets).
+MAX_BUCKETS = 5000
+
+
+def trunc(period: str, field: str = "created_at") -> Trunc:
+    return Trunc(field, TRUNC_KINDS[period], tzinfo=timezone.get_current_timezone())
+
+
+def truncate(value: datetime.datetime, period: str) -> datetime.datetime:
+    """
+        Truncate a naive local datetime to the start of its `period` bucket.
+    """
+    value = value.replace(minute=0, second=0, microsecond=0)
+    if period in ("date", "month", "year"):
+        value = value.replace(hour=0)
+    if period in ("month", "year"):
+        value = value.replace(day=1)
+    if period == "year":
+        value = value.replace(month=1)
+    return value
+
+
+def bucket_for(value: datetime.datetime, period: str) -> datetime.datetime:
+    """
+        Truncate `value` to the start of its `period` bucket in the current timezone,
+        matching what `Trunc` produces in the database.
+    """
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+
+    tzinfo = value.tzinfo
+    return truncate(value.replace(tzinfo=None), period).replace(tzinfo=tzinfo)
+
+
+def next_bucket(value: datetime.datetime, period: str) -> datetime.datetime:
+    """
+        The start of the bucket after `value`, in naive local time.
+    """
+    match period:
+        case "hour":
+            return value + datetime.timedelta(hours=1)
+        case "date":
+            return value + datetime.timedelta(days=1)
+        case "month":
+            days = calendar.monthrange(value.year, value.month)[1]
+            return value + datetime.timedelta(days=days)
+        case "year":
+            return value.replace(year=value.year + 1)
+    raise ValueError(f"Unknown period: {period!r}")
+
+
+def first_bucket_from(value: datetime.datetime, period: str) -> datetime.datetime:
+    """
+        The start of the first `period` bucket which starts at or after the aware `value`.
+    """
+    start = bucket_for(value, period)
+    if start < value:
+        start = from_local(next_bucket(to_local(start), period))
+    return start
+
+
+def exists(value: datetime.datetime, tzinfo) -> bool:
+    """
+        Whether a naive local time exists; the hour skipped by a DST change does not.
+    """
+    aware = value.replace(tzinfo=tzinfo)
+    return aware.astimezone(datetime.timezone.utc).astimezone(tzinfo).replace(tzinfo=None) == value
+
+
+def local_series(start: datetime.datetime, end: datetime.datetime, period: str, limit: int = MAX_BUCKETS) -> list[datetime.datetime] | None:
+    """
+        The naive local bucket starts from `start` up to and including `end`,
+        `None` when there are more than `limit`.
+    """
+    tzinfo = timezone.get_current_timezone()
+    value = truncate(start, period)
+    series = []
+    while value <= end:
+        if period != "hour" or exists(value, tzinfo):
+            series.append(value)
+        if len(series) > limit:
+            return None
+        value = next_bucket(value, period)
+    return series
+
+
+def to_local(value: datetime.datetime) -> datetime.datetime:
+    if timezone.is_aware(value):
+        return timezone.make_naive(value, timezone.get_current_timezone())
+    return value
+
+
+def from_local(value: datetime.datetime) -> datetime.datetime:
+    if settings.USE_TZ:
+        return timezone.make_aware(value, timezone.get_current_timezone())
+    return value
+
+
+def empty_row(bucket: datetime.datetime) -> dict:
+    return {
+        "bucket": bucket,
+        "total": 0,
+        "positive_count": 0,
+        "negative_count": 0,
+        "positive_percentage": None,
+        "negative_percentage": None,
+    }
+
+
+def fill_gaps(queryset, period: str, start: datetime.datetime = None, end: datetime.datetime = None) -> list[dict]:
+    """
+        The rows of an aggregated queryset (see `FeedbackQuerySet.aggregate_percentage`),
+        newest first, with an empty row for every bucket without feedback.
+
+        `start` and `end` default to the first and last bucket with feedback.
+    """
+    if connections[queryset.db].vendor == "postgresql":
+        rows = fill_gaps_postgresql(queryset, period, start, end)
+    else:
+        rows = fill_gaps_python(queryset, period, start, end)
+
+    if rows is None:
+        # Too many buckets to fill, return the sparse series.
+        return list(queryset.order_by("-bucket"))
+    return rows
+
+
+def fill_gaps_python(queryset, period: str, start: datetime.datetime = None, end: datetime.datetime = None) -> list[dict] | None:
+    rows = {
+        to_local(row["bucket"]): row
+        for row in queryset
+    }
+
+    if start is None:
+        start = min(rows, default=None)
+    if end is None:
+        end = max(rows, default=None)
+
+    if start is None or end is None:
+        return []
+
+    series = local_series(to_local(start), to_local(end), period)
+    if series is None:
+        return None
+
+    return [
+        rows.get(bucket, None) or empty_row(from_local(bucket))
+        for bucket in reversed(series)
+    ]
+
+
+def fill_gaps_postgresql(queryset, period: str, start: datetime.datetime = None, end: datetime.datetime = None) -> list[dict] | None:
+    # `Trunc` selects the naive local bucket start; generate the same naive series to join on.
+    sql, params = queryset.order_by().query.sql_with_params()
+    start = truncate(to_local(start), period) if start else None
+    end = to_local(end) if end else None
+
+    query = f"""
+        WITH aggregated AS ({sql})
+        SELECT
+            series.bucket,
+            COALESCE(aggregated.total, 0),
+            COALESCE(aggregated.positive_count, 0),
+            COALESCE(aggregated.negative_count, 0),
+            aggregated.positive_percentage,
+            aggregated.negative_percentage
+        FROM generate_series(
+            COALESCE(%s::timestamp, (SELECT MIN(bucket) FROM aggregated)),
+            COALESCE(%s::timestamp, (SELECT MAX(bucket) FROM aggregated)),
+            %s::interval
+        ) AS series(bucket)
+        LEFT JOIN aggregated ON aggregated.bucket = series.bucket
+        ORDER BY series.bucket DESC
+        LIMIT %s
+    """
+
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(query, (*params, start, end, INTERVALS[period], MAX_BUCKETS + 1))
+        fetched = cursor.fetchall()
+
+    if len(fetched) > MAX_BUCKETS:
+        return None
+
+    tzinfo = timezone.get_current_timezone()
+    rows = []
+    for bucket, total, positive_count, negative_count, positive_percentage, negative_percentage in fetched:
+        if period == "hour" and not exists(bucket, tzinfo):
+            continue
+        rows.append({
+            "bucket": from_local(bucket),
+            "total": total,
+            "positive_count": positive_count,
+            "negative_count": negative_count,
+            # Numeric on PostgreSQL, the ORM would convert these to floats.
+            "positive_percentage": float(positive_percentage) if positive_percentage is not None else None,
+            "negative_percentage": float(negative_percentage) if negative_percentage is not None else None,
+        })
+    return rows
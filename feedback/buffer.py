@@ -0,0 +1,406 @@
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import deque
+from typing import TYPE_CHECKING, Optional, Union
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils.module_loading import import_string
+
+from . import get_feedback_model, has_field, registry, tracking
+
+if TYPE_CHECKING:
+    from feedback.models import AbstractFeedback
+
+
+logger = logging.getLogger("feedback.buffer")
+
+
+def serialize_instance(instance: "AbstractFeedback") -> dict:
+    return {
+        field.attname: field.value_from_object(instance)
+        for field in instance._meta.concrete_fields
+        if not field.primary_key
+    }
+
+
+def deserialize_instance(item: dict) -> "AbstractFeedback":
+    Feedback = get_feedback_model()
+    return Feedback(**{
+        field.attname: field.to_python(item[field.attname])
+        for field in Feedback._meta.concrete_fields
+        if field.attname in item
+    })
+
+
+def existing_tokens(tokens: list) -> set:
+    return set(get_feedback_model().objects.filter(token__in=tokens).values_list("token", flat=True))
+
+
+def insert_batch(instances: list["AbstractFeedback"]) -> list["AbstractFeedback"]:
+    """
+        Insert the submissions whose token is not in the database yet and count them.
+        Returns the inserted feedback; a replayed spool or a retried flush never
+        inserts or counts a submission twice.
+    """
+    Feedback = get_feedback_model()
+
+    with transaction.atomic():
+        existing = existing_tokens([instance.token for instance in instances])
+        pending = [instance for instance in instances if instance.token not in existing]
+
+        try:
+            with transaction.atomic():
+                Feedback.objects.bulk_create(pending)
+            inserted = pending
+        except IntegrityError:
+            # Another process inserted some of them since they were looked up;
+            # insert one by one and only count the rows inserted here.
+            inserted = []
+            for instance in pending:
+                instance.pk = None
+                try:
+                    with transaction.atomic():
+                        instance.save(force_insert=True)
+                except IntegrityError:
+                    continue
+                inserted.append(instance)
+
+        # `bulk_create` does not set the primary keys on every database.
+        if any(instance.pk is None for instance in inserted):
+            inserted = list(Feedback.objects.filter(
+                token__in=[instance.token for instance in inserted],
+            ))
+
+        tracking.record_new_feedback_batch(inserted)
+
+    return inserted
+
+
+class MemoryQueue:
+    """
+        Keeps pending submissions in process memory.
+        Anything not yet flushed is lost when the process dies.
+
+        The queue is per process, `FeedbackWriteBuffer.find` finds the submissions
+        of other processes through the shared cache.
+    """
+
+    def __init__(self, options: dict = None):
+        self.options = options or {}
+        self.items: deque[dict] = deque()
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.items)
+
+    def put(self, item: dict) -> None:
+        with self.lock:
+            self.items.append(item)
+
+    def take(self, limit: int) -> list[dict]:
+        with self.lock:
+            return [
+                self.items.popleft()
+                for _ in range(min(limit, len(self.items)))
+            ]
+
+    def requeue(self, items: list[dict]) -> None:
+        with self.lock:
+            self.items.extendleft(reversed(items))
+
+    def claim(self, token: str) -> Optional[dict]:
+        with self.lock:
+            for item in self.items:
+                if str(item.get("token")) == token:
+                    self.items.remove(item)
+                    return item
+        return None
+
+    def ack(self, items: list[dict]) -> None:
+        pass
+
+
+class FileSpoolQueue(MemoryQueue):
+    """
+        Appends every submission to a per-process spool file before it is queued.
+        Spool files left behind by dead processes are replayed by the
+        `flush_feedback_buffer` management command.
+    """
+
+    def __init__(self, options: dict = None):
+        super().__init__(options)
+        self.directory = self.options.get("SPOOL_DIR", None)
+        if not self.directory:
+            raise ImproperlyConfigured("FEEDBACK_WRITE_BUFFER requires a SPOOL_DIR for the spool durability.")
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.fsync = self.options.get("FSYNC", True)
+        self.path = os.path.join(self.directory, f"feedback-{os.getpid()}.spool")
+        self.file = open(self.path, "a", encoding="utf-8")
+
+    def _write(self, record: dict) -> None:
+        self.file.write(json.dumps(record, cls=DjangoJSONEncoder) + "\n")
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+
+    def put(self, item: dict) -> None:
+        with self.lock:
+            self._write(item)
+            super().put(item)
+
+    def claim(self, token: str) -> Optional[dict]:
+        with self.lock:
+            item = super().claim(token)
+            if item is not None:
+                self._write({"claimed": token})
+            return item
+
+    def ack(self, items: list[dict]) -> None:
+        # Compact the spool down to what is still pending.
+        with self.lock:
+            self.file.seek(0)
+            self.file.truncate()
+            for item in self.items:
+                self._write(item)
+
+    @staticmethod
+    def read(path: str) -> list[dict]:
+        items: dict[str, dict] = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write at the end of the file.
+                    continue
+
+                if "claimed" in record:
+                    items.pop(record["claimed"], None)
+                else:
+                    items[str(record.get("token"))] = record
+        return list(items.values())
+
+
+QUEUE_CLASSES = {
+    "memory": MemoryQueue,
+    "spool": FileSpoolQueue,
+}
+
+
+class FeedbackWriteBuffer:
+    """
+        Write-behind buffer for feedback submissions.
+
+        Submissions are queued and inserted with `bulk_create` by a background
+        thread, either every `FLUSH_INTERVAL` seconds or as soon as `BATCH_SIZE`
+        submissions are pending. Queued feedback is identified by its `token`
+        until it has been flushed.
+
+        Every submission is also kept in the `CACHE` for `CACHE_TIMEOUT` seconds,
+        so a message posted to another worker process than its vote finds it.
+    """
+
+    def __init__(self, options: dict = None):
+        self.options = options or {}
+        self.batch_size: int = self.options.get("BATCH_SIZE", 100)
+        self.flush_interval: float = self.options.get("FLUSH_INTERVAL", 1.0)
+
+        queue_class = self.options.get("QUEUE", None)
+        if not queue_class:
+            durability = self.options.get("DURABILITY", "memory")
+            if durability not in QUEUE_CLASSES:
+                raise ImproperlyConfigured(f"Unknown FEEDBACK_WRITE_BUFFER durability: {durability!r}")
+            queue_class = QUEUE_CLASSES[durability]
+
+        if isinstance(queue_class, str):
+            queue_class = import_string(queue_class)
+
+        # Buffered feedback is found again by its token.
+        if not has_field(get_feedback_model(), "token"):
+            raise ImproperlyConfigured("FEEDBACK_WRITE_BUFFER requires a `token` field on the feedback model.")
+
+        self.queue: MemoryQueue = queue_class(self.options)
+        self.cache = caches[self.options.get("CACHE", "default")]
+        self.cache_timeout: float = self.options.get("CACHE_TIMEOUT", 60 * 10)
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.worker: Optional[threading.Thread] = None
+        self.worker_pid: Optional[int] = None
+        atexit.register(self.flush)
+
+    def __len__(self):
+        return len(self.queue)
+
+    @staticmethod
+    def cache_key(token: Union[str, uuid.UUID]) -> str:
+        return f"feedback-buffer:{token}"
+
+    def start(self) -> None:
+        # Threads do not survive a fork; start a new worker in the child.
+        if self.worker and self.worker.is_alive() and self.worker_pid == os.getpid():
+            return
+
+        with self.flush_lock:
+            if self.worker and self.worker.is_alive() and self.worker_pid == os.getpid():
+                return
+
+            self.worker_pid = os.getpid()
+            self.worker = threading.Thread(
+                target=self.run,
+                name="feedback-write-buffer",
+                daemon=True,
+            )
+            self.worker.start()
+
+    def run(self) -> None:
+        while True:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush the feedback write buffer")
+            finally:
+                close_old_connections()
+
+    def submit(self, instance: "AbstractFeedback") -> uuid.UUID:
+        """
+            Queue an unsaved feedback instance, returns its token.
+        """
+        if not instance.token:
+            instance.token = uuid.uuid4()
+
+        item = serialize_instance(instance)
+        self.queue.put(item)
+        self.cache.set(self.cache_key(instance.token), item, self.cache_timeout)
+        self.start()
+
+        if len(self.queue) >= self.batch_size:
+            self.wakeup.set()
+
+        return instance.token
+
+    def claim(self, token: Union[str, uuid.UUID]) -> Optional["AbstractFeedback"]:
+        """
+            Remove a pending submission from the queue so it can be saved directly.
+            Returns None when the submission has already been saved.
+        """
+        # Waits for an in-flight flush, after which the feedback is in the database.
+        with self.flush_lock:
+            item = self.queue.claim(str(token))
+
+        if item is None:
+            return None
+
+        # Inserted from the shared cache by another process in the meantime.
+        if get_feedback_model().objects.filter(token=token).exists():
+            return None
+
+        return deserialize_instance(item)
+
+    def find(self, token: Union[str, uuid.UUID]) -> Optional["AbstractFeedback"]:
+        """
+            The feedback with `token`: claimed from the queue of this process (unsaved)
+            or from the database. A submission still queued by another process is
+            inserted from the shared cache first.
+        """
+        instance = self.claim(token)
+        if instance is not None:
+            return instance
+
+        Feedback = get_feedback_model()
+        instance = Feedback.objects.filter(token=token).first()
+        if instance is not None:
+            return instance
+
+        item = self.cache.get(self.cache_key(token))
+        if item is None:
+            return None
+
+        # The other process skips it when it flushes.
+        insert_batch([deserialize_instance(item)])
+        return Feedback.objects.filter(token=token).first()
+
+    def flush(self) -> int:
+        """
+            Insert everything which is pending, returns the amount of flushed submissions.
+        """
+        flushed = 0
+
+        with self.flush_lock:
+            while batch := self.queue.take(self.batch_size):
+                instances = list(map(deserialize_instance, batch))
+                try:
+                    insert_batch(instances)
+                except Exception:
+                    self.queue.requeue(batch)
+                    raise
+
+                self.queue.ack(batch)
+                self.cache.delete_many([self.cache_key(item["token"]) for item in batch])
+                flushed += len(batch)
+
+        return flushed
+
+
+def replay_spool(directory: str, batch_size: int = 100, include_live: bool = False) -> int:
+    """
+        Insert the submissions left behind in the spool files of dead processes.
+        Returns the amount of inserted submissions, those flushed before are skipped.
+    """
+    replayed = 0
+
+    for path in glob.glob(os.path.join(directory, "feedback-*.spool")):
+        pid = os.path.basename(path)[len("feedback-"):-len(".spool")]
+        if not include_live and pid.isdigit() and _is_alive(int(pid)):
+            continue
+
+        instances = list(map(deserialize_instance, FileSpoolQueue.read(path)))
+        for i in range(0, len(instances), batch_size):
+            replayed += len(insert_batch(instances[i:i + batch_size]))
+
+        os.remove(path)
+
+    return replayed
+
+
+def _is_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+_write_buffer: Optional[FeedbackWriteBuffer] = None
+_write_buffer_lock = threading.Lock()
+
+
+def get_write_buffer() -> Optional[FeedbackWriteBuffer]:
+    """
+        Return the process wide write buffer, or None when `FEEDBACK_WRITE_BUFFER` is not configured.
+    """
+    global _write_buffer
+
+    config = registry.get_setting("FEEDBACK_WRITE_BUFFER")
+    if not config or not config.get("ENABLED", True):
+        return None
+
+    if _write_buffer is None:
+        with _write_buffer_lock:
+            if _write_buffer is None:
+                _write_buffer = FeedbackWriteBuffer(config)
+
+    return _write_buffer
@@ -0,0 +1,254 @@
+"""
+    Groups near-duplicate feedback messages into `MessageCluster`s with MinHash and LSH.
+
+    - A message is normalized and split into character shingles. Its MinHash signature
+      (`SIGNATURE_SIZE` 32-bit hashes, stored in 256 bytes) estimates the Jaccard similarity
+      of two messages as the fraction of equal hashes.
+    - The signature is split into `BANDS` bands of `ROWS` hashes. The hash of every band
+      of the first message of a cluster is stored in `MessageClusterBand`; messages sharing
+      a band with a cluster are candidates for it. A new message costs one indexed lookup and
+      a comparison with a handful of candidates, never a comparison with every message.
+    - A message joins the most similar candidate with an estimated similarity of at least
+      `FEEDBACK_CLUSTER_THRESHOLD`, otherwise it starts a cluster of its own.
+
+    Messages are clustered when they are saved. The `cluster_feedback_messages` command clusters
+    the messages which are not yet (e.g. saved before clustering existed) or rebuilds all clusters.
+"""
+import hashlib
+import random
+import re
+import struct
+from collections import Counter, defaultdict
+from typing import TYPE_CHECKING, Iterable
+
+from asgiref.sync import sync_to_async
+from django.db import models, transaction
+
+from . import get_feedback_model, has_field, registry
+from .models import MessageCluster, MessageClusterBand
+
+if TYPE_CHECKING:
+    from feedback.models import AbstractFeedback
+
+
+SIGNATURE_SIZE = 64
+BANDS = 16
+ROWS = SIGNATURE_SIZE // BANDS
+
+SHINGLE_SIZE = 5
+
+# Candidate clusters compared per message, those sharing the most bands first.
+MAX_CANDIDATES = 20
+
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 32) - 1
+_FORMAT = f">{SIGNATURE_SIZE}I"
+
+# The permutations `(a * x + b) % _PRIME`, fixed so signatures stay comparable.
+_random = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_random.randrange(1, _PRIME), _random.randrange(0, _PRIME))
+    for _ in range(SIGNATURE_SIZE)
+]
+del _random
+
+
+def is_supported(model: type[models.Model]) -> bool:
+    return has_field(model, "message_cluster")
+
+
+def threshold() -> float:
+    return registry.get_setting("FEEDBACK_CLUSTER_THRESHOLD")
+
+
+def normalize(message: str) -> str:
+    # Case, punctuation and whitespace do not make a message different.
+    return " ".join(re.findall(r"\w+", (message or "").casefold()))
+
+
+def shingles(message: str) -> set[str]:
+    text = normalize(message)
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def _hash(value: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "big")
+
+
+def signature(message: str) -> tuple[int, ...] | None:
+    """
+        The MinHash signature of `message`, `None` for messages without words.
+    """
+    hashes = [_hash(shingle.encode()) % _PRIME for shingle in shingles(message)]
+    if not hashes:
+        return None
+
+    return tuple(
+        min([(a * x + b) % _PRIME for x in hashes]) & _MASK
+        for a, b in _PERMUTATIONS
+    )
+
+
+def pack(signature: tuple[int, ...]) -> bytes:
+    return struct.pack(_FORMAT, *signature)
+
+
+def unpack(value: bytes) -> tuple[int, ...]:
+    return struct.unpack(_FORMAT, bytes(value))
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """
+        The estimated Jaccard similarity of the messages of two signatures.
+    """
+    return sum(x == y for x, y in zip(a, b)) / SIGNATURE_SIZE
+
+
+def band_buckets(signature: tuple[int, ...]) -> list[int]:
+    """
+        The hash of every band of `signature`, as signed 64-bit integers.
+        The band is hashed as well, equal rows in different bands do not collide.
+    """
+    buckets = []
+    for band in range(BANDS):
+        rows = struct.pack(f">H{ROWS}I", band, *signature[band * ROWS:(band + 1) * ROWS])
+        buckets.append(_hash(rows) - (1 << 63))
+    return buckets
+
+
+def find_cluster(signature: tuple[int, ...], buckets: list[int]) -> int | None:
+    """
+        The primary key of the most similar cluster sharing a band with `signature`.
+    """
+    # The more bands a cluster shares, the more similar its signature is likely to be.
+    candidates = MessageCluster.objects.filter(
+        bands__bucket__in=buckets,
+    ).annotate(
+        matches=models.Count("bands"),
+    ).order_by("-matches", "-size").values_list("pk", "signature")[:MAX_CANDIDATES]
+
+    best, best_similarity = None, threshold()
+    for pk, value in candidates:
+        score = similarity(signature, unpack(value))
+        if score >= best_similarity:
+            best, best_similarity = pk, score
+    return best
+
+
+def create_cluster(signature: tuple[int, ...], buckets: list[int]) -> int:
+    cluster = MessageCluster.objects.create(signature=pack(signature))
+    MessageClusterBand.objects.bulk_create(
+        MessageClusterBand(cluster=cluster, band=band, bucket=bucket)
+        for band, bucket in enumerate(buckets)
+    )
+    return cluster.pk
+
+
+def record_messages(instances: Iterable["AbstractFeedback"]) -> int:
+    """
+        Add the messages of saved feedback instances to their clusters.
+        Returns the amount of clustered messages.
+    """
+    instances = [
+        instance for instance in instances
+        if instance.pk is not None and instance.message
+        and getattr(instance, "message_cluster_id", None) is None
+    ]
+    if not instances or not is_supported(type(instances[0])):
+        return 0
+
+    Feedback = type(instances[0])
+    members: dict[int, list] = defaultdict(list)
+
+    with transaction.atomic():
+        for instance in instances:
+            value = signature(instance.message)
+            if value is None:
+                continue
+
+            buckets = band_buckets(value)
+            cluster_id = find_cluster(value, buckets) or create_cluster(value, buckets)
+            instance.message_cluster_id = cluster_id
+            members[cluster_id].append(instance.pk)
+
+        for cluster_id, pks in members.items():
+            Feedback.objects.filter(pk__in=pks).update(message_cluster_id=cluster_id)
+            MessageCluster.objects.filter(pk=cluster_id).update(
+                size=models.F("size") + len(pks),
+            )
+
+    return sum(map(len, members.values()))
+
+
+def record_message(instance: "AbstractFeedback"):
+    """
+        Add the message of a saved feedback instance to its cluster.
+    """
+    record_messages([instance])
+
+
+def discard_feedback(instance: "AbstractFeedback"):
+    """
+        Remove a feedback instance which is about to be deleted from its cluster.
+    """
+    discard_feedback_batch([instance])
+
+
+def discard_feedback_batch(instances: Iterable["AbstractFeedback"]):
+    """
+        Remove a batch of feedback instances which are about to be deleted from their clusters.
+    """
+    sizes = Counter(
+        instance.message_cluster_id for instance in instances
+        if getattr(instance, "message_cluster_id", None) is not None
+    )
+    for cluster_id, count in sizes.items():
+        MessageCluster.objects.filter(pk=cluster_id).update(
+            size=models.F("size") - count,
+        )
+
+
+async def arecord_message(instance: "AbstractFeedback"):
+    await sync_to_async(record_message)(instance)
+
+
+def cluster_pending(batch_size: int = 1000) -> int:
+    """
+        Cluster the messages which are not in a cluster yet, oldest first.
+        Returns the amount of clustered messages.
+    """
+    Feedback = get_feedback_model()
+    if not is_supported(Feedback):
+        return 0
+
+    pending = Feedback.objects.filter(
+        message_cluster__isnull=True,
+        message__isnull=False,
+    ).exclude(
+        message="",
+    ).only("pk", "message").order_by("pk")
+
+    # Paged by primary key, the clustered rows are updated while paging.
+    clustered = 0
+    while batch := list(pending[:batch_size]):
+        clustered += record_messages(batch)
+        pending = pending.filter(pk__gt=batch[-1].pk)
+    return clustered
+
+
+def rebuild_clusters(batch_size: int = 1000) -> int:
+    """
+        Remove all clusters and cluster every message again.
+        Returns the amount of clustered messages.
+    """
+    Feedback = get_feedback_model()
+    if not is_supported(Feedback):
+        return 0
+
+    with transaction.atomic():
+        Feedback.objects.filter(message_cluster__isnull=False).update(message_cluster=None)
+        MessageClusterBand.objects.all().delete()
+        MessageCluster.objects.all().delete()
+        return cluster_pending(batch_size=batch_size)
@@ -0,0 +1,70 @@
+"""
+    The vote and message counters shared by the rollups and the page summaries.
+
+    Changes are merged per row (a rollup bucket, the summary of a page) and applied
+    as a single `UPDATE ... SET votes = votes + 1` per row, so concurrent submissions
+    never lose counts. Rows which do not exist yet are created by the first votes.
+"""
+from collections import Counter, defaultdict
+from typing import TYPE_CHECKING, Callable, Hashable, Iterable
+
+from django.db import IntegrityError, models, transaction
+
+if TYPE_CHECKING:
+    from feedback.models import AbstractFeedback
+
+
+COUNTERS = ("votes", "positive_votes", "negative_votes", "messages")
+
+
+def feedback_deltas(instance: "AbstractFeedback", sign: int = 1) -> dict[str, int]:
+    """
+        The counter changes of adding (or with `sign=-1` removing) a feedback instance.
+    """
+    return {
+        "votes": sign,
+        "positive_votes": sign * int(instance.positive),
+        "negative_votes": sign * int(not instance.positive),
+        "messages": sign * int(bool(instance.message)),
+    }
+
+
+def merge(changes: Iterable[tuple["AbstractFeedback", dict[str, int]]], keys: Callable[["AbstractFeedback"], Iterable[Hashable]]) -> dict[Hashable, Counter]:
+    """
+        Sum the changes per row, `keys` returns the rows an instance is counted in.
+    """
+    rows: dict[Hashable, Counter] = defaultdict(Counter)
+    for instance, deltas in changes:
+        for key in keys(instance):
+            rows[key].update(deltas)
+    return rows
+
+
+def apply(model: type[models.Model], lookup: dict, deltas: Counter, updates: dict = None, defaults: dict = None):
+    """
+        Add `deltas` to the counters of the row matching `lookup`, together with
+        any other `updates`. A missing row is created (with `defaults`) for new votes;
+        anything else for a missing row is fixed by rebuilding the counters.
+    """
+    updates = {
+        **{
+            field: models.F(field) + delta
+            for field, delta in deltas.items() if delta
+        },
+        **(updates or {}),
+    }
+
+    if not updates or model.objects.filter(**lookup).update(**updates):
+        return
+
+    if deltas["votes"] <= 0:
+        return
+
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **(defaults or {}), **{
+                field: deltas[field] for field in COUNTERS
+            })
+    except IntegrityError:
+        # Created concurrently by another request.
+        model.objects.filter(**lookup).update(**updates)
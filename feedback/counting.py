@@ -0,0 +1,188 @@
+"""
+    Count strategies for the admin listing paginators.
+
+    The strategy is configured with `FEEDBACK_COUNT_STRATEGY` and is asked
+    for the total amount of rows of a (filtered) queryset, returning
+    `(count, approximate)`.
+"""
+import hashlib
+from functools import cached_property
+
+from django.core.cache import caches
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.module_loading import import_string
+
+from . import registry
+
+
+def get_count_strategy(klass: type = None, options: dict = None) -> "CountStrategy":
+
+    config = registry.get_setting("FEEDBACK_COUNT_STRATEGY")
+    if not klass:
+        klass = config.get("CLASS", ExactCount)
+
+    if not options:
+        options = config.get("OPTIONS", {})
+
+    if isinstance(klass, str):
+        klass = import_string(klass)
+
+    return klass(options)
+
+
+def invalidate_counts() -> None:
+    """
+        Called whenever feedback is added, changed or removed.
+    """
+    get_count_strategy().invalidate()
+
+
+async def ainvalidate_counts() -> None:
+    await get_count_strategy().ainvalidate()
+
+
+class CountStrategy:
+    def __init__(self, options: dict = None):
+        self.options = options or {}
+
+    def count(self, queryset, key: str) -> tuple[int, bool]:
+        raise NotImplementedError
+
+    def invalidate(self) -> None:
+        pass
+
+    async def ainvalidate(self) -> None:
+        self.invalidate()
+
+
+class ExactCount(CountStrategy):
+    """
+        Runs a `COUNT(*)` for every request.
+    """
+
+    def count(self, queryset, key: str) -> tuple[int, bool]:
+        return queryset.count(), False
+
+
+class CachedCount(CountStrategy):
+    """
+        Caches the exact count per normalized query string.
+
+        Options:
+
+        * `CACHE`: the Django cache alias to store the counts in.
+        * `TIMEOUT`: seconds a count is kept.
+        * `KEY_PREFIX`: prefix of the cache keys.
+
+        New feedback bumps a generation number which is part of every key,
+        so all cached counts are invalidated at once.
+    """
+
+    def __init__(self, options: dict = None):
+        super().__init__(options)
+        self.cache = caches[self.options.get("CACHE", "default")]
+        self.timeout: int = self.options.get("TIMEOUT", 30)
+        self.key_prefix: str = self.options.get("KEY_PREFIX", "feedback-count")
+
+    @property
+    def generation_key(self) -> str:
+        return f"{self.key_prefix}:generation"
+
+    def cache_key(self, key: str) -> str:
+        generation = self.cache.get(self.generation_key, 0)
+        digest = hashlib.md5(key.encode("utf-8"), usedforsecurity=False).hexdigest()
+        return f"{self.key_prefix}:{generation}:{digest}"
+
+    def count(self, queryset, key: str) -> tuple[int, bool]:
+        cache_key = self.cache_key(key)
+        count = self.cache.get(cache_key, None)
+        if count is None:
+            count = queryset.count()
+            self.cache.set(cache_key, count, self.timeout)
+        return count, False
+
+    def invalidate(self) -> None:
+        try:
+            self.cache.incr(self.generation_key)
+        except ValueError:
+            # Not set yet (or evicted); never expire the generation.
+            self.cache.add(self.generation_key, 1, None)
+
+    async def ainvalidate(self) -> None:
+        try:
+            await self.cache.aincr(self.generation_key)
+        except ValueError:
+            await self.cache.aadd(self.generation_key, 1, None)
+
+
+class EstimatedCount(CountStrategy):
+    """
+        Uses the PostgreSQL planner statistics (`pg_class.reltuples`) for
+        unfiltered lists of at least `THRESHOLD` rows; everything else is
+        counted by the `FALLBACK` / `FALLBACK_OPTIONS` strategy.
+    """
+
+    def __init__(self, options: dict = None):
+        super().__init__(options)
+        self.threshold: int = self.options.get("THRESHOLD", 100_000)
+        self.fallback = get_count_strategy(
+            klass=self.options.get("FALLBACK", CachedCount),
+            options=self.options.get("FALLBACK_OPTIONS", {}),
+        )
+
+    def is_unfiltered(self, queryset) -> bool:
+        query = queryset.query
+        return not query.where and not query.group_by and not query.distinct
+
+    def estimate(self, queryset) -> int | None:
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+
+        # -1 (or 0) when the table has never been analyzed.
+        if not row or row[0] <= 0:
+            return None
+        return row[0]
+
+    def count(self, queryset, key: str) -> tuple[int, bool]:
+        if self.is_unfiltered(queryset):
+            estimate = self.estimate(queryset)
+            if estimate is not None and estimate >= self.threshold:
+                return estimate, True
+
+        return self.fallback.count(queryset, key)
+
+    def invalidate(self) -> None:
+        self.fallback.invalidate()
+
+    async def ainvalidate(self) -> None:
+        await self.fallback.ainvalidate()
+
+
+class CountingPaginator(Paginator):
+    """
+        A paginator which asks a count strategy for the total amount of rows.
+    """
+
+    def __init__(self, object_list, per_page, *args, key: str = "", strategy: CountStrategy = None, **kwargs):
+        super().__init__(object_list, per_page, *args, **kwargs)
+        self.key = key
+        self.strategy = strategy or get_count_strategy()
+        self.approximate = False
+
+    @cached_property
+    def count(self) -> int:
+        if isinstance(self.object_list, list):
+            # Already evaluated, e.g. a gap filled series.
+            return len(self.object_list)
+
+        count, self.approximate = self.strategy.count(self.object_list, self.key)
+        return count
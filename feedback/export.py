@@ -0,0 +1,106 @@
+import csv
+from typing import TYPE_CHECKING, Iterable, Iterator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+if TYPE_CHECKING:
+    from feedback.models import FeedbackQuerySet
+
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+CHUNK_SIZE = 2000
+
+# Spreadsheets evaluate cells starting with these as formulas.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class _Echo:
+    """
+        A file-like object which returns what is written to it, for `csv.writer`.
+    """
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset: "FeedbackQuerySet", fields: list[str], chunk_size: int = CHUNK_SIZE) -> Iterator[tuple]:
+    """
+        Stream the rows of `queryset` with a server-side cursor where the database supports it.
+    """
+    return queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def escape_cell(value):
+    """
+        Prefix text which a spreadsheet would run as a formula (e.g. a message
+        starting with `=HYPERLINK(`) with a quote, so it is shown as text.
+    """
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def csv_lines(rows: Iterable[tuple], fields: list[str]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(map(escape_cell, row))
+
+
+def ndjson_lines(rows: Iterable[tuple], fields: list[str]) -> Iterator[str]:
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + "\n"
+
+
+def stream_csv(queryset: "FeedbackQuerySet", fields: list[str], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    return csv_lines(export_rows(queryset, fields, chunk_size=chunk_size), fields)
+
+
+def stream_ndjson(queryset: "FeedbackQuerySet", fields: list[str], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    return ndjson_lines(export_rows(queryset, fields, chunk_size=chunk_size), fields)
+
+
+STREAMS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+}
+
+LINES = {
+    "csv": csv_lines,
+    "ndjson": ndjson_lines,
+}
+
+
+def stream(queryset: "FeedbackQuerySet", format: str = "csv", fields: Iterable[str] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    if format not in STREAMS:
+        raise ValueError(f"Unknown export format: {format!r}")
+
+    if fields is None:
+        fields = queryset.model.export_fields
+
+    return STREAMS[format](queryset, list(fields), chunk_size=chunk_size)
+
+
+def streaming_response(queryset: "FeedbackQuerySet", format: str = "csv", filename: str = "feedback", fields: Iterable[str] = None) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(
+        stream(queryset, format=format, fields=fields),
+        content_type=EXPORT_FORMATS[format],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{format}"'
+    return response
+
+
+def rows_response(rows: Iterable[tuple], fields: list[str], format: str = "csv", filename: str = "feedback") -> StreamingHttpResponse:
+    """
+        Stream already computed rows, e.g. the rows of a report.
+    """
+    response = StreamingHttpResponse(
+        LINES[format](rows, list(fields)),
+        content_type=EXPORT_FORMATS[format],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{format}"'
+    return response
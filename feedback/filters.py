@@ -2,7 +2,8 @@ from django import forms
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from typing import TYPE_CHECKING
-from feedback import get_feedback_model
+from feedback import analysis, clusters, get_feedback_model, metrics, moderation, reports
+from feedback.search import terms
 
 import django_filters as filters
 import django_filters.widgets as filters_widgets
@@ -60,6 +61,8 @@ class FeedbackAggregationFilter(filters.FilterSet):
         Second filter to be used in the aggregation view.
         This is because we are filtering aggregated values - we cannot guarantee
         that the filters are executed in the correct order.
+
+        Works on both the raw feedback and the `FeedbackRollup` aggregates.
     """
 
     positivity_range = NumberRangeFilter(
@@ -100,6 +103,60 @@ class FeedbackAggregationFilter(filters.FilterSet):
         return queryset
 
 
+class FeedbackSeriesFilter(filters.FilterSet):
+    """
+        Last filter to be used in the aggregation view.
+        Fills the buckets without feedback and adds the trend metrics, only when
+        the buckets are in chronological order (no positivity range or ordering applied).
+    """
+
+    fill_gaps = filters.ChoiceFilter(
+        label=_("Empty Periods"),
+        help_text=_("Whether to show periods without feedback."),
+        empty_label=_("Hide"),
+        choices=[
+            (1, _("Show")),
+        ],
+        method="filter_series",
+    )
+
+    trends = filters.ChoiceFilter(
+        label=_("Trends"),
+        help_text=_("Whether to add cumulative counts, the 7 and 30 day moving positivity and confidence intervals."),
+        empty_label=_("Hide"),
+        choices=[
+            (1, _("Show")),
+        ],
+        method="filter_series",
+    )
+
+    def filter_series(self, queryset: "FeedbackQuerySet", name: str, value: str) -> "FeedbackQuerySet":
+        # Applied by `series`, the resulting rows are no longer a queryset.
+        return queryset
+
+    def is_chronological(self) -> bool:
+        return not any(
+            self.data.get(key, None)
+            for key in ("ordering", "positivity_range_min", "positivity_range_max")
+        )
+
+    def series(self, start=None, end=None):
+        queryset = self.qs
+        fill_gaps = self.form.cleaned_data.get("fill_gaps")
+        trends = self.form.cleaned_data.get("trends")
+
+        if not (fill_gaps or trends) or not self.is_chronological():
+            return queryset
+
+        if not fill_gaps:
+            return queryset.trends()
+
+        rows = queryset.fill_gaps(start=start, end=end)
+        if trends:
+            rows = metrics.annotate_series(rows, queryset.period)
+        return rows
+
+
 class AbstractFeedbackFilter(filters.FilterSet):
     attitude = filters.ChoiceFilter(
         field_name="positive",
@@ -125,6 +182,58 @@ class AbstractFeedbackFilter(filters.FilterSet):
         ],
     )
     
+    sentiment = filters.ChoiceFilter(
+        field_name="message_sentiment",
+        label=_("Sentiment"),
+        empty_label=_("All"),
+        help_text=_("The sentiment of the message, once analysed."),
+        method="filter_sentiment",
+        choices=[
+            (3, _("Positive")),
+            (2, _("Neutral")),
+            (1, _("Negative")),
+        ],
+    )
+
+    moderation = filters.ChoiceFilter(
+        field_name="moderation_status",
+        label=_("Moderation"),
+        empty_label=_("All"),
+        help_text=_("How a moderator marked the feedback."),
+        method="filter_moderation",
+        choices=[
+            ("new", _("Not marked")),
+            ("reviewed", _("Reviewed")),
+            ("spam", _("Spam")),
+        ],
+    )
+
+    cluster = filters.NumberFilter(
+        field_name="message_cluster",
+        label=_("Cluster"),
+        help_text=_("Only the messages of this cluster of near-duplicates."),
+        method="filter_cluster",
+        widget=forms.HiddenInput,
+    )
+
+    # Before `search`, clusters are collapsed within the other filters.
+    collapse = filters.ChoiceFilter(
+        label=_("Near-duplicates"),
+        empty_label=_("Show all"),
+        help_text=_("Show only the newest message of every cluster of near-duplicates."),
+        method="filter_collapse",
+        choices=[
+            (1, _("Collapse")),
+        ],
+    )
+
+    search = filters.CharFilter(
+        field_name="message",
+        label=_("Search"),
+        help_text=_("Search the messages, the best matches first."),
+        method="filter_search",
+    )
+
     # period = filters.DateRangeFilter(
     #     field_name="created_at",
     #     label=_("Period"),
@@ -149,6 +258,49 @@ class AbstractFeedbackFilter(filters.FilterSet):
         
         return queryset.all()
 
+    def filter_sentiment(self, queryset: "FeedbackQuerySet", name: str, value: str) -> "FeedbackQuerySet":
+        if not analysis.is_supported(queryset.model):
+            return queryset
+
+        margin = analysis.NEUTRAL_MARGIN
+        try:
+            if int(value) == 3:
+                return queryset.filter(message_sentiment__gt=margin)
+            elif int(value) == 2:
+                return queryset.filter(message_sentiment__gte=-margin, message_sentiment__lte=margin)
+            elif int(value) == 1:
+                return queryset.filter(message_sentiment__lt=-margin)
+        except (ValueError, TypeError):
+            pass
+
+        return queryset.all()
+
+    def filter_moderation(self, queryset: "FeedbackQuerySet", name: str, value: str) -> "FeedbackQuerySet":
+        if not value or not moderation.is_supported(queryset.model):
+            return queryset
+
+        if value == "new":
+            return queryset.filter(moderation_status__isnull=True)
+        return queryset.filter(moderation_status=value)
+
+    def filter_cluster(self, queryset: "FeedbackQuerySet", name: str, value) -> "FeedbackQuerySet":
+        if value is None or not clusters.is_supported(queryset.model):
+            return queryset
+
+        return queryset.filter(message_cluster=value)
+
+    def filter_collapse(self, queryset: "FeedbackQuerySet", name: str, value: str) -> "FeedbackQuerySet":
+        if not value or not clusters.is_supported(queryset.model):
+            return queryset
+
+        return queryset.collapse_clusters()
+
+    def filter_search(self, queryset: "FeedbackQuerySet", name: str, value: str) -> "FeedbackQuerySet":
+        if not terms(value):
+            return queryset
+
+        return queryset.search(value).order_by("-search_rank", "-created_at")
+
     def filter_has_message(self, queryset: "FeedbackQuerySet", name: str, value: bool) -> "FeedbackQuerySet":
         try:
             if int(value) == 2:
@@ -159,4 +311,72 @@ class AbstractFeedbackFilter(filters.FilterSet):
             pass
         
         return queryset.all()
-    
\ No newline at end of file
+    
+
+class FeedbackReportFilter(filters.FilterSet):
+    """
+        Ranks the pages of the filtered feedback with a `PageReport` and filters the ranked rows.
+        `ordering` and `trend_days` choose the report, the other filters apply to its rows.
+        The ordering is applied by the keyset paginator of the view.
+    """
+
+    report_options = ("ordering", "trend_days")
+
+    min_votes = filters.NumberFilter(
+        field_name="total",
+        lookup_expr="gte",
+        label=_("Minimum Votes"),
+        help_text=_("Only rank pages with at least this amount of votes."),
+    )
+
+    ordering = filters.ChoiceFilter(
+        choices=[
+            ("most_positive", _("Most Positive")),
+            ("least_positive", _("Least Positive")),
+            ("most_votes", _("Most Votes")),
+            ("trending_up", _("Improving")),
+            ("trending_down", _("Declining")),
+            ("most_confident", _("Most Positive (Confident)")),
+            ("least_confident", _("Least Positive (Confident)")),
+        ],
+        label=_("Ordering"),
+        empty_label=_("Most Positive"),
+        help_text=_("The ordering of the pages."),
+    )
+
+    min_confidence = filters.NumberFilter(
+        field_name="wilson_lower",
+        lookup_expr="gte",
+        label=_("Minimum Confidence"),
+        help_text=_("Only rank pages which are at least this percentage positive with 95% confidence."),
+    )
+
+    trend_days = filters.NumberFilter(
+        label=_("Trend Days"),
+        help_text=_("Compare the last amount of days with the same amount of days before."),
+        min_value=1,
+        max_value=366,
+    )
+
+    def __init__(self, *args, summaries=None, end=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.summaries = summaries
+        self.end = end
+
+    def filter_queryset(self, queryset):
+        options = self.form.cleaned_data
+        trend_days = options.get("trend_days", None)
+
+        self.report = reports.PageReport(
+            queryset,
+            summaries=self.summaries,
+            ordering=options.get("ordering", None) or reports.DEFAULT_ORDERING,
+            trend_days=int(trend_days) if trend_days is not None else reports.DEFAULT_TREND_DAYS,
+            end=self.end,
+        )
+
+        queryset = self.report.rows()
+        for name, value in options.items():
+            if name not in self.report_options:
+                queryset = self.filters[name].filter(queryset, value)
+        return queryset
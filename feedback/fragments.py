@@ -0,0 +1,84 @@
+"""
+    Cache-safe rendering of the `{% feedback %}` widget.
+
+    The cached fragment only depends on the page revision and the active language.
+    Everything which differs per visitor (the CSRF token, whether they already voted)
+    is fetched by `feedback/js/feedback-state.js` from the `feedback:feedback_state` view,
+    so pages embedding the widget can be served from a full-page cache or a CDN.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpRequest
+from django.template import loader
+from django.utils import translation
+from wagtail.models import Page
+
+from . import registry
+
+
+FEEDBACK_TEMPLATE = "feedback/happy-sad.html"
+
+
+def get_config() -> dict | None:
+    return registry.get_setting("FEEDBACK_FRAGMENT_CACHE")
+
+
+def is_enabled() -> bool:
+    return get_config() is not None
+
+
+def get_cache():
+    return caches[get_config().get("CACHE", "default")]
+
+
+def cache_key(page: Page, revision_id: int = None, language: str = None) -> str:
+    if revision_id is None:
+        revision_id = page.live_revision_id
+
+    if language is None:
+        language = translation.get_language()
+
+    prefix = get_config().get("KEY_PREFIX", "feedback-fragment")
+    return f"{prefix}:{page.pk}:{revision_id}:{language}"
+
+
+def render(page: Page) -> str:
+    """
+        Render the widget without any request specific state.
+    """
+    return loader.render_to_string(FEEDBACK_TEMPLATE, {
+        "page": page,
+        "cacheable": True,
+    })
+
+
+def render_cached(page: Page, request: HttpRequest = None) -> str:
+    if getattr(request, "is_preview", False):
+        # Previews render a draft under the key of the live revision.
+        return render(page)
+
+    cache = get_cache()
+    key = cache_key(page)
+
+    html = cache.get(key, None)
+    if html is None:
+        html = render(page)
+        cache.set(key, html, get_config().get("TIMEOUT", 60 * 60))
+    return html
+
+
+def invalidate(page: Page, revision_id: int = None) -> None:
+    languages = {settings.LANGUAGE_CODE}
+    languages.update(code for code, _ in settings.LANGUAGES)
+    get_cache().delete_many([
+        cache_key(page, revision_id=revision_id, language=language)
+        for language in languages
+    ])
+
+
+def page_published_handler(sender, instance: Page, revision=None, **kwargs) -> None:
+    if not is_enabled():
+        return
+
+    # New revisions get a new key; this covers publishing an older revision again.
+    invalidate(instance, revision_id=revision.pk if revision else None)
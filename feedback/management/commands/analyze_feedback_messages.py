@@ -0,0 +1,71 @@
+import time
+from django.core.management.base import BaseCommand
+
+from ...analysis import analyze_messages
+
+
+class Command(BaseCommand):
+    help = "Detect the language, extract the keywords and score the sentiment of the feedback messages which are not analysed yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="The amount of worker processes, defaults to the amount of CPUs. 1 analyses in this process.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="The amount of messages to analyse and update per transaction.",
+        )
+        parser.add_argument(
+            "--reanalyze",
+            action="store_true",
+            help="Analyse all messages again, e.g. after changing FEEDBACK_MESSAGE_ANALYZER.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default=None,
+            help="A file recording an unfinished --reanalyze, so an interrupted reanalysis resumes instead of starting over.",
+        )
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="Keep running as a worker, analysing new messages every --interval seconds.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60,
+            help="The seconds to wait between runs with --watch.",
+        )
+
+    def handle(self, *args, workers=None, chunk_size=500, reanalyze=False, checkpoint=None, watch=False, interval=60, **options):
+        self.verbosity = options["verbosity"]
+        while True:
+            stats = analyze_messages(
+                chunk_size=chunk_size,
+                workers=workers,
+                reanalyze=reanalyze,
+                checkpoint=checkpoint,
+                progress=self.progress,
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"Analysed {stats['analyzed']} feedback messages in {stats['seconds']:.1f}s "
+                f"({stats['rows_per_second']:.0f} rows/s)."
+            ))
+
+            if not watch:
+                return
+
+            # Only the first run reanalyses, later runs pick up the new messages.
+            reanalyze = False
+            time.sleep(interval)
+
+    def progress(self, stats: dict):
+        if self.verbosity > 1:
+            self.stdout.write(
+                f"{stats['analyzed']} analysed, up to ID {stats['last_pk']} ({stats['rows_per_second']:.0f} rows/s)"
+            )
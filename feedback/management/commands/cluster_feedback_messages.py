@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from ...clusters import cluster_pending, rebuild_clusters
+
+
+class Command(BaseCommand):
+    help = "Group near-duplicate feedback messages into clusters, only the messages which are not clustered yet unless --rebuild is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Remove all clusters and cluster every message again.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="The amount of messages to cluster per transaction.",
+        )
+
+    def handle(self, *args, rebuild=False, batch_size=1000, **options):
+        if rebuild:
+            clustered = rebuild_clusters(batch_size=batch_size)
+        else:
+            clustered = cluster_pending(batch_size=batch_size)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Clustered {clustered} feedback messages."
+        ))
@@ -0,0 +1,102 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from ... import export, get_feedback_model
+from ...views.admin_api import FeedbackDateRangeFilterSet
+
+
+class Command(BaseCommand):
+    help = "Stream the feedback as CSV or NDJSON, using the same filters as the admin list."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            default="csv",
+            choices=list(export.EXPORT_FORMATS),
+            help="The format to export the feedback in.",
+        )
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="The file to write the export to, defaults to stdout.",
+        )
+        parser.add_argument(
+            "--page",
+            dest="pages",
+            action="append",
+            type=int,
+            help="Only export the feedback for this page ID (can be passed multiple times).",
+        )
+        parser.add_argument(
+            "--from",
+            dest="created_at_after",
+            help="Only export feedback created on or after this date (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--to",
+            dest="created_at_before",
+            help="Only export feedback created on or before this date (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--attitude",
+            choices=["positive", "negative"],
+            help="Only export positive or negative feedback.",
+        )
+        parser.add_argument(
+            "--has-message",
+            choices=["yes", "no"],
+            help="Only export feedback with or without a message.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=export.CHUNK_SIZE,
+            help="The amount of rows to fetch from the database at a time.",
+        )
+
+    def get_queryset(self, pages=None, **options):
+        Feedback = get_feedback_model()
+
+        query = QueryDict(mutable=True)
+        for key in ("created_at_after", "created_at_before"):
+            if options.get(key):
+                query[key] = options[key]
+
+        if options.get("attitude"):
+            query["attitude"] = "2" if options["attitude"] == "positive" else "1"
+
+        if options.get("has_message"):
+            query["by_message"] = "2" if options["has_message"] == "yes" else "1"
+
+        queryset = Feedback.objects.order_by("-created_at")
+        if pages:
+            queryset = queryset.filter(page_id__in=pages)
+
+        date_filter = FeedbackDateRangeFilterSet(query, queryset=queryset)
+        if not date_filter.is_valid():
+            raise CommandError(date_filter.errors.as_text())
+
+        filter_class = Feedback.get_filter_class()
+        return filter_class(query, queryset=date_filter.qs).qs
+
+    def handle(self, *args, format="csv", output=None, chunk_size=export.CHUNK_SIZE, **options):
+        queryset = self.get_queryset(**options)
+        rows = export.stream(queryset, format=format, chunk_size=chunk_size)
+
+        if output is None:
+            for line in rows:
+                self.stdout.write(line, ending="")
+            return
+
+        count = 0
+        with open(output, "w", encoding="utf-8", newline="") as f:
+            for line in rows:
+                f.write(line)
+                count += 1
+
+        if format == "csv":
+            count -= 1
+
+        self.stderr.write(self.style.SUCCESS(
+            f"Exported {count} feedback rows to {output}."
+        ))
@@ -0,0 +1,149 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from wagtail.models import Page
+
+from ...benchmarks import (
+    DEFAULT_BACKENDS,
+    SCENARIOS,
+    benchmark_backends,
+    benchmark_resolution,
+    compare,
+    run_suite,
+)
+
+
+class Command(BaseCommand):
+    help = "Benchmark the feedback duplicate detection backends, or the hot paths with --suite. Database changes are rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--visitors",
+            type=int,
+            default=10_000,
+            help="The amount of simulated visitors.",
+        )
+        parser.add_argument(
+            "--backend",
+            dest="backends",
+            action="append",
+            choices=list(DEFAULT_BACKENDS),
+            help="Only benchmark this backend (can be passed multiple times).",
+        )
+        parser.add_argument(
+            "--resolution",
+            action="store_true",
+            help="Benchmark the per request resolution of the backend, form class and hooks instead.",
+        )
+        parser.add_argument(
+            "--page",
+            type=int,
+            default=None,
+            help="The page ID to submit feedback for, defaults to the first live page.",
+        )
+        parser.add_argument(
+            "--suite",
+            action="store_true",
+            help="Run the benchmark suite of submissions, aggregation, listing and template rendering instead.",
+        )
+        parser.add_argument(
+            "--scenario",
+            dest="scenarios",
+            action="append",
+            choices=SCENARIOS,
+            help="Only run this scenario of the suite (can be passed multiple times).",
+        )
+        parser.add_argument(
+            "--rows",
+            dest="sizes",
+            type=int,
+            action="append",
+            help="The amount of feedback rows to aggregate and list (can be passed multiple times), defaults to 10000.",
+        )
+        parser.add_argument(
+            "--submissions",
+            type=int,
+            default=1000,
+            help="The amount of submissions per backend in the suite.",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=5,
+            help="How often every query of the suite is timed.",
+        )
+        parser.add_argument(
+            "--label",
+            default=None,
+            help="A label stored with the results, e.g. the commit.",
+        )
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="Write the results of the suite to this JSON file.",
+        )
+        parser.add_argument(
+            "--compare",
+            default=None,
+            help="A JSON file of an earlier run; fail when a result is more than --threshold slower.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="The fraction a result may be slower than in the --compare run.",
+        )
+
+    def handle(self, *args, visitors=10_000, backends=None, page=None, resolution=False, suite=False, **options):
+        if resolution:
+            results = benchmark_resolution(iterations=visitors)
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        pages = Page.objects.live()
+        page = pages.filter(pk=page).first() if page else pages.filter(depth__gt=1).first()
+        if page is None:
+            raise CommandError("No page to benchmark with.")
+
+        if suite:
+            return self.handle_suite(page, **options)
+
+        if backends:
+            backends = {name: DEFAULT_BACKENDS[name] for name in backends}
+
+        results = benchmark_backends(page, visitors=visitors, backends=backends)
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def handle_suite(self, page, scenarios=None, sizes=None, submissions=1000, iterations=5, label=None, output=None, threshold=0.2, **options):
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"]) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read {options['compare']}: {e}")
+
+        results = run_suite(
+            page,
+            scenarios=tuple(scenarios or SCENARIOS),
+            sizes=tuple(sizes or (10_000,)),
+            submissions=submissions,
+            iterations=iterations,
+            label=label,
+        )
+
+        data = json.dumps(results, indent=2)
+        if output:
+            with open(output, "w") as f:
+                f.write(data)
+        else:
+            self.stdout.write(data)
+
+        if baseline is None:
+            return
+
+        regressions = compare(baseline, results, threshold=threshold)
+        for regression in regressions:
+            self.stderr.write(json.dumps(regression))
+
+        if regressions:
+            raise CommandError(f"{len(regressions)} result(s) regressed by more than {threshold:.0%}.")
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from ... import partitioning
+
+
+class Command(BaseCommand):
+    help = "Manage the monthly partitions of the feedback table on PostgreSQL."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help="Convert the feedback table into monthly partitions first. Locks the table while copying.",
+        )
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=partitioning.MONTHS_AHEAD,
+            help="Create the partitions for this amount of months ahead.",
+        )
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=None,
+            help="Detach the partitions of months which ended more than this amount of months ago.",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop the detached partitions instead of keeping them as plain tables.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="The database to manage the partitions in.",
+        )
+
+    def handle(self, *args, convert=False, ahead=partitioning.MONTHS_AHEAD, retain_months=None, drop=False, database=DEFAULT_DB_ALIAS, **options):
+        if not partitioning.is_supported(database):
+            raise CommandError("Partitioning the feedback table requires PostgreSQL.")
+
+        if convert:
+            if partitioning.partition_feedback_table(months_ahead=ahead, using=database):
+                self.stdout.write(self.style.SUCCESS("Converted the feedback table into monthly partitions."))
+
+        if not partitioning.is_partitioned(using=database):
+            raise CommandError("The feedback table is not partitioned, pass --convert to convert it.")
+
+        created = partitioning.create_partitions(months_ahead=ahead, using=database)
+        self.stdout.write(self.style.SUCCESS(f"Created {len(created)} partitions."))
+
+        if retain_months is not None:
+            before = partitioning.add_months(partitioning.month_start(timezone.now()), -retain_months)
+            detached = partitioning.detach_partitions(before, drop=drop, using=database)
+            self.stdout.write(self.style.SUCCESS(
+                f"{'Dropped' if drop else 'Detached'} {len(detached)} partitions: {', '.join(detached) or '-'}"
+            ))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ... import registry
+from ...buffer import replay_spool
+
+
+class Command(BaseCommand):
+    help = "Insert the buffered feedback left behind in the spool files of stopped processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--spool-dir",
+            default=None,
+            help="The spool directory, defaults to FEEDBACK_WRITE_BUFFER['SPOOL_DIR'].",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="The amount of feedback to insert per query, defaults to FEEDBACK_WRITE_BUFFER['BATCH_SIZE'] or 100.",
+        )
+        parser.add_argument(
+            "--include-live",
+            action="store_true",
+            help="Also replay the spool files of processes which are still running.",
+        )
+
+    def handle(self, *args, spool_dir=None, batch_size=None, include_live=False, **options):
+        config = registry.get_setting("FEEDBACK_WRITE_BUFFER") or {}
+        spool_dir = spool_dir or config.get("SPOOL_DIR", None)
+        batch_size = batch_size or config.get("BATCH_SIZE", 100)
+        if not spool_dir:
+            raise CommandError("No spool directory configured.")
+
+        replayed = replay_spool(
+            spool_dir,
+            batch_size=batch_size,
+            include_live=include_live,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Inserted {replayed} buffered feedback submissions."
+        ))
@@ -0,0 +1,79 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from ... import get_feedback_model, has_field
+from ...retention import CHUNK_SIZE, clear_ip_addresses, cutoff, expired, policy, purge_feedback
+
+
+class Command(BaseCommand):
+    help = "Delete (or archive) the feedback older than the FEEDBACK_RETENTION policy and clear old IP addresses."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Purge the feedback older than this many days, defaults to FEEDBACK_RETENTION['DAYS'].",
+        )
+        parser.add_argument(
+            "--ip-address-days",
+            type=int,
+            default=None,
+            help="Clear the IP address of feedback older than this many days, defaults to FEEDBACK_RETENTION['IP_ADDRESS_DAYS'].",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            default=None,
+            help="Append the purged feedback to an NDJSON file in this directory, defaults to FEEDBACK_RETENTION['ARCHIVE_DIR'].",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="The amount of rows to delete or update per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only show how many rows would be purged.",
+        )
+
+    def handle(self, *args, days=None, ip_address_days=None, archive_dir=None, chunk_size=None, dry_run=False, **options):
+        self.verbosity = options["verbosity"]
+        config = policy()
+        days = days if days is not None else config.get("DAYS", None)
+        ip_address_days = ip_address_days if ip_address_days is not None else config.get("IP_ADDRESS_DAYS", None)
+        archive_dir = archive_dir or config.get("ARCHIVE_DIR", None)
+        chunk_size = chunk_size or config.get("CHUNK_SIZE", CHUNK_SIZE)
+
+        if days is None and ip_address_days is None:
+            raise CommandError("Nothing to purge, configure FEEDBACK_RETENTION or pass --days / --ip-address-days.")
+
+        if dry_run:
+            if days is not None:
+                self.stdout.write(f"{expired(days).count()} feedback rows created before {cutoff(days)} would be purged.")
+            if ip_address_days is not None and has_field(get_feedback_model(), "ip_address"):
+                self.stdout.write(
+                    f"{expired(ip_address_days).filter(ip_address__isnull=False).count()} IP addresses "
+                    f"of feedback created before {cutoff(ip_address_days)} would be cleared."
+                )
+            return
+
+        if days is not None:
+            try:
+                purged = purge_feedback(days, archive_dir=archive_dir, chunk_size=chunk_size, progress=self.progress)
+            except ImproperlyConfigured as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(
+                f"Purged {purged} feedback rows created before {cutoff(days)}."
+            ))
+
+        if ip_address_days is not None:
+            cleared = clear_ip_addresses(ip_address_days, chunk_size=chunk_size)
+            self.stdout.write(self.style.SUCCESS(
+                f"Cleared {cleared} IP addresses of feedback created before {cutoff(ip_address_days)}."
+            ))
+
+    def progress(self, stats: dict):
+        if self.verbosity > 1:
+            self.stdout.write(f"{stats['purged']} purged, up to ID {stats['last_pk']}")
@@ -0,0 +1,50 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from ...retention import rebuild_since
+from ...rollups import ROLLUP_PERIODS, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the pre-aggregated feedback rollups from the raw feedback rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page",
+            dest="pages",
+            action="append",
+            type=int,
+            help="Only rebuild the rollups for this page ID (can be passed multiple times).",
+        )
+        parser.add_argument(
+            "--period",
+            dest="periods",
+            action="append",
+            choices=ROLLUP_PERIODS,
+            help="Only rebuild the rollups for this period (can be passed multiple times).",
+        )
+        parser.add_argument(
+            "--since",
+            type=datetime.date.fromisoformat,
+            default=None,
+            help="Keep the counts from before this date (YYYY-MM-DD), e.g. of purged feedback. "
+                 "Defaults to the FEEDBACK_RETENTION cutoff.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="The amount of rollup rows to insert per query.",
+        )
+
+    def handle(self, *args, pages=None, periods=None, batch_size=1000, since=None, **options):
+        created = rebuild_rollups(
+            pages=pages,
+            periods=periods or ROLLUP_PERIODS,
+            batch_size=batch_size,
+            since=rebuild_since(since),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {created} feedback rollup rows."
+        ))
@@ -0,0 +1,42 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from ...retention import rebuild_since
+from ...summaries import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per page feedback summaries from the raw feedback rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page",
+            dest="pages",
+            action="append",
+            type=int,
+            help="Only rebuild the summary for this page ID (can be passed multiple times).",
+        )
+        parser.add_argument(
+            "--since",
+            type=datetime.date.fromisoformat,
+            default=None,
+            help="Keep the counts from before this date (YYYY-MM-DD), e.g. of purged feedback. "
+                 "Defaults to the FEEDBACK_RETENTION cutoff.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="The amount of summaries to insert per query.",
+        )
+
+    def handle(self, *args, pages=None, batch_size=1000, since=None, **options):
+        created = rebuild_summaries(
+            pages=pages,
+            batch_size=batch_size,
+            since=rebuild_since(since),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {created} page feedback summaries."
+        ))
@@ -0,0 +1,174 @@
+"""
+    Smoothed metrics for the aggregated feedback series and the page ranking.
+
+    - Cumulative counts: the running totals of the series.
+    - Moving positivity: the positive percentage over the buckets of the last 7 and 30 days.
+    - Wilson score intervals: the range the positive percentage lies in with 95% confidence,
+      given the amount of votes. Few votes give a wide interval, so ranking on the lower
+      bound favours pages which are positive *and* have enough votes to tell.
+
+    The series metrics are computed with window functions on PostgreSQL and in Python
+    (with prefix sums) on other databases.
+"""
+import bisect
+import datetime
+import math
+from itertools import accumulate
+
+from django.db import connections, models
+from django.db.models.functions import Cast, NullIf, Sqrt
+
+from . import buckets
+
+
+Z_95 = 1.96
+
+MOVING_WINDOWS = (7, 30)
+
+# Moving windows of days are meaningless for monthly and yearly buckets.
+MOVING_PERIODS = ("hour", "date")
+
+
+def percentage(positive: int, total: int) -> float | None:
+    if not total:
+        return None
+    return positive * 100.0 / total
+
+
+def wilson_interval(positive: int, total: int, z: float = Z_95) -> tuple[float | None, float | None]:
+    """
+        The lower and upper bound of the Wilson score interval, as percentages.
+    """
+    if not total:
+        return None, None
+
+    z2 = z * z
+    center = positive + z2 / 2
+    margin = z * math.sqrt(positive * (total - positive) / total + z2 / 4)
+    return (
+        (center - margin) * 100.0 / (total + z2),
+        (center + margin) * 100.0 / (total + z2),
+    )
+
+
+def wilson_bounds(positive, total, z: float = Z_95) -> tuple[models.Expression, models.Expression]:
+    """
+        `wilson_interval` as database expressions, `NULL` when there are no votes.
+    """
+    z2 = z * z
+    positive = Cast(positive, models.FloatField())
+    total = Cast(NullIf(total, 0), models.FloatField())
+
+    center = positive + models.Value(z2 / 2)
+    margin = models.Value(z) * Sqrt(positive * (total - positive) / total + models.Value(z2 / 4))
+    denominator = total + models.Value(z2)
+
+    return (
+        Cast((center - margin) * models.Value(100.0) / denominator, models.FloatField()),
+        Cast((center + margin) * models.Value(100.0) / denominator, models.FloatField()),
+    )
+
+
+def moving_frame(days: int, period: str) -> str:
+    # The buckets starting within `days` of the current one, including itself.
+    if period == "hour":
+        return f"{days * 24 - 1} hours"
+    return f"{days - 1} days"
+
+
+def metric_row(row: dict, cumulative_total: int, cumulative_positive: int, windows: dict[int, tuple[int, int]], z: float) -> dict:
+    row["cumulative_total"] = cumulative_total
+    row["cumulative_positive"] = cumulative_positive
+    row["cumulative_percentage"] = percentage(cumulative_positive, cumulative_total)
+    row["wilson_lower"], row["wilson_upper"] = wilson_interval(row["positive_count"], row["total"], z)
+
+    for days, (total, positive) in windows.items():
+        row[f"total_{days}d"] = total
+        row[f"positive_percentage_{days}d"] = percentage(positive, total)
+    return row
+
+
+def series(queryset, period: str, windows: tuple[int, ...] = MOVING_WINDOWS, z: float = Z_95) -> list[dict]:
+    """
+        The rows of an aggregated queryset (see `FeedbackQuerySet.aggregate_percentage`),
+        newest first, with the cumulative counts, moving positivity and Wilson interval of every bucket.
+    """
+    if period not in MOVING_PERIODS:
+        windows = ()
+
+    if connections[queryset.db].vendor == "postgresql":
+        return series_postgresql(queryset, period, windows, z)
+
+    return annotate_series(list(queryset.order_by("-bucket")), period, windows, z)
+
+
+def annotate_series(rows: list[dict], period: str, windows: tuple[int, ...] = MOVING_WINDOWS, z: float = Z_95) -> list[dict]:
+    """
+        Add the metrics of `series` to already fetched rows (newest first), e.g. a gap filled series.
+    """
+    if period not in MOVING_PERIODS:
+        windows = ()
+
+    chronological = rows[::-1]
+    starts = [buckets.to_local(row["bucket"]) for row in chronological]
+    totals = [0, *accumulate(row["total"] for row in chronological)]
+    positives = [0, *accumulate(row["positive_count"] for row in chronological)]
+
+    for index, row in enumerate(chronological):
+        end = index + 1
+        window_counts = {}
+        for days in windows:
+            start = bisect.bisect_right(starts, starts[index] - datetime.timedelta(days=days))
+            window_counts[days] = (totals[end] - totals[start], positives[end] - positives[start])
+
+        metric_row(row, totals[end], positives[end], window_counts, z)
+    return rows
+
+
+def series_postgresql(queryset, period: str, windows: tuple[int, ...], z: float) -> list[dict]:
+    sql, params = queryset.order_by().query.sql_with_params()
+
+    window_columns = []
+    for days in windows:
+        frame = f"ORDER BY bucket RANGE BETWEEN INTERVAL '{moving_frame(days, period)}' PRECEDING AND CURRENT ROW"
+        window_columns.append(f"SUM(total) OVER ({frame})")
+        window_columns.append(f"SUM(positive_count) OVER ({frame})")
+
+    query = f"""
+        WITH aggregated AS ({sql})
+        SELECT
+            bucket,
+            total,
+            positive_count,
+            negative_count,
+            positive_percentage,
+            negative_percentage,
+            {"".join(f"{column}, " for column in window_columns)}
+            SUM(total) OVER cumulative,
+            SUM(positive_count) OVER cumulative
+        FROM aggregated
+        WINDOW cumulative AS (ORDER BY bucket ROWS UNBOUNDED PRECEDING)
+        ORDER BY bucket DESC
+    """
+
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(query, params)
+        fetched = cursor.fetchall()
+
+    rows = []
+    for bucket, total, positive_count, negative_count, positive_percentage, negative_percentage, *sums in fetched:
+        *window_sums, cumulative_total, cumulative_positive = map(int, sums)
+        row = {
+            "bucket": buckets.from_local(bucket),
+            "total": total,
+            "positive_count": positive_count,
+            "negative_count": negative_count,
+            "positive_percentage": float(positive_percentage) if positive_percentage is not None else None,
+            "negative_percentage": float(negative_percentage) if negative_percentage is not None else None,
+        }
+        window_counts = {
+            days: (window_sums[index * 2], window_sums[index * 2 + 1])
+            for index, days in enumerate(windows)
+        }
+        rows.append(metric_row(row, cumulative_total, cumulative_positive, window_counts, z))
+    return rows
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.14 on 2026-10-18 09:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0001_initial'),
+        ('wagtailcore', '0089_log_entry_data_json_null_to_object'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedbackRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Hour'), ('date', 'Date'), ('month', 'Month'), ('year', 'Year')], help_text='The size of the time bucket.', max_length=5, verbose_name='Period')),
+                ('created_at', models.DateTimeField(help_text='The start of the time bucket.', verbose_name='Bucket')),
+                ('votes', models.IntegerField(default=0, verbose_name='Votes')),
+                ('positive_votes', models.IntegerField(default=0, verbose_name='Positive Votes')),
+                ('negative_votes', models.IntegerField(default=0, verbose_name='Negative Votes')),
+                ('messages', models.IntegerField(default=0, verbose_name='Messages')),
+                ('page', models.ForeignKey(help_text='The page the feedback is for.', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='wagtailcore.page', verbose_name='Page')),
+            ],
+            options={
+                'verbose_name': 'Feedback Rollup',
+                'verbose_name_plural': 'Feedback Rollups',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='feedbackrollup',
+            constraint=models.UniqueConstraint(fields=('page', 'period', 'created_at'), name='feedback_rollup_unique_bucket'),
+        ),
+    ]
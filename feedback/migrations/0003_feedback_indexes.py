@@ -0,0 +1,29 @@
+# Generated by Django 5.0.14 on 2026-10-18 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0002_feedbackrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['page', '-created_at'], name='feedback_page_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['page', 'positive', '-created_at'], name='feedback_page_pos_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(condition=models.Q(('message__isnull', True)), fields=['ip_address', 'page'], name='feedback_ip_page_vote_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(condition=models.Q(('message__isnull', False)), fields=['ip_address', 'page'], name='feedback_ip_page_message_idx'),
+        ),
+    ]
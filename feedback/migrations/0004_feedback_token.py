@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 09:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0003_feedback_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='token',
+            field=models.UUIDField(blank=True, editable=False, help_text='Identifies feedback submitted through the write buffer before it is saved.', null=True, unique=True, verbose_name='Token'),
+        ),
+    ]
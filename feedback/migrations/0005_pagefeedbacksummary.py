@@ -0,0 +1,55 @@
+# Generated by Django 5.0.14 on 2026-10-18 10:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_summaries(apps, schema_editor):
+    # Custom feedback models are summarized with `rebuild_feedback_summaries`.
+    if getattr(settings, "FEEDBACK_MODEL_NAME", "feedback.Feedback") != "feedback.Feedback":
+        return
+
+    Feedback = apps.get_model("feedback", "Feedback")
+    PageFeedbackSummary = apps.get_model("feedback", "PageFeedbackSummary")
+
+    rows = Feedback.objects.values("page_id").annotate(
+        votes=models.Count("id"),
+        positive_votes=models.Count("id", filter=models.Q(positive=True)),
+        negative_votes=models.Count("id", filter=models.Q(positive=False)),
+        messages=models.Count("id", filter=models.Q(message__isnull=False) & ~models.Q(message="")),
+        last_feedback_at=models.Max("created_at"),
+    ).order_by()
+
+    PageFeedbackSummary.objects.bulk_create(
+        (PageFeedbackSummary(**row) for row in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0004_feedback_token'),
+        ('wagtailcore', '0089_log_entry_data_json_null_to_object'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageFeedbackSummary',
+            fields=[
+                ('page', models.OneToOneField(help_text='The page the feedback is for.', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='wagtailcore.page', verbose_name='Page')),
+                ('votes', models.IntegerField(default=0, verbose_name='Votes')),
+                ('positive_votes', models.IntegerField(default=0, verbose_name='Positive Votes')),
+                ('negative_votes', models.IntegerField(default=0, verbose_name='Negative Votes')),
+                ('messages', models.IntegerField(default=0, verbose_name='Messages')),
+                ('last_feedback_at', models.DateTimeField(blank=True, help_text='The time the most recent feedback was created.', null=True, verbose_name='Last Feedback At')),
+            ],
+            options={
+                'verbose_name': 'Page Feedback Summary',
+                'verbose_name_plural': 'Page Feedback Summaries',
+                'indexes': [models.Index(fields=['-last_feedback_at'], name='feedback_summary_last_idx')],
+            },
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.14 on 2026-10-18 10:40
+
+from django.db import migrations
+
+from feedback import search
+
+
+def install_search(apps, schema_editor):
+    search.install(schema_editor, apps.get_model("feedback", "Feedback"))
+
+
+def uninstall_search(apps, schema_editor):
+    search.uninstall(schema_editor, apps.get_model("feedback", "Feedback"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0005_pagefeedbacksummary'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search, uninstall_search),
+    ]
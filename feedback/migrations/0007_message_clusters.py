@@ -0,0 +1,57 @@
+# Generated by Django 5.0.14 on 2026-10-18 10:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0006_feedback_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessageCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('signature', models.BinaryField(help_text='The MinHash signature of the first message of the cluster.', verbose_name='Signature')),
+                ('size', models.IntegerField(default=0, help_text='The amount of messages in the cluster.', verbose_name='Size')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='The time the cluster was created.', verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'Message Cluster',
+                'verbose_name_plural': 'Message Clusters',
+            },
+        ),
+        migrations.CreateModel(
+            name='MessageClusterBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField(verbose_name='Band')),
+                ('bucket', models.BigIntegerField(help_text='The hash of the band.', verbose_name='Bucket')),
+            ],
+            options={
+                'verbose_name': 'Message Cluster Band',
+                'verbose_name_plural': 'Message Cluster Bands',
+            },
+        ),
+        migrations.AddField(
+            model_name='feedback',
+            name='message_cluster',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, help_text='The cluster of near-duplicate messages this message belongs to.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='feedback.messagecluster', verbose_name='Message Cluster'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['message_cluster', '-created_at'], name='feedback_cluster_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='messageclusterband',
+            name='cluster',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='feedback.messagecluster', verbose_name='Cluster'),
+        ),
+        migrations.AddIndex(
+            model_name='messageclusterband',
+            index=models.Index(fields=['bucket'], name='feedback_cluster_band_idx'),
+        ),
+    ]
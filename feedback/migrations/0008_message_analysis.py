@@ -0,0 +1,37 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0007_message_clusters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='analyzed_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='The time the message was analyzed.', null=True, verbose_name='Analyzed At'),
+        ),
+        migrations.AddField(
+            model_name='feedback',
+            name='message_keywords',
+            field=models.JSONField(blank=True, editable=False, help_text='The most frequent words of the message.', null=True, verbose_name='Message Keywords'),
+        ),
+        migrations.AddField(
+            model_name='feedback',
+            name='message_language',
+            field=models.CharField(blank=True, editable=False, help_text='The detected language of the message.', max_length=8, null=True, verbose_name='Message Language'),
+        ),
+        migrations.AddField(
+            model_name='feedback',
+            name='message_sentiment',
+            field=models.FloatField(blank=True, editable=False, help_text='From -1 (negative) to 1 (positive), computed from a lexicon.', null=True, verbose_name='Message Sentiment'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(condition=models.Q(('analyzed_at__isnull', True), ('message__isnull', False)), fields=['id'], name='feedback_unanalyzed_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0008_message_analysis'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='moderation_status',
+            field=models.CharField(blank=True, choices=[('reviewed', 'Reviewed'), ('spam', 'Spam')], help_text='How a moderator marked the feedback.', max_length=16, null=True, verbose_name='Moderation Status'),
+        ),
+    ]
@@ -3,7 +3,6 @@ from django.db import models
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django.utils.functional import classproperty
-from django.utils.module_loading import import_string
 
 from wagtail.models import Page
 from wagtail.admin.panels import (
@@ -12,33 +11,65 @@ from wagtail.admin.panels import (
     ObjectList,
 )
 
-from .options import (
-    FEEDBACK_FORM_CLASS,
-    FEEDBACK_FILTER_CLASS,
-)
+from . import buckets, metrics, registry, search
 
 if TYPE_CHECKING:
     from feedback.filters import AbstractFeedbackFilter
     from feedback.forms import AbstractFeedbackForm
 
 
-class FeedbackQuerySet(models.QuerySet):
+class AbstractFeedbackQuerySet(models.QuerySet):
+    """
+        The aggregation shared by the raw feedback and the `FeedbackRollup` buckets.
+        Subclasses define `positive`, `negative` and `percentages`.
+    """
     default_period: Union[L['hour'], L['date'], L["month"], L["year"]] = "hour"
 
+    # Attributes set on the queryset by `aggregate_percentage` and `bounded`
+    # which must survive chaining (FilterSet.qs always clones the queryset).
+    carried_attributes: tuple[str, ...] = ("period", "hours", "date_bounded")
+
+    def _clone(self):
+        clone = super()._clone()
+        for attr in self.carried_attributes:
+            if attr in self.__dict__:
+                setattr(clone, attr, self.__dict__[attr])
+        return clone
+
     def positive(self):
-        return self.filter(positive=True)
-    
+        raise NotImplementedError
+
     def negative(self):
-        return self.filter(positive=False)
-    
+        raise NotImplementedError
+
     def for_page(self, page):
         return self.filter(page=page)
-    
-    def percentages(self):
+
+    def created_between(self, start=None, end=None):
+        """
+            Created from `start` up to (not including) `end`.
+            Plain range conditions on `created_at`, so PostgreSQL can prune partitions.
+        """
+        qs = self
+        if start is not None:
+            qs = qs.filter(created_at__gte=start)
+        if end is not None:
+            qs = qs.filter(created_at__lt=end)
+        return qs
+
+    def bounded(self):
+        """
+            Mark the queryset as filtered by a creation date range.
+        """
+        qs = self._chain()
+        qs.date_bounded = True
+        return qs
+
+    def with_percentages(self, total, positive_count, negative_count):
         return self.annotate(
-            total=models.Count('id'),
-            positive_count=models.Count('id', filter=models.Q(positive=True)),
-            negative_count=models.Count('id', filter=models.Q(positive=False)),
+            total=total,
+            positive_count=positive_count,
+            negative_count=negative_count,
         ).annotate(
             positive_percentage=models.ExpressionWrapper(
                 models.F('positive_count') * 100.0 / models.F('total'),
@@ -50,7 +81,20 @@ class FeedbackQuerySet(models.QuerySet):
             ),
         )
     
+    def percentages(self):
+        raise NotImplementedError
+
+    def aggregate_source(self, period: str):
+        """
+            The queryset the aggregation for `period` is computed from.
+        """
+        return self
+    
     def aggregate_percentage(self, date_arg: Union[L['hour'], L['date'], L["month"], L["year"]] = None, extra_values_args: list[str] = None):
+        """
+            Group by the start of every `date_arg` bucket (`bucket`) in the current
+            timezone, newest first. Buckets without feedback are left out, see `fill_gaps`.
+        """
         if extra_values_args is None:
             extra_values_args = []
 
@@ -59,38 +103,142 @@ class FeedbackQuerySet(models.QuerySet):
         if filter_by is None:
             filter_by = self.default_period
 
-        values_args = []
-        hours = filter_by == "hour"
-        if hours:
-            filter_by = "date"
-            values_args.append(f"created_at__{filter_by}")
-            values_args.append("created_at__hour")
-        else:
-            values_args.append(f"created_at__{filter_by}")
-        
-        values_args.extend(extra_values_args)
+        source = self.aggregate_source(filter_by)
 
-        qs = self.values(*values_args).percentages()
+        qs = source.annotate(
+            bucket=buckets.trunc(filter_by),
+        ).values("bucket", *extra_values_args).percentages()
 
-        if hours:
-            qs = qs.order_by(f"-created_at__{filter_by}", "-created_at__hour")
-        else:
-            qs = qs.order_by(f"-created_at__{filter_by}")
+        qs = qs.order_by("-bucket")
 
         setattr(qs, "period", filter_by)
-        setattr(qs, "hours", hours)
+        setattr(qs, "hours", filter_by == "hour")
+        return qs
+
+    def fill_gaps(self, start=None, end=None) -> list[dict]:
+        """
+            The rows of `aggregate_percentage` with an empty row for every bucket without feedback.
+        """
+        return buckets.fill_gaps(self, self.period, start=start, end=end)
+
+    def trends(self, windows: tuple[int, ...] = metrics.MOVING_WINDOWS, z: float = metrics.Z_95) -> list[dict]:
+        """
+            The rows of `aggregate_percentage` with cumulative counts, moving positivity
+            over `windows` (in days) and the Wilson score interval of every bucket.
+        """
+        return metrics.series(self, self.period, windows=windows, z=z)
+
+
+class FeedbackQuerySet(AbstractFeedbackQuerySet):
+
+    def positive(self):
+        return self.filter(positive=True)
+
+    def negative(self):
+        return self.filter(positive=False)
+
+    def search(self, query: str):
+        """
+            Full-text search on the message, annotated with `search_rank` and `search_headline`.
+        """
+        return search.search(self, query)
+
+    def collapse_clusters(self):
+        """
+            Only the newest feedback of every cluster of near-duplicate messages
+            (see `feedback.clusters`), annotated with the `cluster_size`.
+        """
+        newest = self.filter(
+            message_cluster=models.OuterRef("message_cluster"),
+        ).order_by("-created_at", "-pk").values("pk")[:1]
+
+        return self.filter(
+            models.Q(message_cluster__isnull=True) | models.Q(pk=models.Subquery(newest)),
+        ).annotate(
+            cluster_size=models.F("message_cluster__size"),
+        )
+
+    def percentages(self):
+        return self.with_percentages(
+            total=models.Count('id'),
+            positive_count=models.Count('id', filter=models.Q(positive=True)),
+            negative_count=models.Count('id', filter=models.Q(positive=False)),
+        )
+
+
+class FeedbackRollupQuerySet(AbstractFeedbackQuerySet):
+    carried_attributes = (*AbstractFeedbackQuerySet.carried_attributes, "attitude")
+
+    # The votes `percentages` counts: `None` for all of them, or "positive" / "negative".
+    attitude: Union[L["positive"], L["negative"], None] = None
+
+    def positive(self):
+        """
+            Only count the positive votes of the buckets, like filtering the raw feedback on `positive`.
+        """
+        qs = self.filter(positive_votes__gt=0)
+        qs.attitude = "positive"
         return qs
 
+    def negative(self):
+        """
+            Only count the negative votes of the buckets, like filtering the raw feedback on `positive`.
+        """
+        qs = self.filter(negative_votes__gt=0)
+        qs.attitude = "negative"
+        return qs
+
+    def for_period(self, period: str):
+        return self.filter(period=period)
+
+    def percentages(self):
+        if self.attitude == "positive":
+            return self.with_percentages(
+                total=models.Sum('positive_votes'),
+                positive_count=models.Sum('positive_votes'),
+                negative_count=models.Value(0),
+            )
+
+        if self.attitude == "negative":
+            return self.with_percentages(
+                total=models.Sum('negative_votes'),
+                positive_count=models.Value(0),
+                negative_count=models.Sum('negative_votes'),
+            )
+
+        return self.with_percentages(
+            total=models.Sum('votes'),
+            positive_count=models.Sum('positive_votes'),
+            negative_count=models.Sum('negative_votes'),
+        )
+
+    def aggregate_source(self, period: str):
+        # Month and year buckets might only partially overlap the requested
+        # date range; fall back to the daily buckets when a range is applied.
+        if getattr(self, "date_bounded", False) and period in ("month", "year"):
+            period = "date"
+        return self.for_period(period)
+
 
 class AbstractFeedback(models.Model):
-    FEEDBACK_FORM_CLASS = FEEDBACK_FORM_CLASS
-    FEEDBACK_FILTER_CLASS = FEEDBACK_FILTER_CLASS
+    # Defaults to the `FEEDBACK_FORM_CLASS` and `FEEDBACK_FILTER_CLASS` settings.
+    FEEDBACK_FORM_CLASS = None
+    FEEDBACK_FILTER_CLASS = None
 
     panel_tabs: list[tuple[str, str]] = [
         ("content_panels", _("Content")),
         ("metadata_panels", _("Metadata")),
     ]
 
+    # Columns written by the CSV / NDJSON export.
+    export_fields: list[str] = [
+        "id",
+        "page_id",
+        "positive",
+        "message",
+        "created_at",
+    ]
+
     positive = models.BooleanField(
         blank=False,
         null=False,
@@ -138,12 +286,13 @@ class AbstractFeedback(models.Model):
         return {
             "id": instance.pk,
             "page": instance.page_id,
+            "positive": instance.positive,
             "message": instance.message,
             "created_at": instance.created_at,
             "urls": {
-                "list":      reverse("feedback_api_list"),
+                "list":      reverse("feedback_api"),
                 "page_list": reverse("page_feedback_api", kwargs={"page_pk": instance.page_id}),
-                "view":      reverse("feedback_api_detail", kwargs={"page_pk": instance.page_id, "pk": instance.pk}),
+                "view":      reverse("feedback_api_detail", kwargs={"pk": instance.pk}),
                 "detail":    reverse("feedback_api_detail", kwargs={"pk": instance.pk}),
                 "delete":    reverse("feedback_api_delete", kwargs={"pk": instance.pk}),
             },
@@ -151,17 +300,11 @@ class AbstractFeedback(models.Model):
     
     @classmethod
     def get_filter_class(cls) -> Type["AbstractFeedbackFilter"]:
-        filter_class = cls.FEEDBACK_FILTER_CLASS
-        if isinstance(filter_class, str):
-            filter_class = import_string(filter_class)
-        return filter_class
+        return registry.resolve(cls.FEEDBACK_FILTER_CLASS or registry.get_setting("FEEDBACK_FILTER_CLASS"))
 
     @classmethod
     def get_form_class(cls) -> Type["AbstractFeedbackForm"]:
-        form_class = cls.FEEDBACK_FORM_CLASS
-        if isinstance(form_class, str):
-            form_class = import_string(form_class)
-        return form_class
+        return registry.resolve(cls.FEEDBACK_FORM_CLASS or registry.get_setting("FEEDBACK_FORM_CLASS"))
 
     def __str__(self):
         if self.message and len(self.message) > 50:
@@ -222,6 +365,12 @@ class AbstractFeedback(models.Model):
         return TabbedInterface(tabs, **cls.edit_handler_kwargs())
 
 
+MODERATION_CHOICES = [
+    ("reviewed", _("Reviewed")),
+    ("spam", _("Spam")),
+]
+
+
 class Feedback(AbstractFeedback):
     ip_address = models.GenericIPAddressField(
         blank=True,
@@ -229,9 +378,70 @@ class Feedback(AbstractFeedback):
         verbose_name=_("IP Address"),
         help_text=_("The IP address of the feedback."),
     )
+    token = models.UUIDField(
+        blank=True,
+        null=True,
+        unique=True,
+        editable=False,
+        verbose_name=_("Token"),
+        help_text=_("Identifies feedback submitted through the write buffer before it is saved."),
+    )
+    message_cluster = models.ForeignKey(
+        "feedback.MessageCluster",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        editable=False,
+        db_index=False,
+        related_name="+",
+        verbose_name=_("Message Cluster"),
+        help_text=_("The cluster of near-duplicate messages this message belongs to."),
+    )
+    message_language = models.CharField(
+        max_length=8,
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name=_("Message Language"),
+        help_text=_("The detected language of the message."),
+    )
+    message_keywords = models.JSONField(
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name=_("Message Keywords"),
+        help_text=_("The most frequent words of the message."),
+    )
+    message_sentiment = models.FloatField(
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name=_("Message Sentiment"),
+        help_text=_("From -1 (negative) to 1 (positive), computed from a lexicon."),
+    )
+    analyzed_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name=_("Analyzed At"),
+        help_text=_("The time the message was analyzed."),
+    )
+    moderation_status = models.CharField(
+        max_length=16,
+        blank=True,
+        null=True,
+        choices=MODERATION_CHOICES,
+        verbose_name=_("Moderation Status"),
+        help_text=_("How a moderator marked the feedback."),
+    )
 
     metadata_panels = AbstractFeedback.metadata_panels + [
         FieldPanel("ip_address"),
+        FieldPanel("moderation_status"),
+    ]
+
+    export_fields = AbstractFeedback.export_fields + [
+        "ip_address",
     ]
 
     objects: FeedbackQuerySet = FeedbackQuerySet.as_manager()
@@ -240,10 +450,239 @@ class Feedback(AbstractFeedback):
         verbose_name = _("Feedback")
         verbose_name_plural = _("Feedback")
         ordering = ["-created_at"]
+        indexes = [
+            # Listing and aggregating the feedback of a page.
+            models.Index(
+                fields=["page", "-created_at"],
+                name="feedback_page_created_idx",
+            ),
+            # Listing filtered by attitude.
+            models.Index(
+                fields=["page", "positive", "-created_at"],
+                name="feedback_page_pos_created_idx",
+            ),
+            # IPBasedFeedbackend.is_duplicate for votes and for messages.
+            models.Index(
+                fields=["ip_address", "page"],
+                condition=models.Q(message__isnull=True),
+                name="feedback_ip_page_vote_idx",
+            ),
+            models.Index(
+                fields=["ip_address", "page"],
+                condition=models.Q(message__isnull=False),
+                name="feedback_ip_page_message_idx",
+            ),
+            # Listing a cluster and collapsing clusters to their newest message.
+            models.Index(
+                fields=["message_cluster", "-created_at"],
+                name="feedback_cluster_created_idx",
+            ),
+            # The messages `analyze_feedback_messages` has yet to analyse.
+            models.Index(
+                fields=["id"],
+                condition=models.Q(analyzed_at__isnull=True, message__isnull=False),
+                name="feedback_unanalyzed_idx",
+            ),
+        ]
 
+    @classmethod
     def serialize(cls, instance: Self):
         return super().serialize(instance) | {
             "ip_address": instance.ip_address,
+            "message_cluster": instance.message_cluster_id,
+            "message_language": instance.message_language,
+            "message_keywords": instance.message_keywords,
+            "message_sentiment": instance.message_sentiment,
+            "moderation_status": instance.moderation_status,
         }
 
-    
\ No newline at end of file
+    
+
+class FeedbackRollup(models.Model):
+    """
+        Pre-aggregated feedback counters per page and time bucket.
+        Maintained incrementally by `feedback.rollups` and rebuilt
+        with the `rebuild_feedback_rollups` management command.
+    """
+    PERIOD_CHOICES = [
+        ("hour", _("Hour")),
+        ("date", _("Date")),
+        ("month", _("Month")),
+        ("year", _("Year")),
+    ]
+
+    page = models.ForeignKey(
+        "wagtailcore.Page",
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name=_("Page"),
+        help_text=_("The page the feedback is for."),
+    )
+    period = models.CharField(
+        max_length=5,
+        choices=PERIOD_CHOICES,
+        verbose_name=_("Period"),
+        help_text=_("The size of the time bucket."),
+    )
+    created_at = models.DateTimeField(
+        verbose_name=_("Bucket"),
+        help_text=_("The start of the time bucket."),
+    )
+    votes = models.IntegerField(
+        default=0,
+        verbose_name=_("Votes"),
+    )
+    positive_votes = models.IntegerField(
+        default=0,
+        verbose_name=_("Positive Votes"),
+    )
+    negative_votes = models.IntegerField(
+        default=0,
+        verbose_name=_("Negative Votes"),
+    )
+    messages = models.IntegerField(
+        default=0,
+        verbose_name=_("Messages"),
+    )
+
+    objects: FeedbackRollupQuerySet = FeedbackRollupQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("Feedback Rollup")
+        verbose_name_plural = _("Feedback Rollups")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["page", "period", "created_at"],
+                name="feedback_rollup_unique_bucket",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_period_display()} {self.created_at} ({self.page_id})"
+
+
+class PageFeedbackSummaryQuerySet(models.QuerySet):
+
+    def with_feedback(self):
+        return self.filter(votes__gt=0)
+
+
+class PageFeedbackSummary(models.Model):
+    """
+        The feedback totals of a page, kept current by `feedback.summaries`
+        and rebuilt with the `rebuild_feedback_summaries` management command.
+    """
+    page = models.OneToOneField(
+        "wagtailcore.Page",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="+",
+        verbose_name=_("Page"),
+        help_text=_("The page the feedback is for."),
+    )
+    votes = models.IntegerField(
+        default=0,
+        verbose_name=_("Votes"),
+    )
+    positive_votes = models.IntegerField(
+        default=0,
+        verbose_name=_("Positive Votes"),
+    )
+    negative_votes = models.IntegerField(
+        default=0,
+        verbose_name=_("Negative Votes"),
+    )
+    messages = models.IntegerField(
+        default=0,
+        verbose_name=_("Messages"),
+    )
+    last_feedback_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name=_("Last Feedback At"),
+        help_text=_("The time the most recent feedback was created."),
+    )
+
+    objects: PageFeedbackSummaryQuerySet = PageFeedbackSummaryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("Page Feedback Summary")
+        verbose_name_plural = _("Page Feedback Summaries")
+        indexes = [
+            models.Index(
+                fields=["-last_feedback_at"],
+                name="feedback_summary_last_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.page_id}: {self.positive_votes}/{self.votes}"
+
+    @property
+    def positive_percentage(self) -> float:
+        if not self.votes:
+            return 0.0
+        return self.positive_votes * 100.0 / self.votes
+
+    @property
+    def negative_percentage(self) -> float:
+        if not self.votes:
+            return 0.0
+        return 100.0 - self.positive_percentage
+
+
+class MessageCluster(models.Model):
+    """
+        Near-duplicate feedback messages, grouped by `feedback.clusters`
+        and rebuilt with the `cluster_feedback_messages` management command.
+    """
+    signature = models.BinaryField(
+        verbose_name=_("Signature"),
+        help_text=_("The MinHash signature of the first message of the cluster."),
+    )
+    size = models.IntegerField(
+        default=0,
+        verbose_name=_("Size"),
+        help_text=_("The amount of messages in the cluster."),
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Created At"),
+        help_text=_("The time the cluster was created."),
+    )
+
+    class Meta:
+        verbose_name = _("Message Cluster")
+        verbose_name_plural = _("Message Clusters")
+
+    def __str__(self):
+        return f"{self.pk}: {self.size}"
+
+
+class MessageClusterBand(models.Model):
+    """
+        The hash of one LSH band of the signature of a `MessageCluster`.
+    """
+    cluster = models.ForeignKey(
+        MessageCluster,
+        on_delete=models.CASCADE,
+        related_name="bands",
+        verbose_name=_("Cluster"),
+    )
+    band = models.PositiveSmallIntegerField(
+        verbose_name=_("Band"),
+    )
+    bucket = models.BigIntegerField(
+        verbose_name=_("Bucket"),
+        help_text=_("The hash of the band."),
+    )
+
+    class Meta:
+        verbose_name = _("Message Cluster Band")
+        verbose_name_plural = _("Message Cluster Bands")
+        indexes = [
+            models.Index(
+                fields=["bucket"],
+                name="feedback_cluster_band_idx",
+            ),
+        ]
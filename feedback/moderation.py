@@ -0,0 +1,98 @@
+"""
+    Bulk actions on the feedback matching the admin list filters (or a list of IDs):
+    deleting it, or marking it as reviewed or spam.
+
+    The matching rows are processed in chunks of primary keys, each chunk in its own
+    transaction with set-based queries, so cleaning up a spam wave neither holds one
+    long transaction nor costs a request per row. Deleting keeps the rollups, summaries,
+    message clusters and cached counts current.
+"""
+from typing import Iterator
+
+from django.db import models, transaction
+
+from . import get_feedback_model, has_field, tracking
+
+
+CHUNK_SIZE = 500
+
+DELETE = "delete"
+UNMARK = "unmark"
+
+# The actions and the `moderation_status` they set.
+MARK_ACTIONS = {
+    "reviewed": "reviewed",
+    "spam": "spam",
+    UNMARK: None,
+}
+
+ACTIONS = (DELETE, *MARK_ACTIONS)
+
+
+def is_supported(model: type[models.Model]) -> bool:
+    return has_field(model, "moderation_status")
+
+
+def available_actions(model: type[models.Model]) -> tuple[str, ...]:
+    """
+        Only `delete` for feedback models without a `moderation_status` field.
+    """
+    if not is_supported(model):
+        return (DELETE,)
+    return ACTIONS
+
+
+def required_permission(action: str) -> str:
+    """
+        Deleting requires `feedback.delete_feedback`, marking `feedback.change_feedback`.
+    """
+    if action == DELETE:
+        return "feedback.delete_feedback"
+    return "feedback.change_feedback"
+
+
+def page_ids(queryset) -> set[int]:
+    """
+        The distinct pages of the feedback in `queryset`.
+    """
+    return set(queryset.order_by().values_list("page_id", flat=True).distinct())
+
+
+def delete_chunk(pks: list[int]) -> int:
+    Feedback = get_feedback_model()
+    with transaction.atomic():
+        instances = list(Feedback.objects.filter(pk__in=pks))
+        tracking.discard_feedback_batch(instances)
+        Feedback.objects.filter(pk__in=pks).delete()
+    return len(instances)
+
+
+def mark_chunk(pks: list[int], status: str | None) -> int:
+    Feedback = get_feedback_model()
+    with transaction.atomic():
+        return Feedback.objects.filter(pk__in=pks).update(moderation_status=status)
+
+
+def run(queryset, action: str, chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """
+        Apply `action` to the feedback in `queryset`, yielding the progress after every chunk.
+    """
+    if action not in available_actions(queryset.model):
+        raise ValueError(f"Unknown bulk action: {action!r}")
+
+    # Paged by primary key, the rows are deleted or changed while paging.
+    pending = queryset.order_by("pk").values_list("pk", flat=True)
+    progress = {
+        "action": action,
+        "total": pending.count(),
+        "processed": 0,
+    }
+
+    last = None
+    while pks := list((pending if last is None else pending.filter(pk__gt=last))[:chunk_size]):
+        last = pks[-1]
+        if action == DELETE:
+            progress["processed"] += delete_chunk(pks)
+        else:
+            progress["processed"] += mark_chunk(pks, MARK_ACTIONS[action])
+        yield dict(progress)
@@ -12,3 +12,27 @@ FEEDBACK_BACKEND = getattr(settings, "FEEDBACK_BACKEND", {
     }
 })
 IS_PROXIED = getattr(settings, "USE_X_FORWARDED_HOST", False)
+FEEDBACK_USE_ROLLUPS = getattr(settings, "FEEDBACK_USE_ROLLUPS", False)
+FEEDBACK_WRITE_BUFFER = getattr(settings, "FEEDBACK_WRITE_BUFFER", None)
+FEEDBACK_CURSOR_PAGINATION = getattr(settings, "FEEDBACK_CURSOR_PAGINATION", False)
+FEEDBACK_COUNT_STRATEGY = getattr(settings, "FEEDBACK_COUNT_STRATEGY", {
+    "CLASS": "feedback.counting.ExactCount",
+    "OPTIONS": {
+        # ...
+    }
+})
+FEEDBACK_FRAGMENT_CACHE = getattr(settings, "FEEDBACK_FRAGMENT_CACHE", None)
+FEEDBACK_PAGE_CACHE = getattr(settings, "FEEDBACK_PAGE_CACHE", {
+    "CACHE": "default",
+    "TIMEOUT": 60 * 5,
+})
+FEEDBACK_ASYNC_VIEWS = getattr(settings, "FEEDBACK_ASYNC_VIEWS", False)
+FEEDBACK_SEARCH_CONFIG = getattr(settings, "FEEDBACK_SEARCH_CONFIG", "simple")
+FEEDBACK_CLUSTER_THRESHOLD = getattr(settings, "FEEDBACK_CLUSTER_THRESHOLD", 0.8)
+FEEDBACK_MESSAGE_ANALYZER = getattr(settings, "FEEDBACK_MESSAGE_ANALYZER", "feedback.analysis.analyze_message")
+FEEDBACK_RETENTION = getattr(settings, "FEEDBACK_RETENTION", {
+    "DAYS": None,
+    "IP_ADDRESS_DAYS": None,
+    "ARCHIVE_DIR": None,
+    "CHUNK_SIZE": 1000,
+})
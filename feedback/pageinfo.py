@@ -0,0 +1,89 @@
+"""
+    A cached lookup of the page attributes a vote depends on.
+
+    Submitting a vote only needs to know whether the page is live and public,
+    whether positive votes may add a message and whether the page checks
+    duplicates itself. Loading the specific page for that costs two queries,
+    so the answer is cached per page and dropped when the page is published,
+    unpublished or deleted.
+"""
+from typing import NamedTuple
+
+from django.core.cache import caches
+from wagtail.models import Page
+
+from . import registry
+
+
+class PageInfo(NamedTuple):
+    pk: int
+    allow_positive_message: bool
+    # Whether the specific page implements the duplicate checks of `FeedbackendPageMixin`.
+    has_feedback_checks: bool
+
+
+# Cached for pages which cannot receive feedback, so they are not looked up again.
+MISSING = 0
+
+
+def get_config() -> dict:
+    return registry.get_setting("FEEDBACK_PAGE_CACHE")
+
+
+def get_cache():
+    return caches[get_config().get("CACHE", "default")]
+
+
+def cache_key(page_pk: int) -> str:
+    prefix = get_config().get("KEY_PREFIX", "feedback-page")
+    return f"{prefix}:{page_pk}"
+
+
+def allows_positive_message(page: Page) -> bool:
+    return hasattr(page, "allow_feedback_message_on_positive")\
+        and page.allow_feedback_message_on_positive()
+
+
+def has_feedback_checks(page: Page) -> bool:
+    return hasattr(page, "check_for_feedback_duplicate")\
+        or hasattr(page, "end_feedback_check")
+
+
+def load_page_info(page_pk: int) -> PageInfo | None:
+    page = Page.objects.live().public().filter(pk=page_pk).specific().first()
+    if page is None:
+        return None
+
+    return PageInfo(
+        pk=page.pk,
+        allow_positive_message=allows_positive_message(page),
+        has_feedback_checks=has_feedback_checks(page),
+    )
+
+
+def get_page_info(page_pk: int) -> PageInfo | None:
+    """
+        Returns `None` for pages which do not exist or are not live and public.
+    """
+    cache = get_cache()
+    key = cache_key(page_pk)
+
+    value = cache.get(key, None)
+    if value is None:
+        info = load_page_info(page_pk)
+        cache.set(key, tuple(info) if info else MISSING, get_config().get("TIMEOUT", 60 * 5))
+        return info
+
+    if value == MISSING:
+        return None
+
+    return PageInfo(*value)
+
+
+def invalidate(page_pk: int) -> None:
+    get_cache().delete(cache_key(page_pk))
+
+
+def page_changed_handler(sender, instance, **kwargs) -> None:
+    if isinstance(instance, Page):
+        invalidate(instance.pk)
@@ -0,0 +1,272 @@
+"""
+    Keyset (cursor) pagination on `(created_at, id)`, or on any ordering with `KeysetPaginator`.
+
+    Every page is fetched with a `WHERE (created_at, id) < (last_created_at, last_id)`
+    condition instead of an `OFFSET`, so fetching page 1000 costs as much as
+    fetching page 1, and no `COUNT(*)` is needed.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterator
+
+from django.db import models
+
+if TYPE_CHECKING:
+    from feedback.models import AbstractFeedback, FeedbackQuerySet
+
+
+CURSOR_PARAM = "cursor"
+
+
+def encode_cursor(instance: "AbstractFeedback", previous: bool = False) -> str:
+    data = {
+        "c": instance.created_at.isoformat(),
+        "i": instance.pk,
+    }
+    if previous:
+        data["p"] = 1
+
+    value = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(value).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int, bool] | None:
+    """
+        Returns `(created_at, pk, previous)` or `None` for a missing or malformed cursor.
+    """
+    if not cursor:
+        return None
+
+    try:
+        value = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(value)
+        return (
+            datetime.fromisoformat(data["c"]),
+            int(data["i"]),
+            bool(data.get("p", False)),
+        )
+    except (binascii.Error, ValueError, TypeError, KeyError, UnicodeDecodeError):
+        return None
+
+
+class CursorPage:
+    """
+        Mimics the parts of `django.core.paginator.Page` used by the templates.
+    """
+
+    def __init__(self, object_list: list, next_cursor: str = None, previous_cursor: str = None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self) -> Iterator["AbstractFeedback"]:
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+        Paginates a feedback queryset newest first, ordered by `(-created_at, -id)`.
+    """
+
+    def __init__(self, queryset: "FeedbackQuerySet", per_page: int):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+
+    def get_page(self, cursor: str = None) -> CursorPage:
+        position = decode_cursor(cursor)
+        if position is None:
+            return self.first_page()
+
+        created_at, pk, previous = position
+        if previous:
+            return self.page_before(created_at, pk)
+        return self.page_after(created_at, pk)
+
+    def first_page(self) -> CursorPage:
+        rows = list(
+            self.queryset.order_by("-created_at", "-pk")[:self.per_page + 1]
+        )
+        return self.build_page(rows, has_next=len(rows) > self.per_page, has_previous=False)
+
+    def page_after(self, created_at: datetime, pk: int) -> CursorPage:
+        rows = list(
+            self.queryset.filter(
+                # The redundant bound lets the database prune partitions and range scan the index.
+                models.Q(created_at__lte=created_at),
+                models.Q(created_at__lt=created_at) | models.Q(created_at=created_at, pk__lt=pk),
+            ).order_by("-created_at", "-pk")[:self.per_page + 1]
+        )
+        return self.build_page(rows, has_next=len(rows) > self.per_page, has_previous=True)
+
+    def page_before(self, created_at: datetime, pk: int) -> CursorPage:
+        rows = list(
+            self.queryset.filter(
+                models.Q(created_at__gte=created_at),
+                models.Q(created_at__gt=created_at) | models.Q(created_at=created_at, pk__gt=pk),
+            ).order_by("created_at", "pk")[:self.per_page + 1]
+        )
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+
+        # Walked back past the start; rows before the cursor might not fill a page.
+        if not has_previous and len(rows) < self.per_page:
+            return self.first_page()
+
+        return self.build_page(rows, has_next=True, has_previous=has_previous)
+
+    def build_page(self, rows: list, has_next: bool, has_previous: bool) -> CursorPage:
+        rows = rows[:self.per_page]
+
+        next_cursor = None
+        if has_next and rows:
+            next_cursor = encode_cursor(rows[-1])
+
+        previous_cursor = None
+        if has_previous and rows:
+            previous_cursor = encode_cursor(rows[0], previous=True)
+
+        return CursorPage(rows, next_cursor=next_cursor, previous_cursor=previous_cursor)
+
+
+def encode_values(values: list, previous: bool = False) -> str:
+    data = {
+        "v": [
+            {"d": value.isoformat()} if isinstance(value, datetime) else value
+            for value in values
+        ],
+    }
+    if previous:
+        data["p"] = 1
+
+    value = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(value).decode("ascii").rstrip("=")
+
+
+def decode_values(cursor: str, length: int) -> tuple[list, bool] | None:
+    """
+        Returns `(values, previous)` or `None` for a missing or malformed cursor.
+    """
+    if not cursor:
+        return None
+
+    try:
+        value = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(value)
+        values = [
+            datetime.fromisoformat(value["d"]) if isinstance(value, dict) else value
+            for value in data["v"]
+        ]
+    except (binascii.Error, ValueError, TypeError, KeyError, UnicodeDecodeError):
+        return None
+
+    if len(values) != length:
+        return None
+
+    return values, bool(data.get("p", False))
+
+
+class KeysetPaginator:
+    """
+        Keyset pagination on any ordering which ends in a unique field,
+        e.g. `["-positive_percentage", "-total", "page_id"]`.
+
+        Works for querysets of model instances and of dictionaries (`values()`),
+        including orderings on aggregated annotations (filtered in `HAVING`).
+    """
+
+    def __init__(self, queryset, per_page: int, ordering: list[str]):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = list(ordering)
+        self.fields = [key.lstrip("-") for key in self.ordering]
+
+    def get_page(self, cursor: str = None) -> CursorPage:
+        position = decode_values(cursor, len(self.ordering))
+        if position is None:
+            return self.first_page()
+
+        values, previous = position
+        if previous:
+            return self.page_before(values)
+        return self.page_after(values)
+
+    def reversed_ordering(self) -> list[str]:
+        return [
+            key[1:] if key.startswith("-") else f"-{key}"
+            for key in self.ordering
+        ]
+
+    def seek(self, values: list, backwards: bool = False) -> models.Q:
+        """
+            `(a, b, c) > (x, y, z)` for the mixed directions of the ordering.
+        """
+        condition = models.Q()
+        for i, key in enumerate(self.ordering):
+            descending = key.startswith("-") != backwards
+            lookup = "lt" if descending else "gt"
+            q = models.Q(**{f"{self.fields[i]}__{lookup}": values[i]})
+            for field, value in zip(self.fields[:i], values[:i]):
+                q &= models.Q(**{field: value})
+            condition |= q
+        return condition
+
+    def first_page(self) -> CursorPage:
+        rows = list(
+            self.queryset.order_by(*self.ordering)[:self.per_page + 1]
+        )
+        return self.build_page(rows, has_next=len(rows) > self.per_page, has_previous=False)
+
+    def page_after(self, values: list) -> CursorPage:
+        rows = list(
+            self.queryset.filter(self.seek(values)).order_by(*self.ordering)[:self.per_page + 1]
+        )
+        return self.build_page(rows, has_next=len(rows) > self.per_page, has_previous=True)
+
+    def page_before(self, values: list) -> CursorPage:
+        rows = list(
+            self.queryset.filter(self.seek(values, backwards=True)).order_by(*self.reversed_ordering())[:self.per_page + 1]
+        )
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+
+        if not has_previous and len(rows) < self.per_page:
+            return self.first_page()
+
+        return self.build_page(rows, has_next=True, has_previous=has_previous)
+
+    def values_of(self, row) -> list:
+        if isinstance(row, dict):
+            return [row[field] for field in self.fields]
+        return [getattr(row, field) for field in self.fields]
+
+    def build_page(self, rows: list, has_next: bool, has_previous: bool) -> CursorPage:
+        rows = rows[:self.per_page]
+
+        next_cursor = None
+        if has_next and rows:
+            next_cursor = encode_values(self.values_of(rows[-1]))
+
+        previous_cursor = None
+        if has_previous and rows:
+            previous_cursor = encode_values(self.values_of(rows[0]), previous=True)
+
+        return CursorPage(rows, next_cursor=next_cursor, previous_cursor=previous_cursor)
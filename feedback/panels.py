@@ -7,8 +7,7 @@ from .templatetags.feedback import (
 )
 
 from . import get_feedback_model
-
-Feedback = get_feedback_model()
+from .models import PageFeedbackSummary
 
 class FeedbackPanel(Panel):
 
@@ -42,7 +41,15 @@ class FeedbackPanel(Panel):
             if not self.instance.pk:
                 return False
             
-            return Feedback.objects.filter(page=self.instance).exists()
+            # The summary is keyed by the page, a primary key lookup.
+            if PageFeedbackSummary.objects.with_feedback().filter(page_id=self.instance.pk).exists():
+                return True
+
+            if PageFeedbackSummary.objects.exists():
+                return False
+
+            # The summaries of a custom feedback model are empty until they are rebuilt.
+            return get_feedback_model().objects.filter(page_id=self.instance.pk).exists()
 
         def get_context_data(self, parent_context=None):
             context = super().get_context_data(parent_context)
@@ -0,0 +1,309 @@
+"""
+    Monthly range partitioning of the feedback table on PostgreSQL (opt-in).
+
+    `partition_feedback_table` converts the feedback table into a table partitioned on
+    `created_at`, with a partition per calendar month (in UTC) and a default partition
+    for rows outside of them. Vacuum, index maintenance and removing old feedback then
+    work per month, and queries filtering on `created_at` only read the months they need.
+
+    PostgreSQL requires the partition key in every unique constraint, so the primary key
+    becomes `(id, created_at)` and the unique `token` becomes `(token, created_at)`.
+
+    Partitions for the coming months are created by `create_partitions`, after every
+    `migrate` and by the `feedback_partitions` command (run it from a scheduled job).
+    Old months are detached (and optionally dropped) with `detach_partitions`; the rollups
+    and summaries keep their counts.
+
+    On other databases the table is left alone.
+"""
+import datetime
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.migrations.operations.base import Operation
+from django.utils import timezone
+
+from . import get_feedback_model
+
+
+MONTHS_AHEAD = 3
+
+DEFAULT_PARTITION_SUFFIX = "default"
+
+
+def is_supported(using: str = DEFAULT_DB_ALIAS) -> bool:
+    return connections[using].vendor == "postgresql"
+
+
+def feedback_table() -> str:
+    return get_feedback_model()._meta.db_table
+
+
+def month_start(value: datetime.datetime) -> datetime.datetime:
+    value = value.astimezone(datetime.timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime.datetime, months: int) -> datetime.datetime:
+    months = value.year * 12 + value.month - 1 + months
+    return value.replace(year=months // 12, month=months % 12 + 1)
+
+
+def partition_name(table: str, month: datetime.datetime) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def partition_month(table: str, name: str) -> datetime.datetime | None:
+    match = re.fullmatch(rf"{re.escape(table)}_p(\d{{4}})_(\d{{2}})", name)
+    if not match:
+        return None
+    return datetime.datetime(int(match[1]), int(match[2]), 1, tzinfo=datetime.timezone.utc)
+
+
+def bound(value: datetime.datetime) -> str:
+    # Formatted here, partition bounds cannot be query parameters.
+    return f"'{value.isoformat()}'"
+
+
+def is_partitioned(table: str = None, using: str = DEFAULT_DB_ALIAS) -> bool:
+    if not is_supported(using):
+        return False
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)",
+            [table or feedback_table()],
+        )
+        row = cursor.fetchone()
+    return row is not None and row[0] == "p"
+
+
+def list_partitions(table: str = None, using: str = DEFAULT_DB_ALIAS) -> list[tuple[str, datetime.datetime | None]]:
+    """
+        The partitions of the table and the month they hold (`None` for the default partition), oldest first.
+    """
+    table = table or feedback_table()
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(%s)",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = [(name, partition_month(table, name)) for name in names]
+    return sorted(partitions, key=lambda partition: (partition[1] is None, partition[1] or 0))
+
+
+def stored_columns(cursor, table: str) -> str:
+    """
+        The columns rows can be copied with, generated columns are computed again.
+    """
+    cursor.execute(
+        "SELECT attname FROM pg_attribute WHERE attrelid = %s::regclass "
+        "AND attnum > 0 AND NOT attisdropped AND attgenerated = '' ORDER BY attnum",
+        [table],
+    )
+    return ", ".join(cursor.db.ops.quote_name(row[0]) for row in cursor.fetchall())
+
+
+def create_partition(cursor, table: str, month: datetime.datetime):
+    quote = cursor.db.ops.quote_name
+    name = partition_name(table, month)
+    start, end = bound(month), bound(add_months(month, 1))
+    default = quote(f"{table}_{DEFAULT_PARTITION_SUFFIX}")
+
+    cursor.execute(
+        f"SELECT EXISTS (SELECT 1 FROM {default} WHERE created_at >= {start} AND created_at < {end})"
+    )
+    if not cursor.fetchone()[0]:
+        cursor.execute(
+            f"CREATE TABLE {quote(name)} PARTITION OF {quote(table)} FOR VALUES FROM ({start}) TO ({end})"
+        )
+        return
+
+    # Rows of this month ended up in the default partition, move them before attaching.
+    columns = stored_columns(cursor, table)
+    cursor.execute(
+        f"CREATE TABLE {quote(name)} (LIKE {quote(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED)"
+    )
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {default} WHERE created_at >= {start} AND created_at < {end} RETURNING {columns}) "
+        f"INSERT INTO {quote(name)} ({columns}) SELECT {columns} FROM moved"
+    )
+    cursor.execute(
+        f"ALTER TABLE {quote(table)} ATTACH PARTITION {quote(name)} FOR VALUES FROM ({start}) TO ({end})"
+    )
+
+
+def create_partitions(months_ahead: int = MONTHS_AHEAD, start: datetime.datetime = None, table: str = None, using: str = DEFAULT_DB_ALIAS) -> list[str]:
+    """
+        Create the missing partitions from the month of `start` (default: this month)
+        up to `months_ahead` months from now. Returns the names of the created partitions.
+    """
+    table = table or feedback_table()
+    if not is_partitioned(table, using):
+        return []
+
+    existing = {name for name, month in list_partitions(table, using)}
+    month = month_start(start or timezone.now())
+    last = add_months(month_start(timezone.now()), months_ahead)
+
+    created = []
+    with transaction.atomic(using), connections[using].cursor() as cursor:
+        while month <= last:
+            name = partition_name(table, month)
+            if name not in existing:
+                create_partition(cursor, table, month)
+                created.append(name)
+            month = add_months(month, 1)
+    return created
+
+
+def detach_partitions(before: datetime.datetime, drop: bool = False, table: str = None, using: str = DEFAULT_DB_ALIAS) -> list[str]:
+    """
+        Detach the monthly partitions which end before `before`; they are kept as plain tables
+        (to archive or query) unless `drop` is given. Returns the names of the detached partitions.
+    """
+    table = table or feedback_table()
+    if not is_partitioned(table, using):
+        return []
+
+    quote = connections[using].ops.quote_name
+    detached = []
+    with transaction.atomic(using), connections[using].cursor() as cursor:
+        for name, month in list_partitions(table, using):
+            if month is None or add_months(month, 1) > before:
+                continue
+
+            cursor.execute(f"ALTER TABLE {quote(table)} DETACH PARTITION {quote(name)}")
+            if drop:
+                cursor.execute(f"DROP TABLE {quote(name)}")
+            detached.append(name)
+    return detached
+
+
+def partition_feedback_table(months_ahead: int = MONTHS_AHEAD, table: str = None, using: str = DEFAULT_DB_ALIAS) -> bool:
+    """
+        Convert the feedback table into monthly partitions, copying all rows.
+        The table is locked while copying, run it in a maintenance window.
+        Returns `False` when the table is already partitioned or the database is not PostgreSQL.
+    """
+    table = table or feedback_table()
+    if not is_supported(using) or is_partitioned(table, using):
+        return False
+
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    unpartitioned = f"{table}_unpartitioned"
+
+    with transaction.atomic(using), connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid), "
+            "ARRAY(SELECT attname FROM unnest(conkey) AS key "
+            "JOIN pg_attribute ON attrelid = conrelid AND attnum = key) "
+            "FROM pg_constraint WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f', 'c')",
+            [table],
+        )
+        constraints = cursor.fetchall()
+
+        cursor.execute(
+            "SELECT COUNT(*) FROM pg_constraint WHERE confrelid = %s::regclass",
+            [table],
+        )
+        if cursor.fetchone()[0]:
+            raise ValueError(f"{table} is referenced by foreign keys and cannot be partitioned.")
+
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = %s",
+            [table],
+        )
+        constraint_names = {name for name, *rest in constraints}
+        indexes = [
+            definition
+            for name, definition in cursor.fetchall()
+            if name not in constraint_names
+        ]
+
+        cursor.execute(f"SELECT MIN(created_at), MAX(id) FROM {quote(table)}")
+        first, last_id = cursor.fetchone()
+
+        cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(unpartitioned)}")
+        cursor.execute(
+            f"CREATE TABLE {quote(table)} (LIKE {quote(unpartitioned)} INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING STORAGE INCLUDING COMMENTS) "
+            f"PARTITION BY RANGE (created_at)"
+        )
+        # A serial column's default points to the sequence dropped with the old table.
+        cursor.execute(f"ALTER TABLE {quote(table)} ALTER COLUMN id DROP DEFAULT")
+        cursor.execute(
+            f"CREATE TABLE {quote(f'{table}_{DEFAULT_PARTITION_SUFFIX}')} PARTITION OF {quote(table)} DEFAULT"
+        )
+
+        month = month_start(first or timezone.now())
+        last = add_months(month_start(timezone.now()), months_ahead)
+        while month <= last:
+            create_partition(cursor, table, month)
+            month = add_months(month, 1)
+
+        columns = stored_columns(cursor, unpartitioned)
+        cursor.execute(f"INSERT INTO {quote(table)} ({columns}) SELECT {columns} FROM {quote(unpartitioned)}")
+
+        # Drops the sequence of the old `id` column as well, the names below are free again.
+        cursor.execute(f"DROP TABLE {quote(unpartitioned)}")
+
+        sequence = quote(f"{table}_id_seq")
+        cursor.execute(f"CREATE SEQUENCE {sequence} OWNED BY {quote(table)}.id")
+        cursor.execute(f"SELECT setval('{sequence}', %s, %s)", [last_id or 1, last_id is not None])
+        cursor.execute(f"ALTER TABLE {quote(table)} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+
+        for name, kind, definition, columns in constraints:
+            if kind == "p":
+                definition = f"PRIMARY KEY ({', '.join(map(quote, [*columns, 'created_at']))})"
+            elif kind == "u" and "created_at" not in columns:
+                definition = f"UNIQUE ({', '.join(map(quote, [*columns, 'created_at']))})"
+            cursor.execute(f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}")
+
+        for definition in indexes:
+            cursor.execute(definition)
+
+    return True
+
+
+def post_migrate_handler(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    if sender.name != "feedback" or not is_supported(using):
+        return
+    create_partitions(using=using)
+
+
+class PartitionFeedbackTable(Operation):
+    """
+        Convert the feedback table into monthly partitions on PostgreSQL, add it to a
+        migration of your project to opt in:
+
+            operations = [
+                PartitionFeedbackTable(),
+            ]
+    """
+
+    reversible = False
+    reduces_to_sql = False
+
+    def __init__(self, months_ahead: int = MONTHS_AHEAD):
+        self.months_ahead = months_ahead
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        partition_feedback_table(
+            months_ahead=self.months_ahead,
+            using=schema_editor.connection.alias,
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        raise NotImplementedError("The feedback table cannot be converted back from partitions.")
+
+    def describe(self):
+        return "Partition the feedback table by month"
@@ -0,0 +1,75 @@
+"""
+    Process level memoization of what every submission resolves:
+    the configured backend and the form and filter classes.
+
+    Everything is resolved from the current settings on first use and
+    cleared when a `FEEDBACK_*` setting changes (e.g. with `override_settings`).
+    Settings are read with `get_setting`, never from the constants in `feedback.options`,
+    so a changed setting takes effect everywhere.
+"""
+import threading
+from typing import TYPE_CHECKING, Type, Union
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from . import options
+
+if TYPE_CHECKING:
+    from feedback.backends import Feedbackend
+
+
+_resolved: dict = {}
+_lock = threading.Lock()
+
+
+def clear() -> None:
+    with _lock:
+        _resolved.clear()
+
+
+def setting_changed_handler(setting: str, **kwargs) -> None:
+    if setting.startswith("FEEDBACK_"):
+        clear()
+
+
+def get_setting(name: str):
+    """
+        The current value of a `FEEDBACK_*` setting, or its default from `feedback.options`.
+    """
+    return getattr(settings, name, getattr(options, name))
+
+
+def resolve(path: Union[str, Type]) -> Type:
+    """
+        Import a dotted path once; classes are returned as is.
+    """
+    if not isinstance(path, str):
+        return path
+
+    try:
+        return _resolved[path]
+    except KeyError:
+        pass
+
+    value = import_string(path)
+    with _lock:
+        _resolved[path] = value
+    return value
+
+
+def get_backend() -> "Feedbackend":
+    """
+        The backend configured in `FEEDBACK_BACKEND`.
+        Backends keep per request state on the request, so one instance is shared.
+    """
+    try:
+        return _resolved[get_backend]
+    except KeyError:
+        pass
+
+    config = get_setting("FEEDBACK_BACKEND")
+    klass = resolve(config.get("CLASS", "feedback.backends.Feedbackend"))
+    backend = klass(config.get("OPTIONS", {}))
+    with _lock:
+        return _resolved.setdefault(get_backend, backend)
@@ -0,0 +1,237 @@
+"""
+    The site-wide ranking of pages by satisfaction, volume and trend.
+
+    Without a date range the ranking is read from the `PageFeedbackSummary`
+    of every page. With a date range, or when ranking by trend, the feedback
+    rows (or the daily rollups) are grouped per page in a single query.
+
+    The trend is the difference in positive percentage between the last
+    `trend_days` days and the `trend_days` days before them.
+
+    `wilson_lower` and `wilson_upper` bound the positive percentage with 95%
+    confidence (see `feedback.metrics`), ranking on them keeps pages with a
+    handful of votes from topping or bottoming the report.
+"""
+import datetime
+from itertools import islice
+from typing import Iterator
+
+from django.db import models
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import FeedbackRollup
+from .buckets import bucket_for
+from .metrics import wilson_bounds
+
+
+REPORT_ORDERINGS = {
+    "most_positive": ["-positive_percentage", "-total", "page_id"],
+    "least_positive": ["positive_percentage", "-total", "page_id"],
+    "most_votes": ["-total", "page_id"],
+    "trending_up": ["-trend_score", "-total", "page_id"],
+    "trending_down": ["trend_score", "-total", "page_id"],
+    "most_confident": ["-wilson_lower", "-total", "page_id"],
+    "least_confident": ["wilson_upper", "-total", "page_id"],
+}
+
+TREND_ORDERINGS = ("trending_up", "trending_down")
+
+DEFAULT_ORDERING = "most_positive"
+DEFAULT_TREND_DAYS = 30
+
+REPORT_FIELDS = [
+    "page_id",
+    "title",
+    "total",
+    "positive_count",
+    "negative_count",
+    "message_count",
+    "positive_percentage",
+    "wilson_lower",
+    "wilson_upper",
+    "trend",
+    "last_feedback_at",
+]
+
+
+def percentage(positive, total):
+    """
+        `positive * 100 / total` as a double, `NULL` when there are no votes.
+        Cast so the values compare exactly when used in a keyset cursor.
+    """
+    return Cast(
+        models.ExpressionWrapper(
+            positive * 100.0 / NullIf(total, 0),
+            output_field=models.FloatField(),
+        ),
+        models.FloatField(),
+    )
+
+
+def counts(rollups: bool, window: models.Q = None) -> tuple:
+    """
+        The aggregates for `(total, positive_count)` of the rows within `window`.
+    """
+    if rollups:
+        return (
+            Coalesce(models.Sum("votes", filter=window), 0),
+            Coalesce(models.Sum("positive_votes", filter=window), 0),
+        )
+
+    positive = models.Q(positive=True)
+    if window is not None:
+        positive &= window
+
+    return (
+        models.Count("id", filter=window),
+        models.Count("id", filter=positive),
+    )
+
+
+def trend_windows(end: datetime.datetime, days: int) -> tuple[models.Q, models.Q]:
+    delta = datetime.timedelta(days=days)
+    return (
+        models.Q(created_at__gte=end - delta, created_at__lt=end),
+        models.Q(created_at__gte=end - 2 * delta, created_at__lt=end - delta),
+    )
+
+
+def annotate_trend(queryset, end: datetime.datetime, days: int, rollups: bool):
+    current, previous = trend_windows(end, days)
+    current_total, current_positive = counts(rollups, current)
+    previous_total, previous_positive = counts(rollups, previous)
+
+    return queryset.annotate(
+        current_total=current_total,
+        current_positive=current_positive,
+        previous_total=previous_total,
+        previous_positive=previous_positive,
+    ).annotate(
+        trend=models.ExpressionWrapper(
+            percentage(models.F("current_positive"), models.F("current_total"))
+            - percentage(models.F("previous_positive"), models.F("previous_total")),
+            output_field=models.FloatField(),
+        ),
+    ).annotate(
+        # Pages without votes in one of the windows rank as unchanged.
+        trend_score=Coalesce("trend", models.Value(0.0)),
+    )
+
+
+def serialize(row: dict) -> dict:
+    return {
+        **{field: row[field] for field in REPORT_FIELDS},
+        "urls": {
+            "page_list": reverse("page_feedback_api", kwargs={"page_pk": row["page_id"]}),
+            "page_chart": reverse("page_feedback_api_chart", kwargs={"page_pk": row["page_id"]}),
+        },
+    }
+
+
+class PageReport:
+    """
+        Ranks the pages of `queryset` (feedback or `FeedbackRollup` rows, already
+        filtered by page and date range).
+
+        When `summaries` is given the totals are read from those summaries
+        instead, unless the ranking is by trend.
+    """
+
+    def __init__(self, queryset, summaries=None, ordering: str = DEFAULT_ORDERING, trend_days: int = DEFAULT_TREND_DAYS, end: datetime.datetime = None):
+        if ordering not in REPORT_ORDERINGS:
+            ordering = DEFAULT_ORDERING
+
+        self.queryset = queryset
+        self.ordering = ordering
+        self.trend_days = trend_days
+        self.end = end or timezone.now()
+        self.rollups = queryset.model is FeedbackRollup
+        if self.rollups and self.end != bucket_for(self.end, "date"):
+            # Daily buckets are counted whole, end the windows on a bucket boundary.
+            self.end = bucket_for(self.end, "date") + datetime.timedelta(days=1)
+        self.summaries = summaries if ordering not in TREND_ORDERINGS else None
+
+    @property
+    def keys(self) -> list[str]:
+        return REPORT_ORDERINGS[self.ordering]
+
+    def confidence(self, positive: str, total: str) -> dict:
+        lower, upper = wilson_bounds(models.F(positive), models.F(total))
+        return {
+            "wilson_lower": lower,
+            "wilson_upper": upper,
+        }
+
+    def rows(self):
+        """
+            A `values()` queryset of `REPORT_FIELDS`, not ordered yet.
+        """
+        if self.summaries is not None:
+            return self.summary_rows()
+        return self.grouped_rows()
+
+    def summary_rows(self):
+        return self.summaries.annotate(
+            title=models.F("page__title"),
+            total=models.F("votes"),
+            positive_count=models.F("positive_votes"),
+            negative_count=models.F("negative_votes"),
+            message_count=models.F("messages"),
+            positive_percentage=percentage(models.F("positive_votes"), models.F("votes")),
+            **self.confidence("positive_votes", "votes"),
+            # Filled in for the displayed rows only by `decorate`.
+            trend=models.Value(None, output_field=models.FloatField()),
+        ).values(*REPORT_FIELDS)
+
+    def grouped_rows(self):
+        total, positive = counts(self.rollups)
+        if self.rollups:
+            messages = Coalesce(models.Sum("messages"), 0)
+        else:
+            messages = models.Count("id", filter=models.Q(message__isnull=False) & ~models.Q(message=""))
+
+        queryset = self.queryset.order_by().values("page_id").annotate(
+            title=models.F("page__title"),
+            total=total,
+            positive_count=positive,
+            message_count=messages,
+            last_feedback_at=models.Max("created_at"),
+        ).annotate(
+            negative_count=models.F("total") - models.F("positive_count"),
+            positive_percentage=percentage(models.F("positive_count"), models.F("total")),
+            **self.confidence("positive_count", "total"),
+        )
+
+        return annotate_trend(
+            queryset, self.end, self.trend_days, self.rollups,
+        ).values(*REPORT_FIELDS, "trend_score")
+
+    def decorate(self, rows: list[dict]) -> list[dict]:
+        """
+            Add the trends to rows read from the summaries, one grouped query per call.
+        """
+        if self.summaries is None or not rows:
+            return rows
+
+        trends = dict(annotate_trend(
+            self.queryset.filter(
+                page_id__in=[row["page_id"] for row in rows],
+                created_at__gte=self.end - datetime.timedelta(days=2 * self.trend_days),
+            ).order_by().values("page_id"),
+            self.end, self.trend_days, self.rollups,
+        ).values_list("page_id", "trend"))
+
+        for row in rows:
+            row["trend"] = trends.get(row["page_id"], None)
+        return rows
+
+    def export_rows(self, queryset, chunk_size: int = 1000) -> Iterator[tuple]:
+        """
+            The ordered rows of `queryset` (as returned by `rows()`) as tuples of `REPORT_FIELDS`.
+        """
+        iterator = queryset.order_by(*self.keys).iterator(chunk_size=chunk_size)
+        while chunk := list(islice(iterator, chunk_size)):
+            for row in self.decorate(chunk):
+                yield tuple(row[field] for field in REPORT_FIELDS)
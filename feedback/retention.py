@@ -0,0 +1,128 @@
+"""
+    Removes old raw feedback rows, see `FEEDBACK_RETENTION` and the `purge_feedback` command.
+
+    The rollups and page summaries count every feedback row when it is saved, purged
+    rows are not discarded from them: the charts (read from the rollups) and the page
+    totals keep counting the purged feedback, only the listings and exports lose it.
+    Purging therefore requires `FEEDBACK_USE_ROLLUPS`.
+
+    - Rows are deleted oldest first in chunks of `CHUNK_SIZE`, each in a short transaction
+      of its own, so the table is never locked for long.
+    - With an `ARCHIVE_DIR` every chunk is appended to an NDJSON file (and synced) before it is deleted.
+    - The cutoff is the start of a day in the current timezone, so an hourly or daily rollup
+      never counts both purged and kept feedback. `rebuild_feedback_rollups` and
+      `rebuild_feedback_summaries` keep the counts from before the cutoff.
+    - `IP_ADDRESS_DAYS` clears the `ip_address` of feedback older than that, usually a shorter window.
+"""
+import datetime
+import os
+from contextlib import contextmanager
+from typing import IO, Callable, Iterator
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+
+from . import buckets, clusters, counting, export, get_feedback_model, has_field, registry
+
+
+CHUNK_SIZE = 1000
+
+
+def policy() -> dict:
+    return registry.get_setting("FEEDBACK_RETENTION") or {}
+
+
+def cutoff(days: int, now: datetime.datetime = None) -> datetime.datetime:
+    """
+        The start of the day `days` ago; feedback created before it has expired.
+    """
+    return buckets.bucket_for((now or timezone.now()) - datetime.timedelta(days=days), "date")
+
+
+def rebuild_since(date: datetime.date = None) -> datetime.datetime | None:
+    """
+        Where rebuilding the rollups and summaries from the raw rows starts:
+        the start of `date`, or the cutoff of the configured policy.
+    """
+    if date is not None:
+        return buckets.from_local(datetime.datetime.combine(date, datetime.time()))
+
+    days = policy().get("DAYS", None)
+    if days is None:
+        return None
+    return cutoff(days)
+
+
+def expired(days: int):
+    return get_feedback_model().objects.filter(created_at__lt=cutoff(days))
+
+
+@contextmanager
+def open_archive(directory: str = None) -> Iterator[IO | None]:
+    if not directory:
+        yield None
+        return
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"feedback-{timezone.now():%Y%m%d-%H%M%S}.ndjson")
+    with open(path, "a") as f:
+        yield f
+
+
+def purge_feedback(days: int, archive_dir: str = None, chunk_size: int = CHUNK_SIZE, progress: Callable[[dict], None] = None) -> int:
+    """
+        Delete (and with `archive_dir` archive) the feedback created before `cutoff(days)`.
+        Returns the amount of deleted rows.
+    """
+    if not registry.get_setting("FEEDBACK_USE_ROLLUPS"):
+        raise ImproperlyConfigured(
+            "Purging feedback requires FEEDBACK_USE_ROLLUPS, the charts would lose the purged feedback."
+        )
+
+    Feedback = get_feedback_model()
+    fields = [field.attname for field in Feedback._meta.concrete_fields]
+    queryset = expired(days).order_by("pk")
+
+    purged = 0
+    with open_archive(archive_dir) as archive:
+        # Paged by primary key, so no chunk scans the rows deleted before it.
+        while batch := list(queryset[:chunk_size]):
+            if archive is not None:
+                archive.writelines(export.ndjson_lines(
+                    (tuple(getattr(instance, field) for field in fields) for instance in batch), fields,
+                ))
+                archive.flush()
+                os.fsync(archive.fileno())
+
+            # Only the clusters forget the rows, the rollups and summaries keep counting them.
+            with transaction.atomic():
+                Feedback.objects.filter(pk__in=[instance.pk for instance in batch]).delete()
+                clusters.discard_feedback_batch(batch)
+
+            purged += len(batch)
+            queryset = queryset.filter(pk__gt=batch[-1].pk)
+            if progress is not None:
+                progress({"purged": purged, "last_pk": batch[-1].pk})
+
+    if purged:
+        counting.invalidate_counts()
+    return purged
+
+
+def clear_ip_addresses(days: int, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+        Clear the `ip_address` of the feedback created before `cutoff(days)`.
+        Returns the amount of updated rows.
+    """
+    Feedback = get_feedback_model()
+    if not has_field(Feedback, "ip_address"):
+        return 0
+
+    queryset = expired(days).filter(ip_address__isnull=False).order_by("pk").values_list("pk", flat=True)
+
+    cleared = 0
+    while pks := list(queryset[:chunk_size]):
+        cleared += Feedback.objects.filter(pk__in=pks).update(ip_address=None)
+        queryset = queryset.filter(pk__gt=pks[-1])
+    return cleared
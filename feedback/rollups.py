@@ -0,0 +1,121 @@
+import datetime
+from itertools import islice
+from django.db import models, transaction
+from typing import TYPE_CHECKING, Iterable
+
+from . import counters, get_feedback_model, registry
+from .buckets import bucket_for, first_bucket_from, trunc
+from .models import FeedbackRollup
+
+if TYPE_CHECKING:
+    from feedback.models import AbstractFeedback
+
+
+ROLLUP_PERIODS = ("hour", "date", "month", "year")
+
+
+def _apply(changes: Iterable[tuple["AbstractFeedback", dict[str, int]]]):
+    if not registry.get_setting("FEEDBACK_USE_ROLLUPS"):
+        return
+
+    # Merge the changes per bucket so a batch costs one query per bucket.
+    buckets = counters.merge(changes, lambda instance: [
+        (instance.page_id, period, bucket_for(instance.created_at, period))
+        for period in ROLLUP_PERIODS
+    ])
+
+    with transaction.atomic():
+        for (page_id, period, created_at), deltas in buckets.items():
+            counters.apply(FeedbackRollup, {
+                "page_id": page_id,
+                "period": period,
+                "created_at": created_at,
+            }, deltas)
+
+
+def record_feedback(instance: "AbstractFeedback"):
+    """
+        Count a newly saved feedback instance in the rollups.
+    """
+    _apply([(instance, counters.feedback_deltas(instance))])
+
+
+def record_feedback_batch(instances: Iterable["AbstractFeedback"]):
+    """
+        Count a batch of newly saved feedback instances in the rollups.
+    """
+    _apply((instance, counters.feedback_deltas(instance)) for instance in instances)
+
+
+def record_message(instance: "AbstractFeedback"):
+    """
+        Count a message added to an already recorded feedback instance.
+    """
+    _apply([(instance, {"messages": 1})])
+
+
+def discard_feedback(instance: "AbstractFeedback"):
+    """
+        Remove a feedback instance which is about to be deleted from the rollups.
+    """
+    _apply([(instance, counters.feedback_deltas(instance, sign=-1))])
+
+
+def discard_feedback_batch(instances: Iterable["AbstractFeedback"]):
+    """
+        Remove a batch of feedback instances which are about to be deleted from the rollups.
+    """
+    _apply((instance, counters.feedback_deltas(instance, sign=-1)) for instance in instances)
+
+
+def rebuild_rollups(pages: Iterable = None, periods: Iterable[str] = ROLLUP_PERIODS, batch_size: int = 1000, since: datetime.datetime = None) -> int:
+    """
+        Recompute the rollups from the raw feedback rows.
+        With `since`, the buckets starting before it are kept as they are,
+        e.g. the buckets counting purged feedback (see `feedback.retention`).
+        Returns the amount of rollup rows created.
+    """
+    Feedback = get_feedback_model()
+    created = 0
+
+    with transaction.atomic():
+        for period in periods:
+            rollups = FeedbackRollup.objects.filter(period=period)
+            feedback = Feedback.objects.all()
+            if pages is not None:
+                rollups = rollups.filter(page__in=pages)
+                feedback = feedback.filter(page__in=pages)
+            if since is not None:
+                start = first_bucket_from(since, period)
+                rollups = rollups.filter(created_at__gte=start)
+                feedback = feedback.filter(created_at__gte=start)
+
+            rollups.delete()
+
+            rows = feedback.annotate(
+                bucket=trunc(period),
+            ).values("page_id", "bucket").annotate(
+                votes=models.Count("id"),
+                positive_votes=models.Count("id", filter=models.Q(positive=True)),
+                negative_votes=models.Count("id", filter=models.Q(positive=False)),
+                messages=models.Count("id", filter=models.Q(message__isnull=False) & ~models.Q(message="")),
+            ).order_by()
+
+            objects = (
+                FeedbackRollup(
+                    page_id=row["page_id"],
+                    period=period,
+                    created_at=row["bucket"],
+                    votes=row["votes"],
+                    positive_votes=row["positive_votes"],
+                    negative_votes=row["negative_votes"],
+                    messages=row["messages"],
+                )
+                for row in rows.iterator(chunk_size=batch_size)
+            )
+
+            while batch := list(islice(objects, batch_size)):
+                FeedbackRollup.objects.bulk_create(batch)
+                created += len(batch)
+
+    return created
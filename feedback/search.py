@@ -0,0 +1,279 @@
+"""
+    Full-text search over feedback messages.
+
+    - PostgreSQL: a generated `search_vector` tsvector column with a GIN index,
+      searched with `websearch_to_tsquery`, ranked with `ts_rank` and highlighted with `ts_headline`.
+    - SQLite: an external content FTS5 table kept in sync by triggers,
+      ranked with `bm25` and highlighted with `snippet`.
+    - Other databases (or SQLite without FTS5) fall back to `message__icontains`, unranked.
+
+    The index is installed by a migration for the default feedback model; a custom feedback
+    model installs it by running `install` in one of its own migrations:
+
+        migrations.RunPython(
+            lambda apps, schema_editor: search.install(schema_editor, apps.get_model("app", "CustomFeedback")),
+            lambda apps, schema_editor: search.uninstall(schema_editor, apps.get_model("app", "CustomFeedback")),
+        )
+"""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections, models
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import SafeString, mark_safe
+
+from . import registry
+
+
+VECTOR_COLUMN = "search_vector"
+
+# Marks the matched terms in the headline, replaced by `<mark>` after escaping the message.
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_STOP = "\x03"
+
+SNIPPET_TOKENS = 32
+
+# Whether the index is installed, per database alias and table.
+_installed: dict[tuple[str, str], bool] = {}
+
+
+def search_config() -> str:
+    config = registry.get_setting("FEEDBACK_SEARCH_CONFIG")
+    if not re.fullmatch(r"\w+", config):
+        raise ValueError(f"Invalid text search configuration: {config!r}")
+    return config
+
+
+def fts_table(table: str) -> str:
+    return f"{table}_fts"
+
+
+def terms(query: str) -> list[str]:
+    return re.findall(r"\w+", query or "")
+
+
+def highlight(value: str) -> SafeString:
+    """
+        Escape a headline and wrap the matched terms in `<mark>`.
+    """
+    if not value:
+        return mark_safe("")
+
+    return mark_safe(
+        escape(value).replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_STOP, "</mark>")
+    )
+
+
+def fts5_available(connection) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def install(schema_editor, model: type[models.Model]):
+    """
+        Create the search index for `model` and fill it. Safe to run again.
+    """
+    connection = schema_editor.connection
+    quote = schema_editor.quote_name
+    table = model._meta.db_table
+    message = model._meta.get_field("message").column
+    _installed.pop((connection.alias, table), None)
+
+    if connection.vendor == "postgresql":
+        schema_editor.execute(
+            f"ALTER TABLE {quote(table)} ADD COLUMN IF NOT EXISTS {VECTOR_COLUMN} tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('{search_config()}'::regconfig, coalesce({quote(message)}, ''))) STORED"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {quote(f'{table}_search_idx')} ON {quote(table)} USING GIN ({VECTOR_COLUMN})"
+        )
+
+    elif connection.vendor == "sqlite" and fts5_available(connection):
+        fts = fts_table(table)
+        pk = model._meta.pk.column
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {quote(fts)} USING fts5("
+            f"{quote(message)}, content={quote(table)}, content_rowid={quote(pk)}, "
+            f"tokenize='unicode61 remove_diacritics 2')"
+        )
+        install_triggers(schema_editor, model)
+        schema_editor.execute(f"INSERT INTO {quote(fts)}({quote(fts)}) VALUES ('rebuild')")
+
+
+def install_triggers(schema_editor, model: type[models.Model]):
+    """
+        (Re)create the triggers keeping the FTS5 table in sync. SQLite drops them
+        with the table when a migration rebuilds the feedback table.
+    """
+    quote = schema_editor.quote_name
+    table = model._meta.db_table
+    fts = quote(fts_table(table))
+    message = quote(model._meta.get_field("message").column)
+    pk = quote(model._meta.pk.column)
+
+    insert = f"INSERT INTO {fts}(rowid, {message}) VALUES (new.{pk}, new.{message});"
+    delete = f"INSERT INTO {fts}({fts}, rowid, {message}) VALUES ('delete', old.{pk}, old.{message});"
+
+    for suffix, event, body in (
+        ("ai", "AFTER INSERT", insert),
+        ("ad", "AFTER DELETE", delete),
+        ("au", f"AFTER UPDATE OF {message}", delete + " " + insert),
+    ):
+        schema_editor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {quote(f'{table}_fts_{suffix}')} {event} ON {quote(table)} BEGIN {body} END"
+        )
+
+
+def uninstall(schema_editor, model: type[models.Model]):
+    connection = schema_editor.connection
+    quote = schema_editor.quote_name
+    table = model._meta.db_table
+    _installed.pop((connection.alias, table), None)
+
+    if connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {quote(f'{table}_search_idx')}")
+        schema_editor.execute(f"ALTER TABLE {quote(table)} DROP COLUMN IF EXISTS {VECTOR_COLUMN}")
+
+    elif connection.vendor == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {quote(f'{table}_fts_{suffix}')}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {quote(fts_table(table))}")
+
+
+def is_installed(table: str, using: str = DEFAULT_DB_ALIAS) -> bool:
+    key = (using, table)
+    if key in _installed:
+        return _installed[key]
+
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = %s AND column_name = %s",
+                [table, VECTOR_COLUMN],
+            )
+        elif connection.vendor == "sqlite":
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                [fts_table(table)],
+            )
+        else:
+            _installed[key] = False
+            return False
+
+        _installed[key] = cursor.fetchone() is not None
+    return _installed[key]
+
+
+def search(queryset, query: str):
+    """
+        Filter `queryset` on feedback whose message matches `query`, annotated with
+        `search_rank` (higher is more relevant, `None` without an index) and
+        `search_headline` (a fragment of the message with the matches between
+        `HIGHLIGHT_START` and `HIGHLIGHT_STOP`, see `highlight`).
+    """
+    words = terms(query)
+    if not words:
+        return queryset
+
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+
+    if is_installed(table, queryset.db):
+        if connection.vendor == "postgresql":
+            return search_postgresql(queryset, query)
+        if connection.vendor == "sqlite":
+            return search_sqlite(queryset, words)
+
+    condition = models.Q()
+    for word in words:
+        condition &= models.Q(message__icontains=word)
+
+    return queryset.filter(condition).annotate(
+        search_rank=models.Value(None, output_field=models.FloatField()),
+        search_headline=models.F("message"),
+    )
+
+
+def search_postgresql(queryset, query: str):
+    from django.contrib.postgres.search import (
+        SearchHeadline,
+        SearchQuery,
+        SearchRank,
+        SearchVectorField,
+    )
+
+    quote = connections[queryset.db].ops.quote_name
+    config = search_config()
+    search_query = SearchQuery(query, config=config, search_type="websearch")
+
+    return queryset.alias(
+        search_vector=RawSQL(
+            f"{quote(queryset.model._meta.db_table)}.{VECTOR_COLUMN}", [],
+            output_field=SearchVectorField(),
+        ),
+    ).filter(
+        search_vector=search_query,
+    ).annotate(
+        search_rank=SearchRank(models.F("search_vector"), search_query),
+        search_headline=SearchHeadline(
+            "message", search_query,
+            config=config,
+            start_sel=HIGHLIGHT_START,
+            stop_sel=HIGHLIGHT_STOP,
+        ),
+    )
+
+
+def search_sqlite(queryset, words: list[str]):
+    connection = connections[queryset.db]
+    quote = connection.ops.quote_name
+    fts = quote(fts_table(queryset.model._meta.db_table))
+    pk = f"{quote(queryset.model._meta.db_table)}.{quote(queryset.model._meta.pk.column)}"
+
+    # Every word must match, the last one as a prefix of a word (search as you type).
+    match = " ".join(f'"{word}"' for word in words) + "*"
+
+    # The matches are computed once per query and looked up by rowid for every row; a subquery
+    # with `MATCH` per row would run the full text query again for each of them.
+    # SQLite before 3.35 has no `MATERIALIZED` and might do just that (correct, but slow).
+    materialized = "MATERIALIZED" if connection.Database.sqlite_version_info >= (3, 35) else ""
+
+    def matched(expression: str, params: list, output_field: models.Field) -> RawSQL:
+        return RawSQL(
+            f"WITH matches AS {materialized} ("
+            f"SELECT rowid AS match_id, {expression} AS value FROM {fts} WHERE {fts} MATCH %s"
+            f") SELECT value FROM matches WHERE match_id = {pk}",
+            [*params, match],
+            output_field=output_field,
+        )
+
+    return queryset.filter(
+        pk__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [match]),
+    ).annotate(
+        # bm25() is lower for better matches.
+        search_rank=matched(f"-bm25({fts})", [], models.FloatField()),
+        search_headline=matched(
+            f"snippet({fts}, 0, %s, %s, '…', {SNIPPET_TOKENS})",
+            [HIGHLIGHT_START, HIGHLIGHT_STOP],
+            models.TextField(),
+        ),
+    )
+
+
+def post_migrate_handler(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    if sender.name != "feedback":
+        return
+
+    _installed.clear()
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+
+    from . import get_feedback_model
+    model = get_feedback_model()
+    if is_installed(model._meta.db_table, using):
+        with connection.schema_editor() as schema_editor:
+            install_triggers(schema_editor, model)
@@ -0,0 +1,52 @@
+// Fills in the visitor specific state of cached feedback widgets.
+(function () {
+    if (window.feedbackState) {
+        return;
+    }
+
+    function load(form) {
+        if (form.dataset.feedbackStateLoaded) {
+            return;
+        }
+        form.dataset.feedbackStateLoaded = "true";
+
+        fetch(form.dataset.feedbackState, {
+            credentials: "same-origin",
+            headers: {"Accept": "application/json"},
+        }).then(function (response) {
+            if (!response.ok) {
+                throw new Error("Could not load the feedback state: " + response.status);
+            }
+            return response.json();
+        }).then(function (state) {
+            var inputs = form.querySelectorAll("input[name='csrfmiddlewaretoken']");
+            for (var i = 0; i < inputs.length; i++) {
+                inputs[i].value = state.csrf_token;
+            }
+
+            if (state.voted) {
+                var message = document.createElement("p");
+                message.className = "feedback-error";
+                message.textContent = state.message;
+                form.replaceChildren(message);
+            }
+        }).catch(function (error) {
+            console.error(error);
+        });
+    }
+
+    window.feedbackState = {
+        load: function () {
+            var forms = document.querySelectorAll("form[data-feedback-state]");
+            for (var i = 0; i < forms.length; i++) {
+                load(forms[i]);
+            }
+        },
+    };
+
+    if (document.readyState === "loading") {
+        document.addEventListener("DOMContentLoaded", window.feedbackState.load);
+    } else {
+        window.feedbackState.load();
+    }
+})();
@@ -0,0 +1,161 @@
+"""
+    Keeps the `PageFeedbackSummary` of every page current.
+
+    Changes are applied per page, see `feedback.counters`.
+"""
+import datetime
+from itertools import islice
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, Greatest
+from typing import TYPE_CHECKING, Iterable
+
+from . import counters, get_feedback_model
+from .buckets import first_bucket_from
+from .models import FeedbackRollup, PageFeedbackSummary
+
+if TYPE_CHECKING:
+    from feedback.models import AbstractFeedback
+
+
+def _apply(changes: Iterable[tuple["AbstractFeedback", dict[str, int]]]):
+    changes = list(changes)
+
+    # The newest feedback of a page moves `last_feedback_at` forward.
+    latest: dict = {}
+    for instance, deltas in changes:
+        if deltas.get("votes", 0) > 0 and instance.created_at:
+            latest[instance.page_id] = max(latest.get(instance.page_id, instance.created_at), instance.created_at)
+
+    # Merge the changes per page so a batch costs one query per page.
+    pages = counters.merge(changes, lambda instance: [instance.page_id])
+
+    with transaction.atomic():
+        for page_id, deltas in pages.items():
+            updates = {}
+            if page_id in latest:
+                value = models.Value(latest[page_id])
+                updates["last_feedback_at"] = Greatest(
+                    Coalesce("last_feedback_at", value), value,
+                )
+
+            counters.apply(
+                PageFeedbackSummary, {"page_id": page_id}, deltas,
+                updates=updates,
+                defaults={"last_feedback_at": latest.get(page_id, None)},
+            )
+
+
+def record_feedback(instance: "AbstractFeedback"):
+    """
+        Count a newly saved feedback instance in the summary of its page.
+    """
+    _apply([(instance, counters.feedback_deltas(instance))])
+
+
+def record_feedback_batch(instances: Iterable["AbstractFeedback"]):
+    """
+        Count a batch of newly saved feedback instances.
+    """
+    _apply((instance, counters.feedback_deltas(instance)) for instance in instances)
+
+
+def record_message(instance: "AbstractFeedback"):
+    """
+        Count a message added to an already recorded feedback instance.
+    """
+    _apply([(instance, {"messages": 1})])
+
+
+def discard_feedback(instance: "AbstractFeedback"):
+    """
+        Remove a feedback instance which is about to be deleted from the summary of its page.
+    """
+    discard_feedback_batch([instance])
+
+
+def discard_feedback_batch(instances: Iterable["AbstractFeedback"]):
+    """
+        Remove a batch of feedback instances which are about to be deleted from the summaries of their pages.
+    """
+    instances = list(instances)
+    if not instances:
+        return
+
+    Feedback = get_feedback_model()
+    _apply((instance, counters.feedback_deltas(instance, sign=-1)) for instance in instances)
+
+    latest = Feedback.objects.filter(
+        page_id=models.OuterRef("page_id"),
+    ).exclude(
+        pk__in=[instance.pk for instance in instances],
+    ).order_by("-created_at").values("created_at")[:1]
+
+    PageFeedbackSummary.objects.filter(
+        page_id__in={instance.page_id for instance in instances},
+    ).update(
+        last_feedback_at=models.Subquery(latest),
+    )
+
+
+def rebuild_summaries(pages: Iterable = None, batch_size: int = 1000, since: datetime.datetime = None) -> int:
+    """
+        Recompute the summaries from the raw feedback rows.
+        With `since`, the feedback before it is counted from the hourly rollups
+        instead, e.g. when older feedback was purged (see `feedback.retention`).
+        Returns the amount of summaries created.
+    """
+    Feedback = get_feedback_model()
+    created = 0
+
+    with transaction.atomic():
+        summaries = PageFeedbackSummary.objects.all()
+        feedback = Feedback.objects.all()
+        history = FeedbackRollup.objects.none()
+        if since is not None:
+            start = first_bucket_from(since, "hour")
+            feedback = feedback.filter(created_at__gte=start)
+            history = FeedbackRollup.objects.filter(period="hour", created_at__lt=start)
+        if pages is not None:
+            summaries = summaries.filter(page__in=pages)
+            feedback = feedback.filter(page__in=pages)
+            history = history.filter(page__in=pages)
+
+        summaries.delete()
+
+        rows = feedback.values("page_id").annotate(
+            votes=models.Count("id"),
+            positive_votes=models.Count("id", filter=models.Q(positive=True)),
+            negative_votes=models.Count("id", filter=models.Q(positive=False)),
+            messages=models.Count("id", filter=models.Q(message__isnull=False) & ~models.Q(message="")),
+            last_feedback_at=models.Max("created_at"),
+        ).order_by()
+
+        # Counted per page in Python, there is one row per page at most.
+        totals = {
+            row["page_id"]: row for row in history.values("page_id").annotate(
+                **{field: models.Sum(field) for field in counters.COUNTERS},
+                last_feedback_at=models.Max("created_at"),
+            ).order_by()
+        }
+
+        def merged(rows):
+            for row in rows:
+                previous = totals.pop(row["page_id"], None)
+                if previous is not None:
+                    row.update({
+                        field: row[field] + previous[field]
+                        for field in counters.COUNTERS
+                    })
+                yield row
+            yield from totals.values()
+
+        objects = (
+            PageFeedbackSummary(**row)
+            for row in merged(rows.iterator(chunk_size=batch_size))
+        )
+
+        while batch := list(islice(objects, batch_size)):
+            PageFeedbackSummary.objects.bulk_create(batch)
+            created += len(batch)
+
+    return created
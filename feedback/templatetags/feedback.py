@@ -6,10 +6,11 @@ from django.template.defaultfilters import date as date_filter
 from django.utils import timezone
 import datetime
 from wagtail.models import PAGE_TEMPLATE_VAR
+from feedback import buckets, fragments, search
 
 register = library.Library()
 
-FEEDBACK_TEMPLATE = "feedback/happy-sad.html"
+FEEDBACK_TEMPLATE = fragments.FEEDBACK_TEMPLATE
 FEEDBACK_CSS = "feedback/css/feedback.css"
 FEEDBACK_JS = "feedback/js/feedback.js"
 
@@ -23,6 +24,9 @@ def feedback(context, page = None):
     if page is None:
         page = context[PAGE_TEMPLATE_VAR]
 
+    if fragments.is_enabled():
+        return mark_safe(fragments.render_cached(page, request=request))
+
     context = {
         "page": page,
         "request": request,
@@ -80,6 +84,22 @@ def do_date(obj, default=_impossible, **formats):
 
     return date_filter(value, format)
 
+@register.filter(name="search_highlight")
+def do_search_highlight(value):
+    """
+        Render a search headline with the matched terms in `<mark>`.
+    """
+    return search.highlight(value)
+
+@register.filter(name="format_bucket", expects_localtime=True)
+def do_format_bucket(value, period: Union[Literal['hour'], Literal['date'], Literal['month'], Literal['year']] = "hour"):
+    """
+        Format the start of an aggregation bucket for its period.
+    """
+    if not value:
+        return ""
+    return date_filter(value, buckets.FORMATS.get(period, buckets.FORMATS["hour"]))
+
 @register.simple_tag(name="format_date")
 def do_format_date(year = None, month = None, day = None, hour = None, minute = None, second = None, absolute = None, period: Union[Literal['hour'], Literal['date'], Literal['month'], Literal['year']] = "hour"):
     if year is None and month is None and day is None and absolute is None:
@@ -0,0 +1,140 @@
+import datetime
+import io
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .. import analysis
+from ..models import Feedback
+from .utils import create_feedback, create_page
+
+
+def shouting_analyzer(message: str) -> dict:
+    return {"language": "en", "keywords": [message.upper()], "sentiment": 0.0}
+
+
+class AnalyzeMessageTestCase(TestCase):
+
+    def test_language(self):
+        for message, language in (
+            ("The page is not clear and the search does not work", "en"),
+            ("De pagina is niet duidelijk en het zoeken werkt niet", "nl"),
+            ("Die Seite ist nicht klar und die Suche funktioniert nicht", "de"),
+            ("La page est très claire et la recherche fonctionne", "fr"),
+            ("Checkout", None),
+        ):
+            with self.subTest(message=message):
+                self.assertEqual(analysis.analyze_message(message)["language"], language)
+
+    def test_keywords(self):
+        result = analysis.analyze_message("The search is slow, the search results are slow to load. 404 errors!")
+        self.assertEqual(result["keywords"][:2], ["search", "slow"])
+        self.assertNotIn("404", result["keywords"])
+        self.assertNotIn("the", result["keywords"])
+        self.assertLessEqual(len(analysis.analyze_message(" ".join(f"word{i}" for i in range(10)))["keywords"]), analysis.MAX_KEYWORDS)
+
+    def test_sentiment(self):
+        positive = analysis.analyze_message("This is a great and helpful page, thanks")["sentiment"]
+        negative = analysis.analyze_message("The page is confusing and the links are broken")["sentiment"]
+        self.assertGreater(positive, analysis.NEUTRAL_MARGIN)
+        self.assertLess(negative, -analysis.NEUTRAL_MARGIN)
+        self.assertEqual(analysis.analyze_message("The page has a table")["sentiment"], 0.0)
+
+        self.assertLess(analysis.analyze_message("This page is not helpful at all")["sentiment"], 0)
+        self.assertLess(analysis.analyze_message("Don't like it")["sentiment"], 0)
+        self.assertLess(analysis.analyze_message("Die Seite ist nicht hilfreich")["sentiment"], 0)
+
+        # Normalized to -1 .. 1 however many words score.
+        self.assertLess(analysis.analyze_message("perfect " * 100)["sentiment"], 1.0)
+
+
+class AnalyzeMessagesTestCase(TestCase):
+
+    def setUp(self):
+        self.page = create_page()
+        self.negative = create_feedback(self.page, positive=False, message="The search is broken and useless")
+        self.positive = create_feedback(self.page, positive=True, message="Great page, very helpful")
+        self.empty = create_feedback(self.page, positive=True, message="")
+        self.vote = create_feedback(self.page, positive=True)
+
+    def test_analyze(self):
+        progress = []
+        stats = analysis.analyze_messages(chunk_size=1, workers=1, progress=lambda stats: progress.append(stats["analyzed"]))
+        self.assertEqual(stats["analyzed"], 2)
+        self.assertEqual(stats["last_pk"], self.positive.pk)
+        self.assertEqual(progress, [1, 2])
+
+        self.negative.refresh_from_db()
+        self.assertEqual(self.negative.message_language, "en")
+        self.assertIn("search", self.negative.message_keywords)
+        self.assertLess(self.negative.message_sentiment, 0)
+        self.assertIsNotNone(self.negative.analyzed_at)
+        self.assertFalse(Feedback.objects.filter(pk__in=[self.empty.pk, self.vote.pk], analyzed_at__isnull=False).exists())
+
+        # Analysed messages are not analysed again.
+        self.assertEqual(analysis.analyze_messages(workers=1)["analyzed"], 0)
+
+    def test_identical_messages_share_their_results(self):
+        for _ in range(3):
+            create_feedback(self.page, positive=False, message="The search is broken and useless")
+
+        analysis.analyze_messages(workers=1)
+        results = set(
+            Feedback.objects.filter(message="The search is broken and useless")
+            .values_list("message_language", "message_sentiment", "analyzed_at")
+        )
+        self.assertEqual(len(results), 1)
+
+    def test_sentiment_filter(self):
+        analysis.analyze_messages(workers=1)
+        queryset = Feedback.objects.filter(page=self.page)
+
+        for value, expected in (("1", [self.negative.pk]), ("3", [self.positive.pk])):
+            feedback_filter = Feedback.get_filter_class()({"sentiment": value}, queryset=queryset)
+            self.assertEqual([instance.pk for instance in feedback_filter.qs], expected)
+
+    @override_settings(FEEDBACK_MESSAGE_ANALYZER="feedback.tests.test_analysis.shouting_analyzer")
+    def test_reanalyze_with_a_checkpoint(self):
+        analysis.analyze_messages(workers=1)
+        Feedback.objects.update(analyzed_at=timezone.now() - datetime.timedelta(hours=1))
+
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, "checkpoint.json")
+            # An interrupted reanalysis which got through the first message.
+            started = timezone.now()
+            analysis.write_checkpoint(checkpoint, started)
+            analysis.save_results([(self.negative.pk, {"language": "en", "keywords": ["done"], "sentiment": -1.0})])
+
+            stats = analysis.analyze_messages(workers=1, reanalyze=True, checkpoint=checkpoint)
+            self.assertEqual(stats["analyzed"], 1)
+            self.assertFalse(os.path.exists(checkpoint))
+
+        self.negative.refresh_from_db()
+        self.positive.refresh_from_db()
+        self.assertEqual(self.negative.message_keywords, ["done"])
+        self.assertEqual(self.positive.message_keywords, ["GREAT PAGE, VERY HELPFUL"])
+
+    def test_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, "checkpoint.json")
+            self.assertIsNone(analysis.read_checkpoint(checkpoint))
+
+            started = timezone.now()
+            analysis.write_checkpoint(checkpoint, started)
+            self.assertEqual(analysis.read_checkpoint(checkpoint), started)
+
+            analysis.clear_checkpoint(checkpoint)
+            analysis.clear_checkpoint(checkpoint)
+            self.assertIsNone(analysis.read_checkpoint(checkpoint))
+
+    def test_command(self):
+        stdout = io.StringIO()
+        call_command("analyze_feedback_messages", "--workers", "1", stdout=stdout)
+        self.assertIn("Analysed 2 feedback messages", stdout.getvalue())
+
+        stdout = io.StringIO()
+        call_command("analyze_feedback_messages", "--workers", "1", "--reanalyze", stdout=stdout)
+        self.assertIn("Analysed 2 feedback messages", stdout.getvalue())
@@ -0,0 +1,79 @@
+import asyncio
+import uuid
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.http import Http404
+from django.test import AsyncRequestFactory, TestCase
+from wagtail.models import PageViewRestriction
+
+from ..models import Feedback
+from ..views import asynchronous
+from .utils import create_page
+
+
+def on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class AsyncViewsTestCase(TestCase):
+
+    def setUp(self):
+        self.page = create_page()
+        self.session_key = None
+        self.addCleanup(cache.clear)
+
+    async def post(self, view, data: dict, **kwargs):
+        request = AsyncRequestFactory().post("/", data, headers={"HX-Request": "true"})
+        request.session = SessionStore(session_key=self.session_key)
+        response = await view(request, page_pk=self.page.pk, **kwargs)
+        await sync_to_async(request.session.save)()
+        self.session_key = request.session.session_key
+        return response
+
+    async def test_vote(self):
+        with mock.patch.object(asynchronous, "get_write_buffer", return_value=None):
+            response = await self.post(asynchronous.afeedback, {"positive": "false"})
+            self.assertEqual(response.status_code, 200)
+            feedback = await Feedback.objects.aget(page=self.page)
+            self.assertFalse(feedback.positive)
+
+            response = await self.post(asynchronous.afeedback_with_message, {"message": "Async"}, pk=feedback.pk)
+            self.assertEqual(response.status_code, 200)
+            await feedback.arefresh_from_db()
+            self.assertEqual(feedback.message, "Async")
+
+            response = await self.post(asynchronous.afeedback, {"positive": "true"})
+            self.assertContains(response, "You have already submitted feedback for this page.")
+        self.assertEqual(await Feedback.objects.acount(), 1)
+
+    async def test_private_and_unpublished_pages_are_not_found(self):
+        self.assertEqual((await asynchronous.aget_page_or_404(self.page.pk)).pk, self.page.pk)
+
+        await PageViewRestriction.objects.acreate(page=self.page, restriction_type=PageViewRestriction.LOGIN)
+        with self.assertRaises(Http404):
+            await asynchronous.aget_page_or_404(self.page.pk)
+
+        with self.assertRaises(Http404):
+            await asynchronous.aget_page_or_404(0)
+
+    async def test_write_buffer_runs_in_a_thread(self):
+        calls = []
+        write_buffer = mock.Mock()
+        write_buffer.submit.side_effect = lambda instance: calls.append(("submit", on_event_loop()))
+        buffered = Feedback(page=self.page, positive=False, token=uuid.uuid4())
+        write_buffer.find.side_effect = lambda token: calls.append(("find", on_event_loop())) or buffered
+
+        with mock.patch.object(asynchronous, "get_write_buffer", return_value=write_buffer):
+            await self.post(asynchronous.afeedback, {"positive": "false"})
+            # An empty message is not saved, the feedback goes back into the buffer.
+            await self.post(asynchronous.afeedback_with_message, {"message": ""}, token=buffered.token)
+
+        self.assertEqual(calls, [("submit", False), ("find", False), ("submit", False)])
+        self.assertEqual(await Feedback.objects.acount(), 0)
@@ -0,0 +1,248 @@
+import time
+import uuid
+from unittest import mock
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from ..backends import bloom, packing
+from ..backends.cache import CachedFeedbackend
+from ..backends.cookie import CookieFeedbackend
+from ..backends.session import SessionBasedFeedbackend
+from .utils import create_feedback, create_page
+
+
+def make_request(ip_address: str = "10.0.0.1", session_key: str = None):
+    request = RequestFactory().post("/", REMOTE_ADDR=ip_address)
+    request.session = SessionStore(session_key=session_key)
+    if session_key is None:
+        request.session.create()
+    request.COOKIES = {}
+    return request
+
+
+class CachedFeedbackendTestCase(TestCase):
+
+    def setUp(self):
+        self.page = create_page()
+
+    def backend(self, **options) -> CachedFeedbackend:
+        return CachedFeedbackend({
+            "STORE": "lru",
+            "KEY_PREFIX": f"test-{uuid.uuid4().hex}",
+            **options,
+        })
+
+    def test_ip_fingerprints_are_cached(self):
+        backend = self.backend()
+        request = make_request()
+
+        self.assertFalse(backend.is_duplicate(request, self.page, None))
+        instance = create_feedback(self.page, ip_address="10.0.0.1")
+        backend.end_check(request, self.page, None, instance)
+
+        request = make_request()
+        with self.assertNumQueries(0):
+            self.assertTrue(backend.is_duplicate(request, self.page, None))
+        self.assertFalse(backend.is_duplicate(make_request("10.0.0.2"), self.page, None))
+        self.assertEqual(backend.stats()["hits"], 1)
+
+    def test_sessions_behind_the_same_ip_are_told_apart(self):
+        backend = self.backend(BACKEND=SessionBasedFeedbackend, AUTHORITATIVE=True)
+        first, second = make_request(), make_request()
+
+        self.assertFalse(backend.is_duplicate(first, self.page, None))
+        backend.end_check(first, self.page, None, None)
+
+        self.assertTrue(backend.is_duplicate(first, self.page, None))
+        self.assertFalse(backend.is_duplicate(second, self.page, None))
+        self.assertEqual(
+            backend.fingerprint(first, self.page),
+            f"{backend.key_prefix}:session:{first.session.session_key}:{self.page.pk}:0",
+        )
+
+    def test_backends_without_a_key_are_always_asked(self):
+        backend = self.backend(BACKEND=CookieFeedbackend, AUTHORITATIVE=True)
+        request = make_request()
+
+        self.assertIsNone(backend.fingerprint(request, self.page))
+        self.assertFalse(backend.is_duplicate(request, self.page, None))
+        self.assertEqual(len(backend.store), 0)
+        self.assertEqual(backend.stats(), {"hits": 0, "misses": 0})
+
+
+class BloomFeedbackendTestCase(TestCase):
+
+    def setUp(self):
+        self.page = create_page()
+
+    def backend(self, **options) -> bloom.BloomFeedbackend:
+        return bloom.BloomFeedbackend({"NAME": f"test-{uuid.uuid4().hex}", **options})
+
+    def test_submissions_are_remembered(self):
+        backend = self.backend()
+        request = make_request()
+
+        self.assertFalse(backend.is_duplicate(request, self.page, None))
+        backend.end_check(request, self.page, None, None)
+        self.assertTrue(backend.is_duplicate(make_request(), self.page, None))
+        self.assertFalse(backend.is_duplicate(make_request(), self.page, None, exists=True))
+        self.assertFalse(backend.is_duplicate(make_request("10.0.0.2"), self.page, None))
+
+    def test_default_state_fits_in_memcached(self):
+        backend = self.backend(STORAGE="cache")
+        size = bloom.BloomFilter.optimal_size(100_000, 0.01)
+
+        self.assertEqual(backend.filter.current.nbytes, (size + 7) // 8)
+        self.assertLess(len(backend.filter.dumps()), 1024 * 1024)
+
+    def test_cache_storage_is_capped(self):
+        backend = self.backend(STORAGE="cache", CAPACITY=10_000_000, ERROR_RATE=0.001)
+        self.assertLessEqual(backend.filter.nbytes, bloom.CacheStorage.MAX_BYTES)
+
+        # Only the cache is limited.
+        backend = self.backend(CAPACITY=10_000_000, ERROR_RATE=0.001)
+        self.assertGreater(backend.filter.nbytes, bloom.CacheStorage.MAX_BYTES)
+
+    def test_processes_share_the_stored_filter(self):
+        name = f"test-{uuid.uuid4().hex}"
+        backend = self.backend(NAME=name, STORAGE="cache", PERSIST_INTERVAL=0)
+        backend.end_check(make_request(), self.page, None, None)
+
+        # Another process builds its own filter from the same storage.
+        other = bloom.BloomFeedbackend({"NAME": name, "STORAGE": "cache"})
+        other.shared = other.build_shared_filter()
+        self.assertTrue(other.is_duplicate(make_request(), self.page, None))
+
+
+class SessionBasedFeedbackendTestCase(TestCase):
+
+    def setUp(self):
+        self.pages = [create_page(f"Page{i}") for i in range(3)]
+
+    def test_compact_votes_share_one_key(self):
+        backend = SessionBasedFeedbackend({"COMPACT": True})
+        request = make_request()
+
+        for page in self.pages:
+            backend.end_check(request, page, None, None)
+        backend.end_check(request, self.pages[0], None, None, exists=True)
+
+        self.assertEqual(list(request.session.keys()), ["user-feedback"])
+        self.assertTrue(all(backend.is_duplicate(request, page, None) for page in self.pages))
+        self.assertTrue(backend.is_duplicate(request, self.pages[0], None, exists=True))
+        self.assertFalse(backend.is_duplicate(request, self.pages[1], None, exists=True))
+
+    def test_legacy_keys_are_migrated(self):
+        request = make_request()
+        legacy = SessionBasedFeedbackend()
+        legacy.end_check(request, self.pages[0], None, None)
+        legacy.end_check(request, self.pages[0], None, None, exists=True)
+        legacy.end_check(request, self.pages[1], None, None)
+        request.session["unrelated"] = True
+
+        backend = SessionBasedFeedbackend({"COMPACT": True})
+        self.assertTrue(backend.is_duplicate(request, self.pages[0], None, exists=True))
+        self.assertTrue(backend.is_duplicate(request, self.pages[1], None))
+        self.assertFalse(backend.is_duplicate(request, self.pages[2], None))
+        self.assertEqual(sorted(request.session.keys()), ["unrelated", "user-feedback"])
+
+    def test_least_recently_changed_pages_are_evicted(self):
+        backend = SessionBasedFeedbackend({"COMPACT": True, "MAX_PAGES": 2})
+        request = make_request()
+
+        for page in self.pages:
+            backend.end_check(request, page, None, None)
+
+        self.assertFalse(backend.is_duplicate(request, self.pages[0], None))
+        self.assertTrue(backend.is_duplicate(request, self.pages[2], None))
+
+    def test_expired_pages_are_dropped(self):
+        backend = SessionBasedFeedbackend({"COMPACT": True, "MAX_AGE": 60 * 60})
+        request = make_request()
+
+        with mock.patch.object(packing, "now", return_value=packing.now() - 2 * 60):
+            backend.end_check(request, self.pages[0], None, None)
+        backend.end_check(request, self.pages[1], None, None)
+
+        self.assertFalse(backend.is_duplicate(request, self.pages[0], None))
+        self.assertTrue(backend.is_duplicate(request, self.pages[1], None))
+
+
+class CookieFeedbackendTestCase(TestCase):
+
+    def setUp(self):
+        self.page = create_page()
+
+    def vote(self, backend: CookieFeedbackend, request, page, exists: bool = False) -> str:
+        backend.end_check(request, page, None, None, exists=exists)
+        response = backend.process_response(request, HttpResponse())
+        return response.cookies[backend.cookie_name].value
+
+    def test_votes_round_trip_through_the_cookie(self):
+        backend = CookieFeedbackend()
+        value = self.vote(backend, make_request(), self.page)
+
+        request = make_request()
+        request.COOKIES[backend.cookie_name] = value
+        with self.assertNumQueries(0):
+            self.assertTrue(backend.is_duplicate(request, self.page, None))
+            self.assertFalse(backend.is_duplicate(request, self.page, None, exists=True))
+
+    def test_responses_without_a_vote_keep_the_cookie(self):
+        backend = CookieFeedbackend()
+        response = backend.process_response(make_request(), HttpResponse())
+        self.assertNotIn(backend.cookie_name, response.cookies)
+
+    def test_tampered_cookies_are_ignored(self):
+        backend = CookieFeedbackend()
+        value = self.vote(backend, make_request(), self.page)
+
+        request = make_request()
+        request.COOKIES[backend.cookie_name] = value[:-2] + "xx"
+        self.assertFalse(backend.is_duplicate(request, self.page, None))
+
+        request.COOKIES[backend.cookie_name] = value
+        self.assertFalse(CookieFeedbackend({"SALT": "other"}).is_duplicate(request, self.page, None))
+
+    def test_cookie_size_is_bounded(self):
+        backend = CookieFeedbackend({"MAX_BYTES": 200})
+        minute = packing.now()
+        votes = {page_pk: (packing.VOTED, minute - page_pk) for page_pk in range(1, 2000)}
+
+        value = backend.encode(votes)
+        self.assertLessEqual(len(value), 200)
+
+        request = make_request()
+        request.COOKIES[backend.cookie_name] = value
+        kept = backend.get_votes(request)
+        # The most recently changed pages are kept.
+        self.assertIn(1, kept)
+        self.assertNotIn(1999, kept)
+
+    def test_expired_cookies_are_ignored(self):
+        backend = CookieFeedbackend({"MAX_AGE": 60})
+        value = self.vote(backend, make_request(), self.page)
+
+        request = make_request()
+        request.COOKIES[backend.cookie_name] = value
+        with mock.patch("django.core.signing.time.time", return_value=time.time() + 120):
+            self.assertFalse(backend.is_duplicate(request, self.page, None))
+
+
+class PackingTestCase(TestCase):
+
+    def test_round_trip(self):
+        minute = packing.now()
+        entries = {page_pk: (packing.VOTED, minute - page_pk) for page_pk in range(1, 500, 3)}
+        entries[7] = (packing.VOTED | packing.HAS_MESSAGE, minute)
+
+        data = packing.pack(entries)
+        self.assertEqual(packing.unpack(data), entries)
+        # A few bytes per page.
+        self.assertLess(len(data), 6 * len(entries))
+
+    def test_corrupt_data_is_empty(self):
+        self.assertEqual(packing.unpack("not base64!"), {})
+        self.assertEqual(packing.unpack(packing.pack({1: (1, 1)})[:-4]), {})
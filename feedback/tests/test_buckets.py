@@ -0,0 +1,106 @@
+import datetime
+import zoneinfo
+
+from django.test import TestCase
+from django.utils import timezone
+
+from .. import buckets
+from ..models import Feedback
+from .utils import create_feedback, create_page
+
+
+AMSTERDAM = zoneinfo.ZoneInfo("Europe/Amsterdam")
+
+
+def local(*args) -> datetime.datetime:
+    return datetime.datetime(*args, tzinfo=AMSTERDAM)
+
+
+class BucketsTestCase(TestCase):
+
+    def setUp(self):
+        timezone.activate(AMSTERDAM)
+        self.addCleanup(timezone.deactivate)
+
+    def test_bucket_for_uses_the_current_timezone(self):
+        # 23:30 UTC is the next day in Amsterdam.
+        value = datetime.datetime(2024, 1, 31, 23, 30, tzinfo=datetime.timezone.utc)
+        self.assertEqual(buckets.bucket_for(value, "hour"), local(2024, 2, 1, 0))
+        self.assertEqual(buckets.bucket_for(value, "date"), local(2024, 2, 1))
+        self.assertEqual(buckets.bucket_for(value, "month"), local(2024, 2, 1))
+        self.assertEqual(buckets.bucket_for(value, "year"), local(2024, 1, 1))
+
+    def test_next_bucket(self):
+        self.assertEqual(buckets.next_bucket(datetime.datetime(2024, 2, 1), "month"), datetime.datetime(2024, 3, 1))
+        self.assertEqual(buckets.next_bucket(datetime.datetime(2023, 2, 1), "month"), datetime.datetime(2023, 3, 1))
+        self.assertEqual(buckets.next_bucket(datetime.datetime(2024, 12, 1), "month"), datetime.datetime(2025, 1, 1))
+        self.assertEqual(buckets.next_bucket(datetime.datetime(2024, 1, 1), "year"), datetime.datetime(2025, 1, 1))
+        with self.assertRaises(ValueError):
+            buckets.next_bucket(datetime.datetime(2024, 1, 1), "week")
+
+    def test_first_bucket_from(self):
+        self.assertEqual(buckets.first_bucket_from(local(2024, 3, 1), "month"), local(2024, 3, 1))
+        self.assertEqual(buckets.first_bucket_from(local(2024, 3, 1, 0, 1), "month"), local(2024, 4, 1))
+        # The day of the DST change is 23 hours long, the next one still starts at midnight.
+        self.assertEqual(buckets.first_bucket_from(local(2024, 3, 31, 0, 1), "date"), local(2024, 4, 1))
+
+    def test_skipped_hour_has_no_bucket(self):
+        series = buckets.local_series(datetime.datetime(2024, 3, 31, 0), datetime.datetime(2024, 3, 31, 4), "hour")
+        self.assertEqual([value.hour for value in series], [0, 1, 3, 4])
+
+        # Days always have a bucket, even the 23 hour one.
+        series = buckets.local_series(datetime.datetime(2024, 3, 30), datetime.datetime(2024, 4, 1), "date")
+        self.assertEqual([value.day for value in series], [30, 31, 1])
+
+    def test_series_limit(self):
+        start = datetime.datetime(2024, 1, 1)
+        self.assertEqual(len(buckets.local_series(start, start + datetime.timedelta(hours=9), "hour", limit=10)), 10)
+        self.assertIsNone(buckets.local_series(start, start + datetime.timedelta(hours=10), "hour", limit=10))
+
+
+class FillGapsTestCase(TestCase):
+
+    def setUp(self):
+        self.page = create_page()
+        timezone.activate(AMSTERDAM)
+        self.addCleanup(timezone.deactivate)
+
+    def aggregate(self, period: str):
+        return Feedback.objects.filter(page=self.page).aggregate_percentage(period)
+
+    def test_daily_buckets_across_the_dst_change(self):
+        # Both are on the 31st of March in Amsterdam, the second after the clocks went forward.
+        create_feedback(self.page, positive=True, created_at=local(2024, 3, 31, 1, 30))
+        create_feedback(self.page, positive=False, created_at=local(2024, 3, 31, 23, 30))
+        create_feedback(self.page, positive=True, created_at=local(2024, 4, 2, 12))
+
+        rows = self.aggregate("date").fill_gaps()
+        self.assertEqual([row["bucket"] for row in rows], [local(2024, 4, 2), local(2024, 4, 1), local(2024, 3, 31)])
+        self.assertEqual([row["total"] for row in rows], [1, 0, 2])
+        self.assertIsNone(rows[1]["positive_percentage"])
+        self.assertEqual(rows[2]["positive_percentage"], 50.0)
+
+    def test_hourly_buckets_skip_the_missing_hour(self):
+        create_feedback(self.page, created_at=local(2024, 3, 31, 1, 15))
+        create_feedback(self.page, created_at=local(2024, 3, 31, 3, 45))
+
+        rows = self.aggregate("hour").fill_gaps()
+        self.assertEqual([row["bucket"] for row in rows], [local(2024, 3, 31, 3), local(2024, 3, 31, 1)])
+        self.assertEqual([row["total"] for row in rows], [1, 1])
+
+    def test_range_and_monthly_buckets(self):
+        create_feedback(self.page, created_at=local(2024, 1, 15))
+
+        rows = self.aggregate("month").fill_gaps(start=local(2023, 12, 10), end=local(2024, 3, 1))
+        self.assertEqual([row["bucket"] for row in rows], [local(2024, 3, 1), local(2024, 2, 1), local(2024, 1, 1), local(2023, 12, 1)])
+        self.assertEqual([row["total"] for row in rows], [0, 0, 1, 0])
+
+    def test_empty_series(self):
+        self.assertEqual(self.aggregate("date").fill_gaps(), [])
+
+    def test_too_many_buckets_stay_sparse(self):
+        create_feedback(self.page, created_at=local(2020, 1, 1))
+        create_feedback(self.page, created_at=local(2024, 1, 1))
+
+        rows = self.aggregate("hour").fill_gaps()
+        self.assertEqual([row["total"] for row in rows], [1, 1])
@@ -0,0 +1,102 @@
+import uuid
+from unittest import mock
+
+from django.core.cache import cache
+from django.db.models import Sum
+
+from .. import buffer
+from ..models import Feedback, FeedbackRollup, PageFeedbackSummary
+from .utils import RollupsTestCase, create_page
+
+
+class WriteBufferTestCase(RollupsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.page = create_page()
+
+    def test_insert_batch_is_idempotent(self):
+        instances = [
+            Feedback(page=self.page, positive=True, token=uuid.uuid4(), message="Buffered")
+            for _ in range(3)
+        ]
+        items = [buffer.serialize_instance(instance) for instance in instances]
+
+        inserted = buffer.insert_batch([buffer.deserialize_instance(item) for item in items])
+        self.assertEqual(len(inserted), 3)
+
+        # A replayed spool or a retried flush.
+        replayed = buffer.insert_batch([buffer.deserialize_instance(item) for item in items])
+        self.assertEqual(replayed, [])
+
+        self.assertEqual(Feedback.objects.filter(page=self.page).count(), 3)
+        self.assertEqual(PageFeedbackSummary.objects.get(page=self.page).votes, 3)
+        self.assertEqual(
+            FeedbackRollup.objects.filter(page=self.page, period="date").aggregate(votes=Sum("votes"))["votes"], 3,
+        )
+
+    def test_insert_batch_counts_concurrent_inserts_once(self):
+        taken = Feedback(page=self.page, positive=True, token=uuid.uuid4())
+        fresh = Feedback(page=self.page, positive=False, token=uuid.uuid4())
+
+        # Another process inserts one of them after the tokens were looked up.
+        buffer.insert_batch([Feedback(page=self.page, positive=True, token=taken.token)])
+        with mock.patch.object(buffer, "existing_tokens", return_value=set()):
+            inserted = buffer.insert_batch([taken, fresh])
+
+        self.assertEqual([instance.token for instance in inserted], [fresh.token])
+        self.assertEqual(Feedback.objects.filter(page=self.page).count(), 2)
+        summary = PageFeedbackSummary.objects.get(page=self.page)
+        self.assertEqual((summary.votes, summary.positive_votes), (2, 1))
+
+
+@mock.patch.object(buffer.FeedbackWriteBuffer, "start")
+class WriteBufferWorkersTestCase(RollupsTestCase):
+    """
+        Two buffers stand in for the buffers of two worker processes sharing a cache.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.page = create_page()
+        self.voted = buffer.FeedbackWriteBuffer({"FLUSH_INTERVAL": 60})
+        self.other = buffer.FeedbackWriteBuffer({"FLUSH_INTERVAL": 60})
+        self.addCleanup(cache.clear)
+
+    def submit(self) -> uuid.UUID:
+        return self.voted.submit(Feedback(page=self.page, positive=False))
+
+    def test_find_in_own_queue(self, start):
+        token = self.submit()
+        instance = self.voted.find(token)
+        self.assertIsNone(instance.pk)
+        self.assertEqual(len(self.voted), 0)
+
+    def test_find_from_other_worker(self, start):
+        token = self.submit()
+
+        instance = self.other.find(token)
+        self.assertIsNotNone(instance.pk)
+        self.assertEqual(instance.token, token)
+
+        # The worker which queued it skips it when it flushes.
+        self.voted.flush()
+        self.assertEqual(Feedback.objects.filter(token=token).count(), 1)
+        self.assertEqual(PageFeedbackSummary.objects.get(page=self.page).votes, 1)
+
+    def test_claim_after_other_worker_inserted(self, start):
+        token = self.submit()
+        self.other.find(token)
+
+        instance = self.voted.find(token)
+        self.assertIsNotNone(instance.pk)
+        self.assertEqual(len(self.voted), 0)
+
+    def test_flushed_feedback_leaves_the_cache(self, start):
+        token = self.submit()
+        self.voted.flush()
+        self.assertIsNone(cache.get(buffer.FeedbackWriteBuffer.cache_key(token)))
+        self.assertEqual(self.other.find(token).token, token)
+
+    def test_unknown_token(self, start):
+        self.assertIsNone(self.other.find(uuid.uuid4()))
@@ -0,0 +1,49 @@
+
+from django.test import TestCase
+
+from .. import clusters, tracking
+from ..models import Feedback, MessageCluster
+from .utils import create_feedback, create_page
+
+
+class ClusterTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.page = create_page()
+
+    def test_similarity(self):
+        spam = clusters.signature("Buy cheap watches at http://spam.example now!!!")
+        same = clusters.signature("buy cheap watches at http://spam.example NOW")
+        other = clusters.signature("The search page is broken on mobile")
+        self.assertGreater(clusters.similarity(spam, same), clusters.threshold())
+        self.assertLess(clusters.similarity(spam, other), clusters.threshold())
+
+    def test_near_duplicates_share_a_cluster(self):
+        spam = [create_feedback(self.page, positive=False, message=f"Buy cheap watches at http://spam.example now{'!' * i}") for i in range(4)]
+        other = create_feedback(self.page, positive=False, message="The search page is broken on mobile")
+
+        cluster_ids = {instance.message_cluster_id for instance in spam}
+        self.assertEqual(len(cluster_ids), 1)
+        self.assertNotIn(other.message_cluster_id, cluster_ids)
+        self.assertEqual(MessageCluster.objects.get(pk=cluster_ids.pop()).size, 4)
+
+    def test_collapse_and_discard(self):
+        spam = [create_feedback(self.page, positive=False, message="Buy cheap watches at http://spam.example now") for _ in range(3)]
+        create_feedback(self.page, positive=True)
+
+        collapsed = list(Feedback.objects.filter(page=self.page).collapse_clusters())
+        self.assertEqual(len(collapsed), 2)
+        self.assertEqual(max(instance.cluster_size or 0 for instance in collapsed), 3)
+
+        tracking.discard_feedback(spam[0])
+        spam[0].delete()
+        self.assertEqual(MessageCluster.objects.get(pk=spam[1].message_cluster_id).size, 2)
+
+    def test_cluster_pending(self):
+        Feedback.objects.bulk_create([
+            Feedback(page=self.page, positive=False, message="Buy cheap watches at http://spam.example now")
+            for _ in range(5)
+        ])
+        self.assertEqual(clusters.cluster_pending(batch_size=2), 5)
+        self.assertEqual(MessageCluster.objects.get().size, 5)
@@ -0,0 +1,110 @@
+import datetime
+
+from django.db.models import Sum
+from django.utils import timezone
+
+from .. import rollups, summaries, tracking
+from ..models import Feedback, FeedbackRollup, PageFeedbackSummary
+from .utils import RollupsTestCase, create_feedback, create_page
+
+
+class CountersTestCase(RollupsTestCase):
+    """
+        The rollups and page summaries are kept current incrementally,
+        and match what rebuilding them from the feedback rows counts.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.page = create_page()
+        now = timezone.now()
+        self.feedback = [
+            create_feedback(
+                self.page, positive=i % 3 != 0, message="A message" if i % 4 == 0 else None,
+                created_at=now - datetime.timedelta(hours=i * 7),
+            )
+            for i in range(24)
+        ]
+
+    def rollup_totals(self) -> dict:
+        return {
+            period: FeedbackRollup.objects.filter(page=self.page, period=period).aggregate(
+                votes=Sum("votes"), positive_votes=Sum("positive_votes"), messages=Sum("messages"),
+            )
+            for period in rollups.ROLLUP_PERIODS
+        }
+
+    def rollup_rows(self) -> list:
+        return list(FeedbackRollup.objects.order_by("period", "created_at").values_list(
+            "page_id", "period", "created_at", "votes", "positive_votes", "negative_votes", "messages",
+        ))
+
+    def summary(self) -> tuple:
+        summary = PageFeedbackSummary.objects.get(page=self.page)
+        return summary.votes, summary.positive_votes, summary.negative_votes, summary.messages
+
+    def test_rollups_count_every_period(self):
+        for totals in self.rollup_totals().values():
+            self.assertEqual(totals, {"votes": 24, "positive_votes": 16, "messages": 6})
+
+    def test_rollups_match_rebuild(self):
+        rows = self.rollup_rows()
+        rollups.rebuild_rollups()
+        self.assertEqual(self.rollup_rows(), rows)
+
+    def test_summary_counts(self):
+        self.assertEqual(self.summary(), (24, 16, 8, 6))
+        self.assertEqual(
+            PageFeedbackSummary.objects.get(page=self.page).last_feedback_at,
+            max(instance.created_at for instance in self.feedback),
+        )
+
+    def test_summary_matches_rebuild(self):
+        summary = self.summary()
+        summaries.rebuild_summaries()
+        self.assertEqual(self.summary(), summary)
+
+    def test_discard(self):
+        discarded = [instance for instance in self.feedback if instance.positive][:4]
+        tracking.discard_feedback_batch(discarded)
+        Feedback.objects.filter(pk__in=[instance.pk for instance in discarded]).delete()
+
+        self.assertEqual(self.summary()[:3], (20, 12, 8))
+        self.assertEqual(self.rollup_totals()["year"]["votes"], 20)
+
+    def test_message_added_later(self):
+        instance = self.feedback[1]
+        instance.message = "Added later"
+        instance.save()
+        tracking.record_new_message(instance)
+
+        self.assertEqual(self.summary()[3], 7)
+        self.assertEqual(self.rollup_totals()["hour"]["messages"], 7)
+
+    def series(self, queryset, period: str) -> list[tuple]:
+        return [
+            (row["bucket"], row["total"], row["positive_count"], row["negative_count"], row["positive_percentage"])
+            for row in queryset.aggregate_percentage(period)
+        ]
+
+    def test_rollup_series_match_raw_series(self):
+        raw = Feedback.objects.for_page(self.page)
+        rolled_up = FeedbackRollup.objects.for_page(self.page)
+
+        for period in ("hour", "date", "month"):
+            with self.subTest(period=period):
+                self.assertEqual(self.series(rolled_up, period), self.series(raw, period))
+
+            with self.subTest(period=period, attitude="positive"):
+                series = self.series(rolled_up.positive(), period)
+                self.assertEqual(series, self.series(raw.positive(), period))
+                self.assertEqual({row[4] for row in series}, {100.0})
+
+            with self.subTest(period=period, attitude="negative"):
+                series = self.series(rolled_up.negative(), period)
+                self.assertEqual(series, self.series(raw.negative(), period))
+                self.assertEqual({row[4] for row in series}, {0.0})
+
+    def test_rollups_have_no_raw_row_methods(self):
+        self.assertFalse(hasattr(FeedbackRollup.objects.all(), "search"))
+        self.assertFalse(hasattr(FeedbackRollup.objects.all(), "collapse_clusters"))
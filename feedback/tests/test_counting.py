@@ -0,0 +1,96 @@
+import uuid
+from unittest import mock, skipIf
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import counting
+from ..models import Feedback
+from .utils import create_feedback, create_page
+
+
+class CountStrategyTestCase(TestCase):
+
+    def setUp(self):
+        self.page = create_page()
+        for i in range(3):
+            create_feedback(self.page, positive=i % 2 == 0)
+
+    def cached(self, **options) -> counting.CachedCount:
+        return counting.CachedCount({"KEY_PREFIX": f"test-{uuid.uuid4().hex}", **options})
+
+    def test_exact_count(self):
+        strategy = counting.ExactCount()
+        self.assertEqual(strategy.count(Feedback.objects.all(), "key"), (3, False))
+
+    def test_cached_count(self):
+        strategy = self.cached()
+        self.assertEqual(strategy.count(Feedback.objects.all(), "all"), (3, False))
+
+        create_feedback(self.page)
+        with self.assertNumQueries(0):
+            self.assertEqual(strategy.count(Feedback.objects.all(), "all"), (3, False))
+        # Keyed by the filters.
+        self.assertEqual(strategy.count(Feedback.objects.filter(positive=False), "negative"), (1, False))
+
+        strategy.invalidate()
+        self.assertEqual(strategy.count(Feedback.objects.all(), "all"), (4, False))
+
+    def test_new_feedback_invalidates_the_configured_strategy(self):
+        strategy = self.cached()
+        strategy.count(Feedback.objects.all(), "all")
+
+        with mock.patch.object(counting, "get_count_strategy", return_value=strategy):
+            create_feedback(self.page)
+        self.assertEqual(strategy.count(Feedback.objects.all(), "all"), (4, False))
+
+    def test_estimated_count(self):
+        strategy = counting.EstimatedCount({"THRESHOLD": 1000, "FALLBACK": counting.ExactCount})
+        self.assertTrue(strategy.is_unfiltered(Feedback.objects.all()))
+        self.assertFalse(strategy.is_unfiltered(Feedback.objects.filter(positive=True)))
+
+        with mock.patch.object(strategy, "estimate", return_value=250_000):
+            self.assertEqual(strategy.count(Feedback.objects.all(), "all"), (250_000, True))
+            self.assertEqual(strategy.count(Feedback.objects.filter(positive=True), "positive"), (2, False))
+
+        # Small tables are counted.
+        with mock.patch.object(strategy, "estimate", return_value=10):
+            self.assertEqual(strategy.count(Feedback.objects.all(), "all"), (3, False))
+
+    @skipIf(connection.vendor == "postgresql", "Estimates are only unavailable on other databases.")
+    def test_estimate_needs_postgresql(self):
+        strategy = counting.EstimatedCount({"THRESHOLD": 1, "FALLBACK": counting.ExactCount})
+        self.assertIsNone(strategy.estimate(Feedback.objects.all()))
+        self.assertEqual(strategy.count(Feedback.objects.all(), "all"), (3, False))
+
+    def test_paginator_shows_approximate_counts(self):
+        superuser = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(superuser)
+
+        strategy = counting.EstimatedCount({"THRESHOLD": 1})
+        with mock.patch.object(counting, "get_count_strategy", return_value=strategy), \
+                mock.patch.object(strategy, "estimate", return_value=1234):
+            response = self.client.get(reverse("feedback_api"), HTTP_HX_REQUEST="true")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "About 1234 results")
+
+    def test_count_key_ignores_parameter_order_and_paging(self):
+        superuser = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(superuser)
+
+        keys = []
+        original = counting.ExactCount.count
+
+        def count(strategy, queryset, key):
+            keys.append(key)
+            return original(strategy, queryset, key)
+
+        with mock.patch.object(counting.ExactCount, "count", count):
+            self.client.get(reverse("feedback_api") + "?attitude=2&by_message=1", HTTP_HX_REQUEST="true")
+            self.client.get(reverse("feedback_api") + "?by_message=1&attitude=2&page=1", HTTP_HX_REQUEST="true")
+
+        self.assertEqual(len(keys), 2)
+        self.assertEqual(keys[0], keys[1])
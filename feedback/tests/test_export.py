@@ -0,0 +1,82 @@
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import export
+from ..models import Feedback
+from .utils import create_feedback, create_page
+
+
+class ExportTestCase(TestCase):
+
+    def setUp(self):
+        self.page = create_page()
+        self.other_page = create_page("Other")
+        create_feedback(self.page, positive=True, message="=HYPERLINK(\"http://evil.example\")")
+        create_feedback(self.page, positive=False, message="-1 would not recommend")
+        create_feedback(self.page, positive=True, message="Fine, \"really\"\nthanks")
+        create_feedback(self.other_page, positive=False)
+
+        self.superuser = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(self.superuser)
+
+    def read_csv(self, content: str) -> list[dict]:
+        return list(csv.DictReader(io.StringIO(content)))
+
+    def test_escape_cell(self):
+        for value in ("=1+1", "+1", "-1", "@SUM(A1)", "\tx", "\rx"):
+            self.assertEqual(export.escape_cell(value), f"'{value}")
+
+        self.assertEqual(export.escape_cell("Fine"), "Fine")
+        self.assertEqual(export.escape_cell(-1), -1)
+        self.assertIsNone(export.escape_cell(None))
+
+    def test_csv_escapes_formulas(self):
+        content = "".join(export.stream(Feedback.objects.filter(page=self.page).order_by("pk")))
+        rows = self.read_csv(content)
+
+        self.assertEqual(list(rows[0]), Feedback.export_fields)
+        self.assertEqual([row["message"] for row in rows], [
+            "'=HYPERLINK(\"http://evil.example\")",
+            "'-1 would not recommend",
+            "Fine, \"really\"\nthanks",
+        ])
+
+    def test_ndjson_is_not_escaped(self):
+        lines = "".join(export.stream(Feedback.objects.filter(page=self.page).order_by("pk"), format="ndjson")).splitlines()
+        rows = [json.loads(line) for line in lines]
+
+        self.assertEqual(rows[0]["message"], "=HYPERLINK(\"http://evil.example\")")
+        self.assertEqual(rows[1]["positive"], False)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            export.stream(Feedback.objects.all(), format="xlsx")
+
+        response = self.client.get(reverse("feedback_api_export"), {"format": "xlsx"}, HTTP_HX_REQUEST="true")
+        self.assertEqual(response.status_code, 400)
+
+    def test_view_streams_the_filtered_feedback(self):
+        response = self.client.get(
+            reverse("page_feedback_api_export", kwargs={"page_pk": self.page.pk}),
+            {"attitude": "1"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Disposition"], f'attachment; filename="feedback-{self.page.pk}.csv"')
+
+        rows = self.read_csv(b"".join(response.streaming_content).decode())
+        self.assertEqual([row["message"] for row in rows], ["'-1 would not recommend"])
+
+    def test_command(self):
+        stdout = io.StringIO()
+        call_command("export_feedback", "--format", "ndjson", "--page", str(self.other_page.pk), stdout=stdout)
+
+        rows = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["page_id"], self.other_page.pk)
@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from wagtail.models import PageViewRestriction
+
+from .. import fragments, pageinfo
+from .utils import create_page
+
+
+FRAGMENT_CACHE = {"CACHE": "default", "KEY_PREFIX": "test-fragment", "TIMEOUT": 60}
+
+
+@override_settings(FEEDBACK_FRAGMENT_CACHE=FRAGMENT_CACHE)
+class FragmentCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.page = create_page()
+        self.page.save_revision().publish()
+        self.page.refresh_from_db()
+        self.addCleanup(cache.clear)
+
+    def test_fragment_is_cached_per_revision(self):
+        html = fragments.render_cached(self.page)
+        # The token is filled in by `feedback-state.js`.
+        self.assertIn('name="csrfmiddlewaretoken" value=""', html)
+        self.assertEqual(cache.get(fragments.cache_key(self.page)), html)
+
+        with mock.patch.object(fragments, "render") as render:
+            self.assertEqual(fragments.render_cached(self.page), html)
+        render.assert_not_called()
+
+        revision = self.page.save_revision()
+        revision.publish()
+        self.page.refresh_from_db()
+        self.assertIsNone(cache.get(fragments.cache_key(self.page)))
+
+    def test_previews_are_not_cached(self):
+        request = RequestFactory().get("/")
+        request.is_preview = True
+
+        with mock.patch.object(fragments, "render", return_value="draft") as render:
+            self.assertEqual(fragments.render_cached(self.page, request=request), "draft")
+            self.assertEqual(fragments.render_cached(self.page, request=request), "draft")
+        self.assertEqual(render.call_count, 2)
+        self.assertIsNone(cache.get(fragments.cache_key(self.page)))
+
+
+class FeedbackStateTestCase(TestCase):
+
+    def setUp(self):
+        self.page = create_page()
+        self.url = reverse("feedback:feedback_state", kwargs={"page_pk": self.page.pk})
+        self.addCleanup(cache.clear)
+
+    def test_state(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("no-cache", response["Cache-Control"])
+        data = response.json()
+        self.assertFalse(data["voted"])
+        self.assertTrue(data["csrf_token"])
+
+        session = self.client.session
+        session[f"user-feedback-{self.page.pk}"] = True
+        session.save()
+        self.assertTrue(self.client.get(self.url).json()["voted"])
+
+    def test_page_is_not_loaded(self):
+        pageinfo.get_page_info(self.page.pk)
+
+        # The session only.
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_private_pages_are_not_found(self):
+        PageViewRestriction.objects.create(page=self.page, restriction_type=PageViewRestriction.LOGIN)
+        pageinfo.invalidate(self.page.pk)
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(self.client.post(self.url).status_code, 405)
@@ -0,0 +1,83 @@
+
+from django.db import connection
+from django.test import RequestFactory, TestCase
+
+from .. import analysis
+from ..backends.ip import IPBasedFeedbackend
+from ..models import Feedback, FeedbackRollup, PageFeedbackSummary
+from .utils import create_page, executed_queries, query_plan, queryset_plan
+
+
+class QueryPlanTestCase(TestCase):
+    """
+        The hot queries are answered from the indexes in `Feedback.Meta.indexes`
+        instead of scanning the feedback table.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.page = create_page()
+        cls.other_page = create_page("Other")
+        for page in (cls.page, cls.other_page):
+            Feedback.objects.bulk_create([
+                Feedback(page=page, positive=i % 3 != 0, message="Hello there" if i % 4 == 0 else None, ip_address=f"10.0.0.{i % 16}")
+                for i in range(64)
+            ])
+
+    def assertUsesIndex(self, plan: str, name: str):
+        self.assertIn(name, plan, msg=f"{name} is not used:\n{plan}")
+
+    def assertNotSorted(self, plan: str):
+        if connection.vendor == "postgresql":
+            self.assertNotIn("Sort", plan, msg=plan)
+        else:
+            self.assertNotIn("TEMP B-TREE FOR ORDER BY", plan, msg=plan)
+
+    def test_page_listing(self):
+        plan = queryset_plan(Feedback.objects.for_page(self.page).order_by("-created_at", "-pk")[:25])
+        self.assertUsesIndex(plan, "feedback_page_created_idx")
+
+    def test_page_listing_by_attitude(self):
+        # SQLite does not match `WHERE positive` to the `positive` column of an index,
+        # it still finds the rows of the page and their order in one of the page indexes.
+        plan = queryset_plan(Feedback.objects.for_page(self.page).positive().order_by("-created_at")[:25])
+        self.assertUsesIndex(plan, "feedback_page_")
+        self.assertNotSorted(plan)
+
+    def test_page_aggregation(self):
+        plan = queryset_plan(Feedback.objects.for_page(self.page).aggregate_percentage("date"))
+        self.assertUsesIndex(plan, "feedback_page_pos_created_idx")
+
+    def test_rollup_aggregation(self):
+        plan = queryset_plan(FeedbackRollup.objects.filter(page=self.page).aggregate_percentage("date"))
+        # SQLite creates the index of a unique constraint with the table, under a name of its own.
+        if connection.vendor == "sqlite":
+            self.assertUsesIndex(plan, "sqlite_autoindex_feedback_feedbackrollup")
+        else:
+            self.assertUsesIndex(plan, "feedback_rollup_unique_bucket")
+
+    def test_duplicate_vote_check(self):
+        self.assertDuplicateCheckUses(False, "feedback_ip_page_vote_idx")
+
+    def test_duplicate_message_check(self):
+        self.assertDuplicateCheckUses(True, "feedback_ip_page_message_idx")
+
+    def assertDuplicateCheckUses(self, exists: bool, name: str):
+        request = RequestFactory().post("/", REMOTE_ADDR="10.0.0.1")
+        backend = IPBasedFeedbackend()
+
+        queries = executed_queries(lambda: backend.is_duplicate(request, self.page, None, exists=exists))
+        self.assertEqual(len(queries), 1)
+        self.assertUsesIndex(query_plan(*queries[0]), name)
+
+    def test_cluster_listing(self):
+        plan = queryset_plan(Feedback.objects.filter(message_cluster=1).order_by("-created_at"))
+        self.assertUsesIndex(plan, "feedback_cluster_created_idx")
+        self.assertNotSorted(plan)
+
+    def test_unanalyzed_messages(self):
+        self.assertUsesIndex(queryset_plan(analysis.pending_messages()), "feedback_unanalyzed_idx")
+
+    def test_page_summaries_by_last_feedback(self):
+        plan = queryset_plan(PageFeedbackSummary.objects.order_by("-last_feedback_at")[:25])
+        self.assertUsesIndex(plan, "feedback_summary_last_idx")
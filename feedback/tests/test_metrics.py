@@ -0,0 +1,92 @@
+import datetime
+
+from django.db import models
+from django.test import TestCase
+from django.utils import timezone
+
+from .. import metrics
+from ..models import Feedback, PageFeedbackSummary
+from .utils import create_feedback, create_page
+
+
+class WilsonIntervalTestCase(TestCase):
+
+    def test_known_intervals(self):
+        for (positive, total), (lower, upper) in {
+            (50, 100): (40.383, 59.617),
+            (9, 10): (59.584, 98.212),
+            (1, 1): (20.654, 100.0),
+            (0, 4): (0.0, 48.990),
+        }.items():
+            with self.subTest(positive=positive, total=total):
+                bounds = metrics.wilson_interval(positive, total)
+                self.assertAlmostEqual(bounds[0], lower, places=2)
+                self.assertAlmostEqual(bounds[1], upper, places=2)
+
+    def test_no_votes(self):
+        self.assertEqual(metrics.wilson_interval(0, 0), (None, None))
+
+    def test_more_votes_narrow_the_interval(self):
+        previous = 100.0
+        for total in (4, 40, 400, 4000):
+            lower, upper = metrics.wilson_interval(total * 3 // 4, total)
+            self.assertLess(lower, 75.0)
+            self.assertGreater(upper, 75.0)
+            self.assertLess(upper - lower, previous)
+            previous = upper - lower
+
+    def test_database_bounds_match(self):
+        page = create_page()
+        for i in range(7):
+            create_feedback(page, positive=i < 5)
+        PageFeedbackSummary.objects.create(page=create_page("Empty"), votes=0)
+
+        summaries = PageFeedbackSummary.objects.annotate(
+            **dict(zip(("lower", "upper"), metrics.wilson_bounds(models.F("positive_votes"), models.F("votes")))),
+        )
+        bounds = dict(summaries.values_list("page__title", "lower"))
+        self.assertIsNone(bounds["Empty"])
+        self.assertAlmostEqual(bounds["Feedback"], metrics.wilson_interval(5, 7)[0])
+
+        upper = summaries.get(page=page).upper
+        self.assertAlmostEqual(upper, metrics.wilson_interval(5, 7)[1])
+
+
+class SeriesTestCase(TestCase):
+
+    def setUp(self):
+        self.page = create_page()
+        self.today = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0)
+
+    def test_cumulative_and_moving_metrics(self):
+        for days_ago, positive in ((40, True), (40, True), (10, False), (3, True), (0, False)):
+            create_feedback(self.page, positive=positive, created_at=self.today - datetime.timedelta(days=days_ago))
+
+        rows = Feedback.objects.filter(page=self.page).aggregate_percentage("date").trends()
+        self.assertEqual([row["total"] for row in rows], [1, 1, 1, 2])
+
+        newest, _, _, oldest = rows
+        self.assertEqual((oldest["cumulative_total"], oldest["cumulative_positive"]), (2, 2))
+        self.assertEqual((newest["cumulative_total"], newest["cumulative_percentage"]), (5, 60.0))
+
+        # The 7 day window holds today and 3 days ago, the 30 day window adds 10 days ago.
+        self.assertEqual((newest["total_7d"], newest["positive_percentage_7d"]), (2, 50.0))
+        self.assertEqual(newest["total_30d"], 3)
+        self.assertAlmostEqual(newest["positive_percentage_30d"], 100 / 3)
+        self.assertEqual((newest["wilson_lower"], newest["wilson_upper"]), metrics.wilson_interval(0, 1))
+
+    def test_no_moving_windows_for_months(self):
+        create_feedback(self.page)
+        row, = Feedback.objects.filter(page=self.page).aggregate_percentage("month").trends()
+        self.assertEqual(row["cumulative_total"], 1)
+        self.assertNotIn("total_7d", row)
+
+    def test_gap_filled_series(self):
+        create_feedback(self.page, created_at=self.today - datetime.timedelta(days=2))
+        create_feedback(self.page, positive=False, created_at=self.today)
+
+        rows = metrics.annotate_series(Feedback.objects.filter(page=self.page).aggregate_percentage("date").fill_gaps(), "date")
+        self.assertEqual([row["total"] for row in rows], [1, 0, 1])
+        self.assertEqual([row["cumulative_total"] for row in rows], [2, 1, 1])
+        self.assertIsNone(rows[1]["wilson_lower"])
+        self.assertEqual(rows[0]["positive_percentage_7d"], 50.0)
@@ -0,0 +1,67 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.urls import reverse
+from wagtail.models import GroupPagePermission
+
+from ..models import Feedback, MessageCluster, PageFeedbackSummary
+from .utils import RollupsTestCase, create_feedback, create_page
+
+
+class BulkModerationTestCase(RollupsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.page = create_page()
+        self.feedback = [
+            create_feedback(self.page, positive=i % 2 == 0, message=f"Buy cheap watches at http://spam.example now {i}" if i % 3 == 0 else None)
+            for i in range(12)
+        ]
+        self.url = reverse("page_feedback_api_bulk", kwargs={"page_pk": self.page.pk})
+        self.superuser = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(self.superuser)
+
+    def post(self, data: dict, query: str = ""):
+        return self.client.post(
+            self.url + query, json.dumps(data), content_type="application/json", HTTP_ACCEPT="application/json",
+        )
+
+    def test_unfiltered_requires_all(self):
+        self.assertEqual(self.post({"action": "delete"}).status_code, 400)
+        self.assertEqual(Feedback.objects.filter(page=self.page).count(), 12)
+
+        response = self.post({"action": "delete", "all": True})
+        self.assertEqual(response.json()["processed"], 12)
+        self.assertFalse(Feedback.objects.filter(page=self.page).exists())
+        self.assertEqual(PageFeedbackSummary.objects.get(page=self.page).votes, 0)
+
+    def test_unknown_action(self):
+        self.assertEqual(self.post({"action": "nuke", "all": True}).status_code, 400)
+
+    def test_mark_ids(self):
+        ids = [instance.pk for instance in self.feedback[:5]]
+        response = self.post({"action": "reviewed", "ids": ids})
+        self.assertEqual(response.json()["processed"], 5)
+        self.assertEqual(set(Feedback.objects.filter(moderation_status="reviewed").values_list("pk", flat=True)), set(ids))
+
+    def test_delete_filtered(self):
+        response = self.post({"action": "delete"}, query="?attitude=2")
+        self.assertEqual(response.json()["processed"], 6)
+
+        summary = PageFeedbackSummary.objects.get(page=self.page)
+        self.assertEqual((summary.votes, summary.positive_votes, summary.negative_votes), (6, 0, 6))
+        for cluster in MessageCluster.objects.all():
+            self.assertEqual(cluster.size, Feedback.objects.filter(message_cluster=cluster).count())
+
+    def test_permissions(self):
+        group = Group.objects.create(name="Feedback moderators")
+        group.permissions.set(Permission.objects.filter(codename__in=["access_admin", "view_feedback", "change_feedback"]))
+        GroupPagePermission.objects.create(group=group, page=self.page, permission=Permission.objects.get(codename="change_page"))
+        user = get_user_model().objects.create_user("moderator", password="password")
+        user.groups.add(group)
+        self.client.force_login(user)
+
+        self.assertEqual(self.post({"action": "delete", "all": True}).status_code, 403)
+        self.assertEqual(Feedback.objects.filter(page=self.page).count(), 12)
+        self.assertEqual(self.post({"action": "spam", "all": True}).json()["processed"], 12)
@@ -0,0 +1,60 @@
+import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Feedback
+from ..pagination import CursorPaginator, KeysetPaginator
+from .utils import create_page
+
+
+class PaginationTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.page = create_page()
+        now = timezone.now()
+        # Three rows share every timestamp, the primary key breaks the ties.
+        Feedback.objects.bulk_create([
+            Feedback(page=cls.page, positive=True, created_at=now - datetime.timedelta(minutes=i // 3))
+            for i in range(25)
+        ])
+        cls.ordered = list(Feedback.objects.order_by("-created_at", "-pk").values_list("pk", flat=True))
+
+    def walk(self, paginator) -> tuple[list, list]:
+        forward, pages = [], []
+        page = paginator.get_page()
+        while True:
+            pages.append(page)
+            forward += [row.pk for row in page]
+            if not page.has_next():
+                break
+            page = paginator.get_page(page.next_cursor)
+
+        backward = []
+        page = pages[-1]
+        while page.has_previous():
+            page = paginator.get_page(page.previous_cursor)
+            backward = [row.pk for row in page] + backward
+        return forward, backward
+
+    def test_cursor_pagination(self):
+        forward, backward = self.walk(CursorPaginator(Feedback.objects.filter(page=self.page), 7))
+        self.assertEqual(forward, self.ordered)
+        self.assertEqual(backward, self.ordered[:len(backward)])
+        self.assertEqual(len(backward), 21)
+
+    def test_malformed_cursor_starts_over(self):
+        paginator = CursorPaginator(Feedback.objects.filter(page=self.page), 7)
+        self.assertEqual(
+            [row.pk for row in paginator.get_page("garbage!!")],
+            self.ordered[:7],
+        )
+
+    def test_keyset_pagination(self):
+        queryset = Feedback.objects.filter(page=self.page)
+        forward, _ = self.walk(KeysetPaginator(queryset, 7, ["-created_at", "-pk"]))
+        self.assertEqual(forward, self.ordered)
+
+        forward, _ = self.walk(KeysetPaginator(queryset, 4, ["created_at", "-pk"]))
+        self.assertEqual(forward, list(queryset.order_by("created_at", "-pk").values_list("pk", flat=True)))
@@ -0,0 +1,98 @@
+import uuid
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.exceptions import ImproperlyConfigured
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from ..backends import Feedbackend, ratelimit
+from .utils import create_page
+
+
+def make_request(ip_address: str = "10.0.0.1"):
+    return RequestFactory().post("/", REMOTE_ADDR=ip_address)
+
+
+class RateLimiterTestCase(TestCase):
+
+    def limiter(self, **options) -> ratelimit.RateLimiter:
+        return ratelimit.RateLimiter({"KEY_PREFIX": f"test-{uuid.uuid4().hex}", **options})
+
+    def test_parse_rate(self):
+        self.assertEqual(ratelimit.parse_rate("10/m"), (10, 60))
+        self.assertEqual(ratelimit.parse_rate(" 100 / 15m "), (100, 15 * 60))
+        self.assertEqual(ratelimit.parse_rate("1/d"), (1, 60 * 60 * 24))
+
+        for rate in ("10", "10/w", "/m", None):
+            with self.assertRaises(ImproperlyConfigured):
+                ratelimit.parse_rate(rate)
+
+    def test_limit_per_page(self):
+        limiter = self.limiter(RATE="2/m")
+        with mock.patch.object(ratelimit.time, "time", return_value=6000.0):
+            self.assertIsNone(limiter.check(make_request(), 1))
+            self.assertIsNone(limiter.check(make_request(), 1))
+            self.assertEqual(limiter.check(make_request(), 1), 60)
+
+            self.assertIsNone(limiter.check(make_request(), 2))
+            self.assertIsNone(limiter.check(make_request("10.0.0.2"), 1))
+
+        self.assertEqual(limiter.stats(), {"allowed": 4, "limited": 1, "limited_total": 1})
+
+    def test_limit_per_address(self):
+        limiter = self.limiter(ADDRESS_RATE="3/h")
+        with mock.patch.object(ratelimit.time, "time", return_value=7200.0 + 600):
+            for page_pk in range(3):
+                self.assertIsNone(limiter.check(make_request(), page_pk))
+            self.assertEqual(limiter.check(make_request(), 99), 3000)
+
+    def test_previous_window_slides_out(self):
+        limiter = self.limiter(RATE="4/m")
+        with mock.patch.object(ratelimit.time, "time", return_value=6000.0):
+            for _ in range(4):
+                self.assertIsNone(limiter.check(make_request(), 1))
+
+        # A sixth into the next window, five sixths of the previous window still count.
+        with mock.patch.object(ratelimit.time, "time", return_value=6070.0):
+            self.assertIsNotNone(limiter.check(make_request(), 1))
+
+        # At the end of the next window almost nothing of it is left.
+        with mock.patch.object(ratelimit.time, "time", return_value=6119.0):
+            self.assertIsNone(limiter.check(make_request(), 1))
+
+    def test_async_check(self):
+        limiter = self.limiter(RATE="1/m")
+        with mock.patch.object(ratelimit.time, "time", return_value=6000.0):
+            self.assertIsNone(async_to_sync(limiter.acheck)(make_request(), 1))
+            self.assertEqual(async_to_sync(limiter.acheck)(make_request(), 1), 60)
+            # Shares the counts with the sync check.
+            self.assertEqual(limiter.check(make_request(), 1), 60)
+
+
+class RateLimitedViewsTestCase(TestCase):
+
+    def setUp(self):
+        self.page = create_page()
+        backend = Feedbackend({"RATE_LIMIT": {"RATE": "1/h", "KEY_PREFIX": f"test-{uuid.uuid4().hex}"}})
+        for view_module in ("public", "asynchronous"):
+            patcher = mock.patch(f"feedback.views.{view_module}.get_feedback_backend", return_value=backend)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_limited_before_the_page_is_loaded(self):
+        url = reverse("feedback:feedback_vote", kwargs={"page_pk": self.page.pk})
+        self.client.post(url, {"positive": "true"})
+
+        with self.assertNumQueries(0):
+            response = self.client.post(url, {"positive": "true"})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+
+    def test_limited_form_submission(self):
+        url = reverse("feedback:feedback", kwargs={"page_pk": self.page.pk})
+        self.client.post(url, {"positive": "true"}, HTTP_HX_REQUEST="true")
+
+        response = self.client.post(url, {"positive": "true"}, HTTP_HX_REQUEST="true")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from wagtail import hooks
+
+from .. import counting, registry
+from ..backends import CookieFeedbackend, get_feedback_backend
+from ..forms import FeedbackForm
+from ..models import Feedback, FeedbackRollup
+from ..views.public import before_feedback_form_valid
+from .utils import create_feedback, create_page
+
+
+class OtherFeedbackForm(FeedbackForm):
+    pass
+
+
+class RegistryTestCase(TestCase):
+
+    def setUp(self):
+        self.page = create_page()
+        self.addCleanup(cache.clear)
+        self.addCleanup(registry.clear)
+
+    def test_backend_is_shared_until_the_setting_changes(self):
+        backend = get_feedback_backend()
+        self.assertIs(get_feedback_backend(), backend)
+
+        with override_settings(FEEDBACK_BACKEND={"CLASS": "feedback.backends.CookieFeedbackend"}):
+            self.assertIsInstance(get_feedback_backend(), CookieFeedbackend)
+            # Explicit classes use the options of the current setting.
+            self.assertIsInstance(get_feedback_backend(klass=CookieFeedbackend), CookieFeedbackend)
+        self.assertIs(type(get_feedback_backend()), type(backend))
+
+    def test_form_class_follows_the_setting(self):
+        self.assertIs(Feedback.get_form_class(), FeedbackForm)
+        with override_settings(FEEDBACK_FORM_CLASS=OtherFeedbackForm):
+            self.assertIs(Feedback.get_form_class(), OtherFeedbackForm)
+
+    def test_hooks_registered_later_are_run(self):
+        url = reverse("feedback:feedback_vote", kwargs={"page_pk": self.page.pk})
+        calls = []
+
+        with mock.patch("feedback.views.public.get_write_buffer", return_value=None):
+            Client().post(url, {"positive": "true"})
+            with hooks.register_temporarily(before_feedback_form_valid, lambda request, form: calls.append(form)):
+                Client().post(url, {"positive": "true"})
+            Client().post(url, {"positive": "true"})
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(Feedback.objects.count(), 3)
+
+    def test_settings_are_read_when_used(self):
+        with override_settings(FEEDBACK_USE_ROLLUPS=False):
+            create_feedback(self.page)
+            self.assertFalse(FeedbackRollup.objects.exists())
+
+        with override_settings(FEEDBACK_USE_ROLLUPS=True):
+            create_feedback(self.page)
+            self.assertTrue(FeedbackRollup.objects.exists())
+
+        with override_settings(FEEDBACK_COUNT_STRATEGY={"CLASS": "feedback.counting.CachedCount"}):
+            self.assertIsInstance(counting.get_count_strategy(), counting.CachedCount)
+
+    def test_cursor_pagination_follows_the_setting(self):
+        superuser = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(superuser)
+        create_feedback(self.page)
+
+        for enabled in (True, False):
+            with override_settings(FEEDBACK_CURSOR_PAGINATION=enabled):
+                response = self.client.get(reverse("feedback_api"), HTTP_HX_REQUEST="true")
+                self.assertEqual(response.context["cursor_pagination"], enabled)
@@ -0,0 +1,86 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..metrics import wilson_interval
+from .utils import create_feedback, create_page
+
+
+class PageReportTestCase(TestCase):
+
+    def setUp(self):
+        now = timezone.now()
+        recent = now - datetime.timedelta(days=2)
+        earlier = now - datetime.timedelta(days=40)
+
+        self.pages = {title: create_page(title) for title in ("Liked", "Few", "Split", "Improving")}
+        for i in range(10):
+            create_feedback(self.pages["Liked"], positive=i > 0, created_at=recent)
+        for _ in range(2):
+            create_feedback(self.pages["Few"], positive=True, created_at=recent)
+        for i in range(20):
+            create_feedback(self.pages["Split"], positive=i % 2 == 0, created_at=recent)
+        for _ in range(4):
+            create_feedback(self.pages["Improving"], positive=False, created_at=earlier)
+            create_feedback(self.pages["Improving"], positive=True, created_at=recent)
+
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "password"))
+
+    def report(self, **params) -> list[dict]:
+        response = self.client.get(
+            reverse("feedback_api_pages"), params, CONTENT_TYPE="application/json", HTTP_ACCEPT="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def titles(self, **params) -> list[str]:
+        return [row["title"] for row in self.report(**params)]
+
+    def test_orderings(self):
+        expected = {
+            "most_positive": ["Few", "Liked", "Split", "Improving"],
+            "least_positive": ["Split", "Improving", "Liked", "Few"],
+            "most_votes": ["Split", "Liked", "Improving", "Few"],
+            # Pages without votes in one of the windows rank as unchanged.
+            "trending_up": ["Improving", "Split", "Liked", "Few"],
+            "trending_down": ["Split", "Liked", "Few", "Improving"],
+            "most_confident": ["Liked", "Few", "Split", "Improving"],
+            "least_confident": ["Split", "Improving", "Liked", "Few"],
+        }
+        for ordering, titles in expected.items():
+            with self.subTest(ordering=ordering):
+                self.assertEqual(self.titles(ordering=ordering), titles)
+
+        self.assertEqual(self.titles(), expected["most_positive"])
+        self.assertEqual(self.titles(ordering="unknown"), expected["most_positive"])
+
+    def test_rows(self):
+        rows = {row["title"]: row for row in self.report()}
+
+        improving = rows["Improving"]
+        self.assertEqual(
+            (improving["total"], improving["positive_count"], improving["negative_count"], improving["positive_percentage"]),
+            (8, 4, 4, 50.0),
+        )
+        self.assertAlmostEqual(improving["trend"], 100.0)
+        self.assertIsNone(rows["Liked"]["trend"])
+
+        lower, upper = wilson_interval(9, 10)
+        self.assertAlmostEqual(rows["Liked"]["wilson_lower"], lower)
+        self.assertAlmostEqual(rows["Liked"]["wilson_upper"], upper)
+
+    def test_minimum_votes_and_confidence(self):
+        self.assertEqual(self.titles(min_votes=8), ["Liked", "Split", "Improving"])
+
+        self.assertLess(wilson_interval(10, 20)[0], 30)
+        self.assertGreater(wilson_interval(2, 2)[0], 30)
+        self.assertEqual(self.titles(min_confidence=30, ordering="most_confident"), ["Liked", "Few"])
+        self.assertEqual(self.titles(min_votes=8, min_confidence=30), ["Liked"])
+
+    def test_trend_days(self):
+        # With 60 days both halves of the votes of "Improving" are in the current window.
+        rows = {row["title"]: row for row in self.report(ordering="trending_up", trend_days=60)}
+        self.assertIsNone(rows["Improving"]["trend"])
@@ -0,0 +1,121 @@
+import datetime
+import io
+import json
+import os
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from .. import retention, rollups, summaries
+from ..models import Feedback, FeedbackRollup, PageFeedbackSummary
+from .utils import RollupsTestCase, create_feedback, create_page
+
+
+class RetentionTestCase(RollupsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.page = create_page()
+        now = timezone.now()
+        for i in range(10):
+            create_feedback(self.page, positive=i % 2 == 0, created_at=now - datetime.timedelta(days=i * 20), ip_address=f"10.0.0.{i}")
+
+    def rollup_totals(self) -> dict:
+        return {
+            period: sum(FeedbackRollup.objects.filter(page=self.page, period=period).values_list("votes", flat=True))
+            for period in rollups.ROLLUP_PERIODS
+        }
+
+    def test_cutoff_is_the_start_of_a_day(self):
+        now = timezone.make_aware(datetime.datetime(2024, 6, 15, 13, 45))
+        self.assertEqual(retention.cutoff(10, now=now), timezone.make_aware(datetime.datetime(2024, 6, 5)))
+
+    def test_purge_keeps_counts(self):
+        totals = self.rollup_totals()
+        self.assertEqual(retention.purge_feedback(100, chunk_size=3), 4)
+        self.assertEqual(Feedback.objects.filter(page=self.page).count(), 6)
+        self.assertFalse(Feedback.objects.filter(created_at__lt=retention.cutoff(100)).exists())
+        self.assertEqual(self.rollup_totals(), totals)
+
+        summary = PageFeedbackSummary.objects.get(page=self.page)
+        self.assertEqual((summary.votes, summary.positive_votes), (10, 5))
+
+        summaries.rebuild_summaries(since=retention.cutoff(100))
+        summary.refresh_from_db()
+        self.assertEqual((summary.votes, summary.positive_votes), (10, 5))
+
+        rollups.rebuild_rollups(since=retention.cutoff(100))
+        self.assertEqual(self.rollup_totals(), totals)
+
+    def test_purge_in_chunks(self):
+        progress = []
+        retention.purge_feedback(100, chunk_size=3, progress=progress.append)
+        self.assertEqual([stats["purged"] for stats in progress], [3, 4])
+
+        self.assertEqual(retention.purge_feedback(100), 0)
+
+    def test_purge_requires_rollups(self):
+        with override_settings(FEEDBACK_USE_ROLLUPS=False):
+            with self.assertRaises(ImproperlyConfigured):
+                retention.purge_feedback(100)
+        self.assertEqual(Feedback.objects.filter(page=self.page).count(), 10)
+
+    def test_archive(self):
+        expired = set(retention.expired(100).values_list("pk", flat=True))
+
+        with tempfile.TemporaryDirectory() as directory:
+            retention.purge_feedback(100, archive_dir=directory, chunk_size=3)
+            filename, = os.listdir(directory)
+            with open(os.path.join(directory, filename)) as f:
+                rows = [json.loads(line) for line in f]
+
+        self.assertEqual({row["id"] for row in rows}, expired)
+        self.assertEqual({row["page_id"] for row in rows}, {self.page.pk})
+
+    def test_clear_ip_addresses(self):
+        self.assertEqual(retention.clear_ip_addresses(30), 8)
+        self.assertEqual(Feedback.objects.filter(ip_address__isnull=False).count(), 2)
+        self.assertEqual(retention.clear_ip_addresses(30, chunk_size=3), 0)
+
+
+class PurgeFeedbackCommandTestCase(RollupsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.page = create_page()
+        create_feedback(self.page, created_at=timezone.now() - datetime.timedelta(days=400), ip_address="10.0.0.1")
+        create_feedback(self.page, created_at=timezone.now() - datetime.timedelta(days=60), ip_address="10.0.0.2")
+        create_feedback(self.page, ip_address="10.0.0.3")
+
+    def call(self, *args) -> str:
+        stdout = io.StringIO()
+        call_command("purge_feedback", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_nothing_configured(self):
+        with self.assertRaises(CommandError):
+            self.call()
+
+    def test_dry_run(self):
+        output = self.call("--days", "365", "--ip-address-days", "30", "--dry-run")
+        self.assertIn("1 feedback rows", output)
+        self.assertIn("2 IP addresses", output)
+        self.assertEqual(Feedback.objects.filter(ip_address__isnull=False).count(), 3)
+
+    @override_settings(FEEDBACK_RETENTION={"DAYS": 365, "IP_ADDRESS_DAYS": 30})
+    def test_policy(self):
+        output = self.call()
+        self.assertIn("Purged 1 feedback rows", output)
+        self.assertIn("Cleared 1 IP addresses", output)
+        self.assertEqual(list(Feedback.objects.order_by("created_at").values_list("ip_address", flat=True)), [None, "10.0.0.3"])
+
+    @override_settings(FEEDBACK_USE_ROLLUPS=False)
+    def test_purge_without_rollups(self):
+        with self.assertRaises(CommandError):
+            self.call("--days", "365")
+        # Clearing the IP addresses does not touch the counts.
+        self.call("--ip-address-days", "30")
+        self.assertEqual(Feedback.objects.filter(ip_address__isnull=False).count(), 1)
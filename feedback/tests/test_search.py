@@ -0,0 +1,45 @@
+
+from django.test import TestCase
+
+from ..models import Feedback
+from ..search import highlight
+from .utils import create_page
+
+
+class SearchTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.page = create_page()
+        cls.broken = Feedback.objects.create(page=cls.page, positive=False, message="The checkout button is broken")
+        cls.link = Feedback.objects.create(page=cls.page, positive=False, message="Broken link in the menu, the link is broken")
+        Feedback.objects.create(page=cls.page, positive=True, message="Very helpful page")
+        Feedback.objects.create(page=cls.page, positive=True)
+
+    def search(self, query: str) -> set[int]:
+        return set(Feedback.objects.search(query).values_list("pk", flat=True))
+
+    def test_every_word_matches(self):
+        self.assertEqual(self.search("broken"), {self.broken.pk, self.link.pk})
+        self.assertEqual(self.search("broken checkout"), {self.broken.pk})
+
+    def test_last_word_is_a_prefix(self):
+        self.assertEqual(self.search("checkout butt"), {self.broken.pk})
+
+    def test_rank_and_headline(self):
+        results = list(Feedback.objects.search("link").order_by("-search_rank"))
+        self.assertEqual([instance.pk for instance in results], [self.link.pk])
+        self.assertIn("<mark>link</mark>", highlight(results[0].search_headline))
+
+    def test_quotes_are_not_syntax(self):
+        self.assertEqual(self.search('"); DROP TABLE'), set())
+
+    def test_index_follows_changes(self):
+        instance = Feedback.objects.create(page=self.page, positive=True, message="Initial message")
+        instance.message = "Updated zebra message"
+        instance.save()
+        self.assertEqual(self.search("zebra"), {instance.pk})
+        self.assertEqual(self.search("initial"), set())
+
+        instance.delete()
+        self.assertEqual(self.search("zebra"), set())
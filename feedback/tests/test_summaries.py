@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from wagtail.models import Page
+
+from ..models import Feedback, PageFeedbackSummary
+from ..panels import FeedbackPanel
+from .utils import create_feedback, create_page
+
+
+class FeedbackPanelTestCase(TestCase):
+
+    def setUp(self):
+        self.page = create_page()
+        self.request = RequestFactory().get("/")
+        self.request.user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+
+    def is_shown(self, page: Page) -> bool:
+        panel = FeedbackPanel().bind_to_model(Page)
+        return panel.get_bound_panel(instance=page, request=self.request).is_shown()
+
+    def test_shown_for_pages_with_votes(self):
+        create_feedback(self.page)
+        with self.assertNumQueries(1):
+            self.assertTrue(self.is_shown(self.page))
+
+    def test_summaries_are_authoritative(self):
+        create_feedback(self.page)
+        other_page = create_page("Other")
+        # Saved outside of the views, not in the summaries.
+        Feedback.objects.bulk_create([Feedback(page=other_page, positive=True)])
+
+        self.assertFalse(self.is_shown(other_page))
+
+    def test_feedback_rows_without_summaries(self):
+        Feedback.objects.bulk_create([Feedback(page=self.page, positive=True)])
+        self.assertFalse(PageFeedbackSummary.objects.exists())
+
+        self.assertTrue(self.is_shown(self.page))
+        self.assertFalse(self.is_shown(create_page("Other")))
+
+    def test_needs_permission_and_a_saved_page(self):
+        create_feedback(self.page)
+        self.assertFalse(self.is_shown(Page(title="New")))
+
+        self.request.user = get_user_model().objects.create_user("editor", "editor@example.com", "password")
+        self.assertFalse(self.is_shown(self.page))
+
+
+class FeedbackDeleteTestCase(TestCase):
+
+    def setUp(self):
+        self.page = create_page()
+        self.feedback = create_feedback(self.page, positive=False, message="Delete me")
+        create_feedback(self.page, positive=True)
+        self.url = reverse("feedback_api_delete", kwargs={"pk": self.feedback.pk})
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "password"))
+
+    def test_delete_updates_the_summary(self):
+        response = self.client.post(self.url, HTTP_HX_REQUEST="true")
+        self.assertEqual(response.status_code, 200)
+
+        self.assertFalse(Feedback.objects.filter(pk=self.feedback.pk).exists())
+        summary = PageFeedbackSummary.objects.get(page=self.page)
+        self.assertEqual((summary.votes, summary.positive_votes, summary.negative_votes), (1, 1, 0))
+
+    def test_failed_delete_keeps_the_summary(self):
+        with mock.patch.object(Feedback, "delete", side_effect=RuntimeError), self.assertRaises(RuntimeError):
+            self.client.post(self.url, HTTP_HX_REQUEST="true")
+
+        self.assertTrue(Feedback.objects.filter(pk=self.feedback.pk).exists())
+        summary = PageFeedbackSummary.objects.get(page=self.page)
+        self.assertEqual((summary.votes, summary.negative_votes), (2, 1))
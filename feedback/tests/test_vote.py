@@ -0,0 +1,95 @@
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import pageinfo
+from ..models import Feedback
+from .utils import create_page, executed_queries
+
+
+class VoteTestCase(TestCase):
+
+    def setUp(self):
+        self.page = create_page()
+        self.url = reverse("feedback:feedback_vote", kwargs={"page_pk": self.page.pk})
+        self.addCleanup(cache.clear)
+
+        # Saved right away, whatever `FEEDBACK_WRITE_BUFFER` the tests run with.
+        patcher = mock.patch("feedback.views.public.get_write_buffer", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def vote(self, data, client: Client = None, **extra):
+        return (client or self.client).post(self.url, json.dumps(data), content_type="application/json", **extra)
+
+    def test_negative_vote_links_the_message_form(self):
+        response = self.vote({"positive": False})
+        self.assertEqual(response.status_code, 201)
+
+        feedback = Feedback.objects.get(page=self.page)
+        self.assertFalse(feedback.positive)
+        self.assertEqual(response.json(), {
+            "positive": False,
+            "id": feedback.pk,
+            "message_url": reverse("feedback:feedback_with_message", kwargs={"page_pk": self.page.pk, "pk": feedback.pk}),
+        })
+
+    def test_positive_vote_has_no_message_form(self):
+        response = self.client.post(self.url, {"positive": "true"})
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("message_url", response.json())
+
+    def test_duplicate_vote(self):
+        self.assertEqual(self.vote({"positive": True}).status_code, 201)
+        self.assertEqual(self.vote({"positive": False}).status_code, 409)
+        self.assertEqual(Feedback.objects.filter(page=self.page).count(), 1)
+
+    def test_errors(self):
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+        self.assertEqual(self.client.post(self.url, "{", content_type="application/json").status_code, 400)
+        self.assertEqual(self.vote([True]).status_code, 400)
+
+        self.page.unpublish()
+        self.assertEqual(self.vote({"positive": True}).status_code, 404)
+
+    def test_json_votes_need_the_csrf_header(self):
+        client = Client(enforce_csrf_checks=True)
+        client.get(reverse("feedback:feedback_state", kwargs={"page_pk": self.page.pk}))
+        token = client.cookies["csrftoken"].value
+
+        self.assertEqual(self.vote({"positive": True}, client=client).status_code, 403)
+        self.assertEqual(self.vote({"positive": True}, client=client, HTTP_X_CSRFTOKEN=token).status_code, 201)
+
+    def test_page_is_not_loaded(self):
+        pageinfo.get_page_info(self.page.pk)
+
+        queries = executed_queries(lambda: self.vote({"positive": True}))
+        self.assertTrue(queries)
+        self.assertFalse([sql for sql, _ in queries if "wagtailcore_page" in sql])
+
+
+class PageInfoTestCase(TestCase):
+
+    def setUp(self):
+        self.page = create_page()
+        self.addCleanup(cache.clear)
+
+    def test_page_info_is_cached(self):
+        info = pageinfo.get_page_info(self.page.pk)
+        self.assertEqual(info, pageinfo.PageInfo(pk=self.page.pk, allow_positive_message=False, has_feedback_checks=False))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(pageinfo.get_page_info(self.page.pk), info)
+
+    def test_missing_pages_are_cached(self):
+        self.assertIsNone(pageinfo.get_page_info(0))
+        with self.assertNumQueries(0):
+            self.assertIsNone(pageinfo.get_page_info(0))
+
+    def test_unpublishing_drops_the_page_info(self):
+        pageinfo.get_page_info(self.page.pk)
+        self.page.unpublish()
+        self.assertIsNone(pageinfo.get_page_info(self.page.pk))
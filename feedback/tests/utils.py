@@ -0,0 +1,67 @@
+import datetime
+import uuid
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from wagtail.models import Page
+
+from .. import tracking
+from ..models import Feedback
+
+
+def query_plan(sql: str, params=()) -> str:
+    """
+        The query plan of `sql` as text, one line per step.
+        The tables are tiny, so PostgreSQL is told to avoid sequential scans where it can.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"EXPLAIN {sql}", params)
+        else:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+
+def queryset_plan(queryset) -> str:
+    return query_plan(*queryset.query.sql_with_params())
+
+
+def executed_queries(fn) -> list[tuple[str, tuple]]:
+    """
+        The `(sql, params)` of every query `fn` executes.
+    """
+    queries = []
+
+    def wrapper(execute, sql, params, many, context):
+        queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        fn()
+    return queries
+
+
+def create_page(title: str = "Feedback") -> Page:
+    return Page.get_first_root_node().add_child(instance=Page(
+        title=title, slug=f"{title.lower()}-{uuid.uuid4().hex[:8]}",
+    ))
+
+
+def create_feedback(page: Page, positive: bool = True, message: str = None, created_at: datetime.datetime = None, **kwargs) -> Feedback:
+    """
+        Save and count a feedback instance the way the views do.
+    """
+    instance = Feedback.objects.create(page=page, positive=positive, message=message, **kwargs)
+    if created_at is not None:
+        Feedback.objects.filter(pk=instance.pk).update(created_at=created_at)
+        instance.created_at = created_at
+    tracking.record_new_feedback(instance)
+    return instance
+
+
+@override_settings(FEEDBACK_USE_ROLLUPS=True)
+class RollupsTestCase(TestCase):
+    """
+        Counts the feedback in the rollups whatever `FEEDBACK_USE_ROLLUPS` the tests run with.
+    """
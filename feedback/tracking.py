@@ -0,0 +1,86 @@
+"""
+    Keeps everything derived from the feedback rows current when feedback is saved
+    or deleted: the rollups, the page summaries, the message clusters and the cached
+    counts of the admin listings.
+
+    The views, the write buffer and the bulk actions only call these functions,
+    so anything else derived from the feedback is added here once.
+"""
+from typing import TYPE_CHECKING, Iterable
+
+from asgiref.sync import sync_to_async
+
+from . import clusters, counting, rollups, summaries
+
+if TYPE_CHECKING:
+    from feedback.models import AbstractFeedback
+
+
+def record_new_feedback(instance: "AbstractFeedback"):
+    """
+        Count a newly saved feedback instance.
+    """
+    record_new_feedback_batch([instance])
+
+
+def record_new_feedback_batch(instances: Iterable["AbstractFeedback"]):
+    """
+        Count a batch of newly saved feedback instances.
+    """
+    instances = list(instances)
+    if not instances:
+        return
+
+    _record_batch(instances)
+    counting.invalidate_counts()
+
+
+def record_new_message(instance: "AbstractFeedback"):
+    """
+        Count a message added to already counted feedback.
+    """
+    _record_message(instance)
+    counting.invalidate_counts()
+
+
+def discard_feedback(instance: "AbstractFeedback"):
+    """
+        Remove a feedback instance which is about to be deleted.
+    """
+    discard_feedback_batch([instance])
+
+
+def discard_feedback_batch(instances: Iterable["AbstractFeedback"]):
+    """
+        Remove a batch of feedback instances which are about to be deleted.
+    """
+    instances = list(instances)
+    if not instances:
+        return
+
+    rollups.discard_feedback_batch(instances)
+    summaries.discard_feedback_batch(instances)
+    clusters.discard_feedback_batch(instances)
+    counting.invalidate_counts()
+
+
+async def arecord_new_feedback(instance: "AbstractFeedback"):
+    await sync_to_async(_record_batch)([instance])
+    await counting.ainvalidate_counts()
+
+
+async def arecord_new_message(instance: "AbstractFeedback"):
+    await sync_to_async(_record_message)(instance)
+    await counting.ainvalidate_counts()
+
+
+def _record_batch(instances: list["AbstractFeedback"]):
+    rollups.record_feedback_batch(instances)
+    summaries.record_feedback_batch(instances)
+    clusters.record_messages(instances)
+
+
+def _record_message(instance: "AbstractFeedback"):
+    rollups.record_message(instance)
+    summaries.record_message(instance)
+    clusters.record_message(instance)
@@ -1,20 +1,38 @@
 from django.urls import path
 
-from . import views
+from . import registry, views
 
 app_name = "feedback"
 
+# Chosen when the URLs are loaded, a sync or async view cannot be swapped per request.
+if registry.get_setting("FEEDBACK_ASYNC_VIEWS"):
+    feedback_view = views.afeedback
+    feedback_with_message_view = views.afeedback_with_message
+else:
+    feedback_view = views.feedback
+    feedback_with_message_view = views.feedback_with_message
+
 urlpatterns = [
-    path("feedback/<int:page_pk>/", views.feedback, name="feedback"),
-    path("feedback/<int:page_pk>/<int:pk>/", views.feedback_with_message, name="feedback_with_message"),
+    path("feedback/<int:page_pk>/", feedback_view, name="feedback"),
+    path("feedback/<int:page_pk>/<int:pk>/", feedback_with_message_view, name="feedback_with_message"),
+    path("feedback/<int:page_pk>/<uuid:token>/", feedback_with_message_view, name="feedback_with_message_token"),
+    path("feedback/<int:page_pk>/state/", views.feedback_state, name="feedback_state"),
+    path("feedback/<int:page_pk>/vote/", views.feedback_vote, name="feedback_vote"),
 ]
 
 admin_urlpatterns = [
     path("feedback/api/list/", views.FeedbackListViewAPI.as_view(), name="feedback_api"),
     path("feedback/api/chart/", views.FeedbackAggregateViewAPI.as_view(), name="feedback_api_chart"),
+    path("feedback/api/export/", views.FeedbackExportViewAPI.as_view(), name="feedback_api_export"),
+    path("feedback/api/pages/", views.FeedbackPageRankingViewAPI.as_view(), name="feedback_api_pages"),
+    path("feedback/api/bulk/", views.FeedbackBulkActionViewAPI.as_view(), name="feedback_api_bulk"),
     path("feedback/api/<int:pk>/view/", views.FeedbackDetailViewAPI.as_view(), name="feedback_api_detail"),
     path("feedback/api/<int:pk>/delete/", views.FeedbackDeleteViewAPI.as_view(), name="feedback_api_delete"),
     path("feedback/api/<int:page_pk>/list/", views.FeedbackListViewAPI.as_view(), name="page_feedback_api"),
     path("feedback/api/<int:page_pk>/chart/", views.FeedbackAggregateViewAPI.as_view(), name="page_feedback_api_chart"),
+    path("feedback/api/<int:page_pk>/export/", views.FeedbackExportViewAPI.as_view(), name="page_feedback_api_export"),
+    path("feedback/api/<int:page_pk>/pages/", views.FeedbackPageRankingViewAPI.as_view(), name="page_feedback_api_pages"),
+    path("feedback/api/<int:page_pk>/bulk/", views.FeedbackBulkActionViewAPI.as_view(), name="page_feedback_api_bulk"),
+    path("feedback/reports/pages/", views.FeedbackPageReportView.as_view(), name="feedback_report_pages"),
 ]
 
@@ -1,11 +1,21 @@
 from .admin_api import (
     FeedbackAggregateViewAPI,
+    FeedbackBulkActionViewAPI,
     FeedbackListViewAPI,
     FeedbackDetailViewAPI,
     FeedbackDeleteViewAPI,
+    FeedbackExportViewAPI,
+    FeedbackPageRankingViewAPI,
+    FeedbackPageReportView,
 )
 from .public import (
     feedback,
     feedback_with_message,
+    feedback_state,
+    feedback_vote,
 )
 
+from .asynchronous import (
+    afeedback,
+    afeedback_with_message,
+)
@@ -1,19 +1,24 @@
+import datetime
+import json
 from typing import Any, Callable, TYPE_CHECKING, Tuple
+from urllib.parse import urlencode
 from django import forms
+from django.contrib import messages
+from django.db import transaction
 from django.http.response import HttpResponse as HttpResponse
 from django.shortcuts import (
     get_object_or_404,
     redirect,
     render,
 )
-from django.core.paginator import (
-    Paginator,
-)
+from django.urls import reverse
+from django.utils.http import url_has_allowed_host_and_scheme
 from django.utils.translation import gettext_lazy as _
 from django.http import (
     HttpRequest,
     HttpResponse,
     JsonResponse,
+    StreamingHttpResponse,
 )
 from django.views.generic import (
     TemplateView,
@@ -25,11 +30,30 @@ from wagtail.models import (
     Page,
 )
 from .. import (
+    buckets,
+    counting,
+    export,
     get_feedback_model,
+    moderation,
+    registry,
+    reports,
+    search,
+    tracking,
+)
+from ..models import (
+    FeedbackRollup,
+    PageFeedbackSummary,
+)
+from ..pagination import (
+    CURSOR_PARAM,
+    CursorPaginator,
+    KeysetPaginator,
 )
 from ..filters import (
     FeedbackAggregationFilter,
     FeedbackAggregationTypeFilter,
+    FeedbackReportFilter,
+    FeedbackSeriesFilter,
 )
 from ..panels import (
     FeedbackPanel,
@@ -60,10 +84,30 @@ class FeedbackDateRangeField(filter_fields.RangeField):
         ))
         super().__init__(fields, *args, **kwargs)
 
+    def compress(self, data_list):
+        """
+            From the local midnight of the first day up to the local midnight after the last day,
+            so `created_at` is compared to constants (which lets PostgreSQL prune partitions).
+        """
+        if not data_list:
+            return None
+
+        start, stop = data_list
+        if start:
+            start = buckets.from_local(datetime.datetime.combine(start, datetime.time.min))
+        if stop:
+            stop = buckets.from_local(datetime.datetime.combine(stop + datetime.timedelta(days=1), datetime.time.min))
+        return slice(start, stop)
+
 
 class FeedbackDateFromToRangeFilter(filters.DateFromToRangeFilter):
     field_class = FeedbackDateRangeField
 
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        return qs.created_between(value.start, value.stop)
+
 
 class FeedbackDateRangeFilterSet(filters.FilterSet):
     created_at = FeedbackDateFromToRangeFilter(
@@ -78,9 +122,27 @@ class FeedbackDateRangeFilterSet(filters.FilterSet):
             "created_at",
         ]
 
+def date_range_bounds(date_filter: filters.FilterSet) -> tuple[datetime.datetime, datetime.datetime]:
+    """
+        The first and last moment (naive, local time) of the filtered date range.
+    """
+    date_range = date_filter.form.cleaned_data.get("created_at", None)
+    if not date_range:
+        return None, None
+
+    start = end = None
+    if date_range.start:
+        start = buckets.to_local(date_range.start)
+    if date_range.stop:
+        end = buckets.to_local(date_range.stop) - datetime.timedelta(microseconds=1)
+    return start, end
+
 def filter_created_at(request: HttpRequest, queryset):
     date_filter = FeedbackDateRangeFilterSet(request.GET, queryset=queryset)
-    return date_filter, date_filter.qs
+    queryset = date_filter.qs
+    if date_filter.form.cleaned_data.get("created_at"):
+        queryset = queryset.bounded()
+    return date_filter, queryset
 
 def filter_aggregation_type(request: HttpRequest, queryset):
     type_filter = FeedbackAggregationTypeFilter(request.GET, queryset=queryset)
@@ -106,15 +168,27 @@ class BaseFeedbackPermissionViewMixin:
     def setup(self, request: HttpRequest, *args, **kwargs) -> None:
         r = super().setup(request, *args, **kwargs)
 
+        # Responses returned from setup() are discarded by Django;
+        # keep the error around and return it from dispatch().
+        self.permission_denied = None
+
         if not request.user.has_perm("feedback.view_feedback"):
-            return error(request, self.has_no_permissions, to="wagtailadmin_home")
+            self.permission_denied = error(request, self.has_no_permissions, to="wagtailadmin_home")
+            return r
 
         page = self.get_page()
-        if page and not page.permissions_for_user(request.user).can_edit():
-            return error(request, self.has_no_permissions, to="wagtailadmin_home")
+        if isinstance(page, HttpResponse):
+            self.permission_denied = page
+        elif page and not page.permissions_for_user(request.user).can_edit():
+            self.permission_denied = error(request, self.has_no_permissions, to="wagtailadmin_home")
 
         return r
 
+    def dispatch(self, request: HttpRequest, *args, **kwargs):
+        if self.permission_denied is not None:
+            return self.permission_denied
+        return super().dispatch(request, *args, **kwargs)
+
 
 class FeedbackTemplateResponseMixin:
 
@@ -135,6 +209,7 @@ class FeedbackTemplateResponseMixin:
 
 class BaseFeedbackListingView(FeedbackTemplateResponseMixin, BaseFeedbackPermissionViewMixin, TemplateView):
     page_size = 10
+    cursor_pagination = False
     queryset_filters: list[Callable[[HttpRequest, "FeedbackQuerySet"], Tuple[filters.FilterSet, "FeedbackQuerySet"]]] = [
         filter_created_at,
     ]
@@ -163,8 +238,20 @@ class BaseFeedbackListingView(FeedbackTemplateResponseMixin, BaseFeedbackPermiss
             self.filters.append(filter)
         return queryset
     
+    def has_filters(self) -> bool:
+        return any(
+            value not in (None, "", [], ())
+            for filter in self.filters
+            for value in filter.form.cleaned_data.values()
+        )
+
     def paginate_queryset(self, queryset, page_size):
-        paginator = Paginator(queryset, page_size)
+        if self.cursor_pagination:
+            return self.paginate_queryset_by_cursor(queryset, page_size)
+
+        paginator = counting.CountingPaginator(
+            queryset, page_size, key=self.get_count_key(),
+        )
         page_number = self.request.GET.get(PAGE_PARAM, 1)
         page_obj = paginator.get_page(page_number)
 
@@ -182,6 +269,43 @@ class BaseFeedbackListingView(FeedbackTemplateResponseMixin, BaseFeedbackPermiss
 
         return paginator, page_obj
 
+    def get_count_key(self) -> str:
+        """
+            The path and the filters of the request, independent of parameter order.
+        """
+        query = self.request.GET.copy()
+        for param in (PAGE_PARAM, CURSOR_PARAM, "format"):
+            query.pop(param, None)
+
+        params = sorted(
+            (key, value)
+            for key, values in query.lists()
+            for value in values
+            if value
+        )
+        return f"{self.request.path}?{urlencode(params)}"
+
+    def get_cursor_paginator(self, queryset, page_size):
+        return CursorPaginator(queryset, page_size)
+
+    def paginate_queryset_by_cursor(self, queryset, page_size):
+        paginator = self.get_cursor_paginator(queryset, page_size)
+        page_obj = paginator.get_page(self.request.GET.get(CURSOR_PARAM, None))
+
+        self.next = None
+        if page_obj.has_next():
+            query = self.request.GET.copy()
+            query[CURSOR_PARAM] = page_obj.next_cursor
+            self.next = f"{self.request.path}?{query.urlencode()}"
+
+        self.previous = None
+        if page_obj.has_previous():
+            query = self.request.GET.copy()
+            query[CURSOR_PARAM] = page_obj.previous_cursor
+            self.previous = f"{self.request.path}?{query.urlencode()}"
+
+        return paginator, page_obj
+
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
 
@@ -200,6 +324,7 @@ class BaseFeedbackListingView(FeedbackTemplateResponseMixin, BaseFeedbackPermiss
         context["paginator"] = self.paginator
         context["page_obj"] = self.object_list
         context["page_param"] = PAGE_PARAM
+        context["cursor_pagination"] = self.cursor_pagination
         
         if self.page:
             context.update(
@@ -216,10 +341,19 @@ class BaseFeedbackListingView(FeedbackTemplateResponseMixin, BaseFeedbackPermiss
         if self.previous:
             extra["previous"] = self.previous
 
+        if self.cursor_pagination:
+            return {
+                "next_cursor": self.object_list.next_cursor,
+                "previous_cursor": self.object_list.previous_cursor,
+                **extra,
+                **kwargs,
+            }
+
         return {
             "page": self.object_list.number,
             "pages": self.paginator.num_pages,
             "count": self.paginator.count,
+            "approximate": self.paginator.approximate,
             **extra,
             **kwargs,
         }
@@ -235,37 +369,322 @@ class FeedbackAggregateViewAPI(BaseFeedbackListingView):
         filter_aggregation_data,
     ]    
 
+    def get_queryset(self):
+        if not registry.get_setting("FEEDBACK_USE_ROLLUPS"):
+            return super().get_queryset()
+
+        # Aggregate the pre-computed buckets instead of the raw feedback rows.
+        self.object_list = FeedbackRollup.objects.all()
+        if self.page:
+            self.object_list = self.object_list.filter(page=self.page)
+        return self.object_list
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        self.period = queryset.period
+
+        series_filter = FeedbackSeriesFilter(self.request.GET, queryset=queryset)
+        self.filters.append(series_filter)
+        return series_filter.series(*date_range_bounds(self.filters[0]))
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["period"] = self.request.GET.get(
-            "periods", self.base_queryset.default_period
-        )
+        context["period"] = self.period
         return context
 
     def get_json_data(self, context, **kwargs):
         return super().get_json_data(
             context, 
             **kwargs, 
-            period=self.base_queryset.period,
+            period=self.period,
             results=list(self.object_list),
         )
 
 class FeedbackListViewAPI(BaseFeedbackListingView):
     template_name = "feedback/panels/partials/list.html"
 
+    @property
+    def cursor_pagination(self) -> bool:
+        return registry.get_setting("FEEDBACK_CURSOR_PAGINATION")
+
     queryset_filters: list[Callable[[HttpRequest, "FeedbackQuerySet"], Tuple[filters.FilterSet, "FeedbackQuerySet"]]] = [
         *BaseFeedbackListingView.queryset_filters,
         filter_list,
     ]
 
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+
+        # Search results are ordered by relevance, the cursor only pages through `(created_at, id)`.
+        if search.terms(self.filters[-1].form.cleaned_data.get("search", None)):
+            self.cursor_pagination = False
+        return queryset
+
+    def serialize(self, instance):
+        data = Feedback.serialize(instance)
+        if hasattr(instance, "search_headline"):
+            data["search_rank"] = instance.search_rank
+            data["search_headline"] = search.highlight(instance.search_headline)
+        if getattr(instance, "message_cluster_id", None) is not None:
+            data["cluster_size"] = getattr(instance, "cluster_size", None)
+            data["urls"]["cluster"] = f"{reverse('feedback_api')}?{urlencode({'cluster': instance.message_cluster_id})}"
+        return data
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["bulk_actions"] = [
+            action for action in moderation.available_actions(Feedback)
+            if self.request.user.has_perm(moderation.required_permission(action))
+        ]
+        context["filtered"] = self.has_filters()
+        return context
+
     def get_json_data(self, context, **kwargs):
         return super().get_json_data(
             context,
             **kwargs,
-            results=list(map(Feedback.serialize, self.object_list)),
+            results=list(map(self.serialize, self.object_list)),
         )
 
 
+class FeedbackPageRankingViewAPI(BaseFeedbackListingView):
+    """
+        Pages ranked by satisfaction, volume or trend, see `feedback.reports`.
+        Passing a page ranks the page and its descendants.
+
+        Paginated with a keyset cursor; `?format=csv|ndjson` exports the full ranking.
+    """
+    page_size = 20
+    cursor_pagination = True
+    template_name = "feedback/panels/partials/pages.html"
+
+    def get_queryset(self):
+        if registry.get_setting("FEEDBACK_USE_ROLLUPS"):
+            self.object_list = FeedbackRollup.objects.for_period("date")
+        else:
+            self.object_list = Feedback.objects.all()
+
+        if self.page:
+            self.object_list = self.object_list.filter(
+                page__in=Page.objects.descendant_of(self.page, inclusive=True),
+            )
+        return self.object_list
+
+    def get_summaries(self):
+        summaries = PageFeedbackSummary.objects.all()
+        if self.page:
+            summaries = summaries.filter(
+                page__in=Page.objects.descendant_of(self.page, inclusive=True),
+            )
+        return summaries
+
+    def get_report_end(self):
+        """
+            The end of the filtered date range, the trend is computed up to it.
+        """
+        date_range = self.filters[0].form.cleaned_data.get("created_at", None)
+        if not date_range:
+            return None
+        return date_range.stop
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+
+        report_filter = FeedbackReportFilter(
+            self.request.GET,
+            queryset=queryset,
+            # The summaries hold the totals of all time.
+            summaries=None if getattr(queryset, "date_bounded", False) else self.get_summaries(),
+            end=self.get_report_end(),
+        )
+        self.filters.append(report_filter)
+        queryset = report_filter.qs.filter(total__gt=0)
+        self.report = report_filter.report
+        return queryset
+
+    def get_cursor_paginator(self, queryset, page_size):
+        return KeysetPaginator(queryset, page_size, self.report.keys)
+
+    def get(self, request: HttpRequest, *args, **kwargs):
+        format = request.GET.get("format", None)
+        if format is None:
+            return super().get(request, *args, **kwargs)
+
+        if format not in export.EXPORT_FORMATS:
+            return error(request, _("Unknown export format."), status=400)
+
+        queryset = self.filter_queryset(self.get_queryset())
+
+        filename = "feedback-pages"
+        if self.page:
+            filename = f"feedback-pages-{self.page.pk}"
+
+        return export.rows_response(
+            self.report.export_rows(queryset),
+            reports.REPORT_FIELDS,
+            format=format,
+            filename=filename,
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        self.report.decorate(self.object_list.object_list)
+        context["report"] = self.report
+        if not self.page:
+            context["panel_id"] = "feedback-panel-pages"
+        return context
+
+    def get_json_data(self, context, **kwargs):
+        return super().get_json_data(
+            context,
+            **kwargs,
+            ordering=self.report.ordering,
+            trend_days=self.report.trend_days,
+            results=list(map(reports.serialize, self.object_list)),
+        )
+
+
+class FeedbackPageReportView(FeedbackPageRankingViewAPI):
+    """
+        The ranking as a page in the Wagtail admin reports menu.
+    """
+    report_template_name = "feedback/reports/pages.html"
+
+    def get_template_names(self):
+        if is_htmx_request(self.request):
+            return super().get_template_names()
+        return [self.report_template_name]
+
+
+class FeedbackExportViewAPI(FeedbackListViewAPI):
+    """
+        Streams all feedback matching the list filters as CSV or NDJSON.
+    """
+
+    def get(self, request: HttpRequest, *args, **kwargs):
+        format = request.GET.get("format", "csv")
+        if format not in export.EXPORT_FORMATS:
+            return error(request, _("Unknown export format."), status=400)
+
+        queryset = self.filter_queryset(self.get_queryset())
+
+        filename = "feedback"
+        if self.page:
+            filename = f"feedback-{self.page.pk}"
+
+        return export.streaming_response(queryset, format=format, filename=filename)
+
+
+class FeedbackBulkActionViewAPI(BaseFeedbackListingView):
+    """
+        Deletes or marks all feedback matching the list filters (in the query string),
+        or the posted `ids`, in chunks; see `feedback.moderation`.
+
+        Deleting requires `feedback.delete_feedback`, marking `feedback.change_feedback`.
+        Edit permission is checked once per page of the matching feedback, feedback
+        of pages the user cannot edit is skipped. With `Accept: application/x-ndjson`
+        the progress is streamed as a JSON line per chunk.
+    """
+    template_name = "feedback/panels/partials/bulk.html"
+    http_method_names = ["post"]
+
+    queryset_filters: list[Callable[[HttpRequest, "FeedbackQuerySet"], Tuple[filters.FilterSet, "FeedbackQuerySet"]]] = [
+        *FeedbackListViewAPI.queryset_filters,
+    ]
+
+    def get_data(self) -> dict | None:
+        if self.request.content_type == "application/json":
+            try:
+                data = json.loads(self.request.body)
+            except ValueError:
+                return None
+            return data if isinstance(data, dict) else None
+
+        return {
+            "action": self.request.POST.get("action", None),
+            "ids": self.request.POST.getlist("ids"),
+            "all": self.request.POST.get("all", None) in ("1", "true", "on"),
+        }
+
+    def error_response(self, message, status: int = 400):
+        if is_json_request(self.request):
+            return JsonResponse({"error": message}, status=status)
+        return error(self.request, message, status=status)
+
+    def post(self, request: HttpRequest, *args, **kwargs):
+        data = self.get_data()
+        if data is None:
+            return self.error_response(_("Invalid JSON."))
+
+        action = data.get("action", None)
+        if action not in moderation.available_actions(Feedback):
+            return self.error_response(_("Unknown bulk action."))
+
+        if not request.user.has_perm(moderation.required_permission(action)):
+            return self.error_response(_("You do not have permission to perform this action."), status=403)
+
+        try:
+            ids = [int(pk) for pk in data.get("ids", None) or []]
+        except (TypeError, ValueError):
+            return self.error_response(_("Invalid feedback IDs."))
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if ids:
+            queryset = queryset.filter(pk__in=ids)
+        elif not self.has_filters() and data.get("all", None) is not True:
+            return self.error_response(_("Filter the feedback, select feedback or confirm the action for all feedback."))
+
+        # Checked once per page instead of per row.
+        pages = moderation.page_ids(queryset)
+        allowed = {
+            page.pk
+            for page in Page.objects.filter(pk__in=pages)
+            if page.permissions_for_user(request.user).can_edit()
+        }
+        queryset = queryset.filter(page_id__in=allowed)
+        self.skipped_pages = len(pages - allowed)
+
+        progress = moderation.run(queryset, action)
+
+        if "application/x-ndjson" in request.headers.get("Accept", ""):
+            return StreamingHttpResponse(
+                self.stream(progress, action),
+                content_type="application/x-ndjson",
+            )
+
+        result = self.summarize(progress, action)
+
+        if is_json_request(request):
+            return JsonResponse({
+                "success": True,
+                **result,
+            }, json_dumps_params={"indent": 2})
+
+        if is_htmx_request(request):
+            return render(request, self.template_name, {
+                "result": result,
+            })
+
+        messages.success(request, _("%(processed)s feedback processed.") % result)
+        referer = request.META.get("HTTP_REFERER", None)
+        if referer and url_has_allowed_host_and_scheme(referer, allowed_hosts={request.get_host()}):
+            return redirect(referer)
+        return redirect("wagtailadmin_home")
+
+    def summarize(self, progress, action: str) -> dict:
+        result = {"action": action, "total": 0, "processed": 0}
+        for chunk in progress:
+            result = chunk
+        return {**result, "skipped_pages": self.skipped_pages}
+
+    def stream(self, progress, action: str):
+        result = {"action": action, "total": 0, "processed": 0}
+        for chunk in progress:
+            result = chunk
+            yield json.dumps(chunk) + "\n"
+        yield json.dumps({**result, "skipped_pages": self.skipped_pages, "done": True}) + "\n"
+
+
 class FeedbackDetailViewAPI(BaseFeedbackPermissionViewMixin, FeedbackTemplateResponseMixin, TemplateView):
     template_name = "feedback/panels/partials/feedback-list-item.html"
 
@@ -306,7 +725,9 @@ class FeedbackDeleteViewAPI(FeedbackDetailViewAPI):
         obj = self.get_object()
         page = self.get_page()
 
-        obj.delete()
+        with transaction.atomic():
+            tracking.discard_feedback(obj)
+            obj.delete()
 
         if is_htmx_request(request):
             return HttpResponse(content="", status=200)
@@ -0,0 +1,251 @@
+"""
+    Async versions of the public views, used when `FEEDBACK_ASYNC_VIEWS` is enabled.
+
+    The duplicate checks, feedback lookups and inserts use the async ORM and the
+    async backend methods. Page context construction and template rendering
+    can query the database from Wagtail internals and still run in a thread.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.forms import ValidationError
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponseNotAllowed,
+)
+from django.utils.translation import gettext_lazy as _
+from wagtail import hooks
+from wagtail.models import (
+    Page,
+)
+
+from ..backends import (
+    get_feedback_backend,
+)
+from .. import (
+    tracking,
+)
+from ..buffer import (
+    get_write_buffer,
+)
+from .public import (
+    Feedback,
+    FeedbackForm,
+    before_feedback_form_valid,
+    after_feedback_form_valid,
+    before_feedback_message_form_valid,
+    after_feedback_message_form_valid,
+)
+from .utils import (
+    redirect_or_respond,
+    rate_limited,
+    error,
+)
+
+
+async def aget_page_or_404(page_pk: int) -> Page:
+    # `public()` looks up the view restrictions as soon as it is called.
+    pages = await sync_to_async(Page.objects.live().public)()
+    try:
+        return await pages.specific().aget(pk=page_pk)
+    except Page.DoesNotExist:
+        raise Http404("No page found matching the query.")
+
+
+async def aget_feedback_or_404(**kwargs):
+    if "token" in kwargs:
+        write_buffer = get_write_buffer()
+        if write_buffer is not None:
+            feedback = await sync_to_async(write_buffer.find)(kwargs["token"])
+            if feedback is None:
+                raise Http404("No feedback found matching the query.")
+            return feedback
+
+        lookup = {"token": kwargs["token"]}
+    else:
+        lookup = {"pk": kwargs.get("pk", None)}
+
+    try:
+        return await Feedback.objects.aget(**lookup)
+    except Feedback.DoesNotExist:
+        raise Http404("No feedback found matching the query.")
+
+
+async def arun_hooks(hook_name: str, *args) -> None:
+    """
+        Await async hooks, run sync hooks in a thread (they might query the database).
+    """
+    for fn in hooks.get_hooks(hook_name):
+        if asyncio.iscoroutinefunction(fn):
+            await fn(*args)
+        else:
+            await sync_to_async(fn)(*args)
+
+
+@sync_to_async
+def arespond(request: HttpRequest, page: Page, template: str, extra: dict, message: str = None, *args, **kwargs):
+    context = page.get_context(request, *args, **kwargs)
+    context.update(extra)
+    return redirect_or_respond(
+        request,
+        page.get_url(request),
+        template,
+        context=context,
+        message=message,
+    )
+
+
+@sync_to_async
+def aerror(request: HttpRequest, page: Page, message: str):
+    return error(
+        request,
+        message,
+        WRAPPER="feedback/wrapper.html",
+        to=page.get_url(request),
+    )
+
+
+async def afeedback(request, *args, **kwargs):
+    if not request.method == "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    template = "feedback/form.html"
+
+    backend = get_feedback_backend()
+    retry_after = await backend.acheck_rate_limit(request, kwargs.get("page_pk", None))
+    if retry_after is not None:
+        return rate_limited(request, retry_after)
+
+    page = await aget_page_or_404(kwargs.get("page_pk", None))
+    form = Feedback.get_form_class()(
+        request.POST,
+        request=request,
+        requires_message=False,
+    )
+
+    if await backend.ais_duplicate(request, page, form, exists=False):
+        return await aerror(request, page, _("You have already submitted feedback for this page."))
+
+    try:
+        await arun_hooks(before_feedback_form_valid, request, form)
+    except ValidationError as e:
+        form.add_error(None, e)
+
+    if form.is_valid():
+        form.instance.page = page
+        form.instance = form.save(commit=False)
+
+        write_buffer = get_write_buffer()
+        if write_buffer is not None:
+            # Spooling to disk and the shared cache block.
+            await sync_to_async(write_buffer.submit)(form.instance)
+        else:
+            await form.instance.asave()
+            await tracking.arecord_new_feedback(form.instance)
+
+        await arun_hooks(after_feedback_form_valid, request, form.instance)
+
+        await backend.aend_check(request, page, form, form.instance, exists=False)
+
+        # If the feedback is positive and it is allowed, or if it is negative
+        # then show the message form.
+        if hasattr(page, "allow_feedback_message_on_positive")\
+            and page.allow_feedback_message_on_positive()\
+            and form.instance.positive\
+            or not form.instance.positive:
+
+            form = FeedbackForm(
+                request=request,
+                page=page,
+                requires_message=True,
+                instance=form.instance,
+            )
+        else:
+            template = "feedback/thanks.html"
+    else:
+        template = "feedback/happy-sad.html"
+
+    extra = {
+        "form": form,
+        "feedback": form.instance,
+    }
+    if form.errors:
+        extra["errors"] = form.errors
+
+    response = await arespond(
+        request, page, template, extra,
+        _("Thank you for your feedback."),
+        *args, **kwargs,
+    )
+    return backend.process_response(request, response)
+
+
+async def afeedback_with_message(request, *args, **kwargs):
+    if not request.method == "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    backend = get_feedback_backend()
+    retry_after = await backend.acheck_rate_limit(request, kwargs.get("page_pk", None))
+    if retry_after is not None:
+        return rate_limited(request, retry_after)
+
+    page = await aget_page_or_404(kwargs.get("page_pk", None))
+    feedback = await aget_feedback_or_404(**kwargs)
+
+    try:
+        return await _afeedback_with_message(request, backend, page, feedback, *args, **kwargs)
+    finally:
+        # Feedback claimed from the write buffer which did not get saved
+        # must go back into the buffer.
+        if feedback.pk is None:
+            await sync_to_async(get_write_buffer().submit)(feedback)
+
+
+async def _afeedback_with_message(request, backend, page: Page, feedback, *args, **kwargs):
+    template = "feedback/form.html"
+
+    if hasattr(page, "allow_feedback_message_on_positive") \
+        and not page.allow_feedback_message_on_positive() \
+        and feedback.positive:
+        return await aerror(request, page, _("Feedback messages are not allowed on positive feedback."))
+
+    is_new = feedback.pk is None
+    had_message = bool(feedback.message)
+    form = FeedbackForm(
+        request.POST,
+        request=request,
+        page=page,
+        requires_message=True,
+        instance=feedback,
+    )
+
+    if await backend.ais_duplicate(request, page, form, exists=True):
+        return await aerror(request, page, _("You have already submitted feedback for this page."))
+
+    try:
+        await arun_hooks(before_feedback_message_form_valid, request, form)
+    except ValidationError as e:
+        form.add_error(None, e)
+
+    if form.is_valid():
+        form.instance.page = page
+        form.instance = form.save(commit=False)
+        await form.instance.asave()
+        template = "feedback/thanks.html"
+
+        if is_new:
+            await tracking.arecord_new_feedback(form.instance)
+        elif not had_message:
+            await tracking.arecord_new_message(form.instance)
+
+        await backend.aend_check(request, page, form, form.instance, exists=True)
+
+        await arun_hooks(after_feedback_message_form_valid, request, form.instance)
+
+    extra = {
+        "form": form,
+        "feedback": form.instance,
+    }
+    response = await arespond(request, page, template, extra, None, *args, **kwargs)
+    return backend.process_response(request, response)
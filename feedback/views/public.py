@@ -1,3 +1,4 @@
+import json
 from typing import Callable, Type
 from django.forms import ValidationError
 from django.shortcuts import (
@@ -5,9 +6,15 @@ from django.shortcuts import (
 )
 from django.utils.translation import gettext_lazy as _
 from django.http import (
+    Http404,
     HttpRequest,
     HttpResponseNotAllowed,
+    JsonResponse,
 )
+from django.middleware.csrf import get_token
+from django.urls import reverse
+from django.views.decorators.cache import never_cache
+from wagtail import hooks
 from wagtail.models import (
     Page,
 )
@@ -16,13 +23,18 @@ from ..backends import (
 )
 from .. import (
     get_feedback_model,
+    pageinfo,
+    tracking,
+)
+from ..buffer import (
+    get_write_buffer,
 )
 from .utils import (
     redirect_or_respond,
+    rate_limited,
     error,
 )
 
-from wagtail import hooks
 
 
 Feedback = get_feedback_model()
@@ -46,6 +58,11 @@ def feedback(request, *args, **kwargs):
     
     template = "feedback/form.html"
 
+    backend = get_feedback_backend()
+    retry_after = backend.check_rate_limit(request, kwargs.get("page_pk", None))
+    if retry_after is not None:
+        return rate_limited(request, retry_after)
+
     page_qs = Page.objects.live().public().specific()
     page: Page = get_object_or_404(page_qs, pk=kwargs.get("page_pk", None))
     form = Feedback.get_form_class()(
@@ -54,7 +71,6 @@ def feedback(request, *args, **kwargs):
         requires_message=False,
     )
 
-    backend = get_feedback_backend()
     if backend.is_duplicate(request, page, form, exists=False):
         return error(
             request, 
@@ -74,7 +90,14 @@ def feedback(request, *args, **kwargs):
 
     if valid:
         form.instance.page = page
-        form.instance = form.save()
+
+        write_buffer = get_write_buffer()
+        if write_buffer is not None:
+            form.instance = form.save(commit=False)
+            write_buffer.submit(form.instance)
+        else:
+            form.instance = form.save()
+            tracking.record_new_feedback(form.instance)
 
         hks: list[_AfterFunc] = hooks.get_hooks(after_feedback_form_valid)
         for fn in hks:
@@ -107,24 +130,182 @@ def feedback(request, *args, **kwargs):
     if form.errors:
         context["errors"] = form.errors
 
-    return redirect_or_respond(
+    response = redirect_or_respond(
         request,
         page.get_url(request),
         template,
         context=context,
         message=_("Thank you for your feedback."),
     )
+    return backend.process_response(request, response)
 
 
 def feedback_with_message(request, *args, **kwargs):
     if not request.method == "POST":
         return HttpResponseNotAllowed(["POST"])
-    
-    template = "feedback/form.html"
+
+    backend = get_feedback_backend()
+    retry_after = backend.check_rate_limit(request, kwargs.get("page_pk", None))
+    if retry_after is not None:
+        return rate_limited(request, retry_after)
 
     page_qs = Page.objects.live().public().specific()
     page: Page = get_object_or_404(page_qs, pk=kwargs.get("page_pk", None))
-    feedback = get_object_or_404(Feedback, pk=kwargs.get("pk", None))
+    feedback = get_feedback_or_404(**kwargs)
+
+    try:
+        return _feedback_with_message(request, backend, page, feedback, *args, **kwargs)
+    finally:
+        # Feedback claimed from the write buffer which did not get saved
+        # must go back into the buffer.
+        if feedback.pk is None:
+            get_write_buffer().submit(feedback)
+
+
+def feedback_vote(request, *args, **kwargs):
+    """
+        A minimal JSON endpoint for votes.
+
+        Accepts `{"positive": true}` as JSON (with the `X-CSRFToken` header) or as form
+        data, e.g. from `navigator.sendBeacon`. The page is checked against the cached
+        `pageinfo` lookup, no templates are rendered and the vote is saved with a
+        single `INSERT` (or handed to the write buffer).
+    """
+    if not request.method == "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    backend = get_feedback_backend()
+    retry_after = backend.check_rate_limit(request, kwargs.get("page_pk", None))
+    if retry_after is not None:
+        response = JsonResponse({"error": _("Too many requests, please try again later.")}, status=429)
+        response["Retry-After"] = str(retry_after)
+        return response
+
+    info = pageinfo.get_page_info(kwargs.get("page_pk", None))
+    if info is None:
+        return JsonResponse({"error": _("Page not found.")}, status=404)
+
+    data = request.POST
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({"error": _("Invalid JSON.")}, status=400)
+
+        if not isinstance(data, dict):
+            return JsonResponse({"error": _("Invalid JSON.")}, status=400)
+
+    form = Feedback.get_form_class()(
+        data,
+        request=request,
+        requires_message=False,
+    )
+
+    page = get_backend_page(info)
+    if page is None:
+        return JsonResponse({"error": _("Page not found.")}, status=404)
+
+    if backend.is_duplicate(request, page, form, exists=False):
+        response = JsonResponse({"error": _("You have already submitted feedback for this page.")}, status=409)
+        return backend.process_response(request, response)
+
+    try:
+        hks: list[_BeforeFunc] = hooks.get_hooks(before_feedback_form_valid)
+        for fn in hks:
+            fn(request, form)
+    except ValidationError as e:
+        form.add_error(None, e)
+
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors.get_json_data()}, status=400)
+
+    form.instance.page_id = info.pk
+
+    write_buffer = get_write_buffer()
+    if write_buffer is not None:
+        form.instance = form.save(commit=False)
+        write_buffer.submit(form.instance)
+    else:
+        form.instance = form.save()
+        tracking.record_new_feedback(form.instance)
+
+    hks: list[_AfterFunc] = hooks.get_hooks(after_feedback_form_valid)
+    for fn in hks:
+        fn(request, form.instance)
+
+    backend.end_check(request, page, form, form.instance, exists=False)
+
+    result = {
+        "positive": form.instance.positive,
+    }
+    if form.instance.pk is not None:
+        result["id"] = form.instance.pk
+
+    if info.allow_positive_message or not form.instance.positive:
+        if form.instance.pk is not None:
+            result["message_url"] = reverse("feedback:feedback_with_message", kwargs={"page_pk": info.pk, "pk": form.instance.pk})
+        else:
+            result["message_url"] = reverse("feedback:feedback_with_message_token", kwargs={"page_pk": info.pk, "token": form.instance.token})
+
+    response = JsonResponse(result, status=201)
+    return backend.process_response(request, response)
+
+
+@never_cache
+def feedback_state(request, *args, **kwargs):
+    """
+        The per-visitor state of a cached `{% feedback %}` fragment.
+    """
+    if not request.method == "GET":
+        return HttpResponseNotAllowed(["GET"])
+
+    info = pageinfo.get_page_info(kwargs.get("page_pk", None))
+    if info is None:
+        raise Http404("No page found matching the query.")
+
+    page = get_backend_page(info)
+    if page is None:
+        raise Http404("No page found matching the query.")
+
+    backend = get_feedback_backend()
+    voted = backend.is_duplicate(request, page, None, exists=False)
+
+    data = {
+        "csrf_token": get_token(request),
+        "voted": voted,
+    }
+    if voted:
+        data["message"] = _("You have already submitted feedback for this page.")
+
+    return JsonResponse(data)
+
+
+def get_backend_page(info: pageinfo.PageInfo) -> Page | pageinfo.PageInfo | None:
+    """
+        The page as the backend's duplicate checks need it: the specific page when
+        it checks duplicates itself, otherwise the cached `info`, which has its `pk`.
+    """
+    if not info.has_feedback_checks:
+        return info
+    return Page.objects.filter(pk=info.pk).specific().first()
+
+
+def get_feedback_or_404(**kwargs):
+    if "token" not in kwargs:
+        return get_object_or_404(Feedback, pk=kwargs.get("pk", None))
+
+    write_buffer = get_write_buffer()
+    if write_buffer is None:
+        return get_object_or_404(Feedback, token=kwargs["token"])
+
+    feedback = write_buffer.find(kwargs["token"])
+    if feedback is None:
+        raise Http404("No feedback found matching the query.")
+    return feedback
+
+
+def _feedback_with_message(request, backend, page: Page, feedback, *args, **kwargs):
+    template = "feedback/form.html"
 
     if hasattr(page, "allow_feedback_message_on_positive") \
         and not page.allow_feedback_message_on_positive() \
@@ -136,6 +317,8 @@ def feedback_with_message(request, *args, **kwargs):
             to=page.get_url(request),
         )
 
+    is_new = feedback.pk is None
+    had_message = bool(feedback.message)
     form = FeedbackForm(
         request.POST,
         request=request,
@@ -144,7 +327,6 @@ def feedback_with_message(request, *args, **kwargs):
         instance=feedback,
     )
 
-    backend = get_feedback_backend()
     if backend.is_duplicate(request, page, form, exists=True):
         return error(
             request, 
@@ -165,6 +347,11 @@ def feedback_with_message(request, *args, **kwargs):
         form.instance = form.save()
         template = "feedback/thanks.html"
 
+        if is_new:
+            tracking.record_new_feedback(form.instance)
+        elif not had_message:
+            tracking.record_new_message(form.instance)
+
         backend.end_check(request, page, form, form.instance, exists=True)
 
         hks: list[_AfterFunc] = hooks.get_hooks(after_feedback_message_form_valid)
@@ -175,10 +362,11 @@ def feedback_with_message(request, *args, **kwargs):
     context["form"] = form
     context["feedback"] = form.instance
 
-    return redirect_or_respond(
+    response = redirect_or_respond(
         request,
         page.get_url(request),
         template,
         context=context,
     )
+    return backend.process_response(request, response)
 
@@ -1,5 +1,7 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages as django_messages
+from django.http import HttpResponse
+from django.utils.translation import gettext_lazy as _
 
 
 def redirect_or_respond(request, url, template, context=None, message_type = "success", message = None, *args, **kwargs):
@@ -37,6 +39,23 @@ def error(request, message, status=200, key = "error", to: str = None, *args, **
     }, status=status)
 
 
+def rate_limited(request, retry_after: int):
+    """
+        Reject a rate limited submission without touching the session or database.
+    """
+    message = _("Too many requests, please try again later.")
+    if is_htmx_request(request):
+        response = render(request, "feedback/panels/partials/error.html", {
+            "error": message,
+            "WRAPPER": "feedback/wrapper.html",
+        }, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type="text/plain; charset=utf-8")
+
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
 def is_htmx_request(request):
     if hasattr(request, "is_htmx"):
         return bool(request.is_htmx)
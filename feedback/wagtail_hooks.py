@@ -1,7 +1,10 @@
 from django.templatetags.static import static
+from django.urls import reverse
 from django.utils.html import format_html
+from django.utils.translation import gettext_lazy as _
 
 from wagtail import hooks
+from wagtail.admin.menu import MenuItem
 
 # from .templatetags.feedback import FEEDBACK_CSS
 from .urls import admin_urlpatterns
@@ -10,6 +13,21 @@ from .urls import admin_urlpatterns
 def register_admin_urls():
     return admin_urlpatterns
 
+
+class FeedbackReportMenuItem(MenuItem):
+    def is_shown(self, request):
+        return request.user.has_perm("feedback.view_feedback")
+
+
+@hooks.register("register_reports_menu_item")
+def register_feedback_report_menu_item():
+    return FeedbackReportMenuItem(
+        _("Page feedback"),
+        reverse("feedback_report_pages"),
+        icon_name="comment",
+        order=1000,
+    )
+
 # @hooks.register("insert_global_admin_css")
 # def global_admin_css():
 #     return format_html(